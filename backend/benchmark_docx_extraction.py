@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark disclosure metadata extraction: python-docx versus the streaming scanner.
+
+Runs both extractors over every document in "Directors Discloser Output"
+(or --dir), checks that they agree on DIN, classification and paragraph
+text, and prints the time per document for each path.
+
+    python benchmark_docx_extraction.py --repeat 5
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from docx import Document as DocxDocument
+
+from docx_scan import iter_paragraph_texts
+from disclosure_catalog import DISCLOSURES_DIR, is_disclosure_file, scan_metadata
+
+
+def python_docx_metadata(file_path):
+    doc = DocxDocument(file_path)
+    return scan_metadata([para.text for para in doc.paragraphs])
+
+
+def streaming_metadata(file_path):
+    return scan_metadata(iter_paragraph_texts(file_path))
+
+
+def time_extractor(extractor, files, repeat):
+    """Best-of-repeat total seconds for running extractor over every file"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for file_path in files:
+            extractor(file_path)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def check_agreement(files):
+    """Files where the two paths disagree on metadata or paragraph text"""
+    mismatches = []
+    for file_path in files:
+        expected = [para.text for para in DocxDocument(file_path).paragraphs]
+        if list(iter_paragraph_texts(file_path)) != expected:
+            mismatches.append((os.path.basename(file_path), "paragraph text"))
+        elif python_docx_metadata(file_path) != streaming_metadata(file_path):
+            mismatches.append((os.path.basename(file_path), "metadata"))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dir", default=DISCLOSURES_DIR, help="directory of .docx disclosures")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes per extractor (best is reported)")
+    args = parser.parse_args()
+
+    files = sorted(
+        os.path.join(args.dir, name) for name in os.listdir(args.dir) if is_disclosure_file(name)
+    )
+    if not files:
+        print(f"No .docx files found in {args.dir}")
+        return 1
+
+    mismatches = check_agreement(files)
+    for name, what in mismatches:
+        print(f"MISMATCH {name}: {what}")
+
+    legacy = time_extractor(python_docx_metadata, files, args.repeat)
+    streaming = time_extractor(streaming_metadata, files, args.repeat)
+
+    print(f"Documents:   {len(files)}")
+    print(f"python-docx: {legacy:.3f}s total, {legacy / len(files) * 1000:.2f} ms/doc")
+    print(f"streaming:   {streaming:.3f}s total, {streaming / len(files) * 1000:.2f} ms/doc")
+    print(f"Speedup:     {legacy / streaming:.1f}x")
+    print(f"Agreement:   {len(files) - len(mismatches)}/{len(files)} documents")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
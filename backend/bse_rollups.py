@@ -0,0 +1,126 @@
+"""
+Materialized BSE notification counts for notifications.db.
+
+Per-day, per-month and per-entity counts of linked DailyLogs rows are kept
+in small summary tables. Triggers on DailyLogs keep them current as the
+ingest jobs insert, update or delete rows, so the count endpoints read a
+handful of rollup rows instead of scanning and grouping the whole table.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rows that count as a notification everywhere in the API
+LINKED = "{row}.Link IS NOT NULL AND {row}.Link != 'NIL'"
+
+# Rollup table -> SQL expression for its key, evaluated against NEW/OLD/DailyLogs
+ROLLUPS = {
+    "bse_daily_counts": ("day", "IFNULL({row}.Date, '')"),
+    "bse_monthly_counts": ("month", "IFNULL(strftime('%Y-%m', {row}.Date), '')"),
+    "bse_entity_counts": ("entity_name", "IFNULL({row}.EntityName, '')"),
+}
+
+TRIGGERS = (
+    "trg_dailylogs_rollup_insert",
+    "trg_dailylogs_rollup_delete",
+    "trg_dailylogs_rollup_update_old",
+    "trg_dailylogs_rollup_update_new",
+)
+
+
+def _increment(row: str) -> str:
+    statements = []
+    for table, (column, key) in ROLLUPS.items():
+        statements.append(
+            f"INSERT INTO {table} ({column}, count) VALUES ({key.format(row=row)}, 1) "
+            f"ON CONFLICT({column}) DO UPDATE SET count = count + 1;"
+        )
+    return "\n".join(statements)
+
+
+def _decrement(row: str) -> str:
+    statements = []
+    for table, (column, key) in ROLLUPS.items():
+        statements.append(f"UPDATE {table} SET count = count - 1 WHERE {column} = {key.format(row=row)};")
+        statements.append(f"DELETE FROM {table} WHERE {column} = {key.format(row=row)} AND count <= 0;")
+    return "\n".join(statements)
+
+
+def _create_triggers(conn):
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_dailylogs_rollup_insert
+        AFTER INSERT ON DailyLogs WHEN {LINKED.format(row='NEW')}
+        BEGIN
+        {_increment('NEW')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_dailylogs_rollup_delete
+        AFTER DELETE ON DailyLogs WHEN {LINKED.format(row='OLD')}
+        BEGIN
+        {_decrement('OLD')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_dailylogs_rollup_update_old
+        AFTER UPDATE OF Link, Date, EntityName ON DailyLogs WHEN {LINKED.format(row='OLD')}
+        BEGIN
+        {_decrement('OLD')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_dailylogs_rollup_update_new
+        AFTER UPDATE OF Link, Date, EntityName ON DailyLogs WHEN {LINKED.format(row='NEW')}
+        BEGIN
+        {_increment('NEW')}
+        END
+    """)
+
+
+def rebuild_bse_rollups(conn):
+    """Recreate the rollup tables from DailyLogs and install the maintenance triggers"""
+    for table, (column, key) in ROLLUPS.items():
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {column} TEXT PRIMARY KEY,
+                count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(f"""
+            INSERT INTO {table} ({column}, count)
+            SELECT {key.format(row='DailyLogs')}, COUNT(*)
+            FROM DailyLogs
+            WHERE {LINKED.format(row='DailyLogs')}
+            GROUP BY 1
+        """)
+    _create_triggers(conn)
+
+
+def rollups_installed(conn) -> bool:
+    """Whether the rollup triggers are in place on DailyLogs
+
+    Ingest jobs that replace DailyLogs wholesale drop its triggers along with
+    the old table, which is the signal that the rollups must be rebuilt.
+    """
+    placeholders = ",".join("?" for _ in TRIGGERS)
+    row = conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+        TRIGGERS
+    ).fetchone()
+    return row[0] == len(TRIGGERS)
+
+
+def ensure_bse_rollups(pool):
+    """Rebuild the rollups on the notifications pool if their triggers are missing"""
+    with pool.read() as conn:
+        if rollups_installed(conn):
+            return False
+    with pool.write() as conn:
+        # Another thread may have rebuilt them while we waited for the writer
+        if rollups_installed(conn):
+            return False
+        logger.info("Rebuilding BSE notification rollups")
+        rebuild_bse_rollups(conn)
+    return True
@@ -0,0 +1,275 @@
+"""
+Versioned schema migrations for the notification databases.
+
+Each database has an ordered list of migrations. A migration is a version
+number, a description and a list of steps; a step is either a SQL string
+or a callable that receives the writer connection. Applied versions are
+recorded in a schema_migrations table inside the same database, so every
+migration runs exactly once per file and inside a single transaction.
+"""
+
+import logging
+import sqlite3
+from typing import Callable, Dict, List, Tuple, Union
+
+from db_pool import get_pool
+from disclosure_analytics import install_analytics_rollups, record_snapshot
+
+logger = logging.getLogger(__name__)
+
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+Migration = Tuple[int, str, List[Step]]
+
+# RBI and SEBI ingest write dates as "DD-MM-YYYY"; this turns one into a sortable
+# "YYYY-MM-DD" (already-ISO values pass through, anything else becomes '')
+DMY_DATE_TO_ISO = """
+    CASE
+        WHEN {col} GLOB '[0-9][0-9]-[0-9][0-9]-[0-9][0-9][0-9][0-9]'
+            THEN substr({col}, 7, 4) || '-' || substr({col}, 4, 2) || '-' || substr({col}, 1, 2)
+        WHEN {col} GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+            THEN substr({col}, 1, 10)
+        ELSE ''
+    END
+"""
+
+# Indexes the list endpoints depend on, on tables that ingest jobs replace
+# wholesale (dropping the index with the old table); ensure_indexes puts
+# them back whenever they are found missing
+REQUIRED_INDEXES: Dict[str, Dict[str, str]] = {
+    "notifications": {
+        "idx_dailylogs_linked_date_srno": """
+            CREATE INDEX IF NOT EXISTS idx_dailylogs_linked_date_srno
+            ON DailyLogs (Date DESC, SrNo ASC)
+            WHERE Link IS NOT NULL AND Link != 'NIL'
+        """,
+    },
+}
+
+MIGRATIONS: Dict[str, List[Migration]] = {
+    "notifications": [
+        (1, "Partial index for linked alerts ordered newest first", [
+            REQUIRED_INDEXES["notifications"]["idx_dailylogs_linked_date_srno"],
+        ]),
+        (2, "Refresh planner statistics", [
+            "ANALYZE DailyLogs",
+        ]),
+    ],
+    "sebi": [
+        (1, "Index excel summaries in listing order", [
+            """
+            CREATE INDEX IF NOT EXISTS idx_excel_summaries_date_row
+            ON excel_summaries (date_key DESC, row_index ASC)
+            """,
+        ]),
+        (2, "Refresh planner statistics", [
+            "ANALYZE excel_summaries",
+        ]),
+    ],
+    "rbi": [
+        (1, "Partial index for non-empty summaries ordered newest first", [
+            "DROP INDEX IF EXISTS idx_master_summaries_run_date_id",
+            """
+            CREATE INDEX IF NOT EXISTS idx_master_summaries_listed_run_date
+            ON master_summaries (run_date DESC, id ASC)
+            WHERE NOT (pdf_link = 'NIL' AND summary = 'NIL')
+            """,
+        ]),
+        (2, "Refresh planner statistics", [
+            "ANALYZE master_summaries",
+        ]),
+        (3, "Normalized ISO run date maintained on ingest", [
+            "ALTER TABLE master_summaries ADD COLUMN run_date_iso TEXT NOT NULL DEFAULT ''",
+            "UPDATE master_summaries SET run_date_iso = " + DMY_DATE_TO_ISO.format(col="run_date"),
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_master_summaries_run_date_iso_insert
+            AFTER INSERT ON master_summaries
+            BEGIN
+                UPDATE master_summaries SET run_date_iso = """ + DMY_DATE_TO_ISO.format(col="NEW.run_date") + """
+                WHERE id = NEW.id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_master_summaries_run_date_iso_update
+            AFTER UPDATE OF run_date ON master_summaries
+            BEGIN
+                UPDATE master_summaries SET run_date_iso = """ + DMY_DATE_TO_ISO.format(col="NEW.run_date") + """
+                WHERE id = NEW.id;
+            END
+            """,
+            "DROP INDEX IF EXISTS idx_master_summaries_listed_run_date",
+            """
+            CREATE INDEX IF NOT EXISTS idx_master_summaries_listed_run_date_iso
+            ON master_summaries (run_date_iso DESC, id ASC)
+            WHERE NOT (pdf_link = 'NIL' AND summary = 'NIL')
+            """,
+            "ANALYZE master_summaries",
+        ]),
+    ],
+    "disclosures": [
+        (1, "Catalog of director disclosure documents", [
+            """
+            CREATE TABLE IF NOT EXISTS disclosures (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                filename TEXT NOT NULL UNIQUE,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                din TEXT NOT NULL DEFAULT 'N/A',
+                director_name TEXT NOT NULL,
+                classification TEXT NOT NULL,
+                text TEXT,
+                error TEXT,
+                indexed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+        ]),
+        (2, "Disclosure analytics rollups and daily snapshots", [
+            install_analytics_rollups,
+            record_snapshot,
+        ]),
+        (3, "Rendered disclosure text keyed by content hash", [
+            """
+            CREATE TABLE IF NOT EXISTS rendered_disclosures (
+                content_hash TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                tables TEXT NOT NULL,
+                rendered_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            # The catalog no longer reads disclosures.text; it is emptied rather than
+            # dropped because DROP COLUMN needs SQLite 3.35
+            "UPDATE disclosures SET text = NULL WHERE text IS NOT NULL",
+        ]),
+    ],
+    "jobs": [
+        (1, "Background job queue", [
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                done INTEGER NOT NULL DEFAULT 0,
+                total INTEGER NOT NULL DEFAULT 0,
+                message TEXT,
+                error TEXT,
+                result_name TEXT,
+                result_type TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                worker_pid INTEGER,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                expires_at REAL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_jobs_expires ON jobs (expires_at) WHERE expires_at IS NOT NULL",
+        ]),
+    ],
+}
+
+# Databases owned by the server itself, created on first start instead of skipped
+CREATE_IF_MISSING = {"disclosures", "jobs"}
+
+
+def ensure_migrations_table(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(conn: sqlite3.Connection) -> List[dict]:
+    """List the migrations recorded in a database, oldest first"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'"
+    ).fetchone()
+    if not exists:
+        return []
+    rows = conn.execute(
+        "SELECT version, description, applied_at FROM schema_migrations ORDER BY version"
+    ).fetchall()
+    return [{'version': row[0], 'description': row[1], 'applied_at': row[2]} for row in rows]
+
+
+def run_migrations(pool, migrations: List[Migration]) -> List[int]:
+    """Apply every pending migration to the pool's database and return the new versions"""
+    applied = []
+    with pool.write() as conn:
+        ensure_migrations_table(conn)
+        done = {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+
+    for version, description, steps in sorted(migrations, key=lambda m: m[0]):
+        if version in done:
+            continue
+        try:
+            with pool.write() as conn:
+                # DDL is autocommitted by sqlite3 unless a transaction is already open
+                conn.execute("BEGIN")
+                for step in steps:
+                    if callable(step):
+                        step(conn)
+                    else:
+                        conn.execute(step)
+                conn.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (?, ?)",
+                    (version, description)
+                )
+        except sqlite3.Error as e:
+            # Later migrations may depend on this one, so stop here
+            logger.error(f"Migration {pool.name} v{version} ({description}) failed: {e}")
+            break
+        logger.info(f"Applied migration {pool.name} v{version}: {description}")
+        applied.append(version)
+    return applied
+
+
+def missing_indexes(conn: sqlite3.Connection, indexes: Dict[str, str]) -> List[str]:
+    """Names of the given indexes that do not exist in the database"""
+    placeholders = ",".join("?" for _ in indexes)
+    present = {row[0] for row in conn.execute(
+        f"SELECT name FROM sqlite_master WHERE type = 'index' AND name IN ({placeholders})", list(indexes)
+    )}
+    return [name for name in indexes if name not in present]
+
+
+def ensure_indexes(pool, indexes: Dict[str, str]) -> List[str]:
+    """Recreate any of the given indexes (name -> CREATE INDEX) missing from the pool's database
+
+    Returns the names recreated. An index whose table does not exist yet is
+    skipped and tried again on the next call.
+    """
+    with pool.read() as conn:
+        if not missing_indexes(conn, indexes):
+            return []
+    created = []
+    with pool.write() as conn:
+        # Another thread may have recreated them while we waited for the writer
+        for name in missing_indexes(conn, indexes):
+            try:
+                conn.execute(indexes[name])
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Could not create index {name} in {pool.name}: {e}")
+                continue
+            logger.info(f"Recreated missing index {name} in {pool.name}")
+            created.append(name)
+    return created
+
+
+def migrate_all() -> Dict[str, List[int]]:
+    """Run pending migrations for every database that has them and whose file exists
+
+    Databases in CREATE_IF_MISSING are created by their first migration.
+    """
+    results = {}
+    for name, migrations in MIGRATIONS.items():
+        pool = get_pool(name)
+        if not pool.exists() and name not in CREATE_IF_MISSING:
+            continue
+        results[name] = run_migrations(pool, migrations)
+    return results
@@ -0,0 +1,282 @@
+"""
+Shared SQLite connection pools for the databases in backend/public.
+
+Each database file gets one SQLitePool. Readers reuse a long-lived
+connection per worker thread, writers are serialized through a single
+connection guarded by a lock, and every pool keeps simple counters that
+are exposed through /api/db-pool-stats.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public")
+
+# Logical database name -> file inside backend/public
+DB_FILES = {
+    "notifications": "notifications.db",
+    "rbi": "rbi.db",
+    "sebi": "sebi_excel_master.db",
+    "email": "email_data.db",
+    "directors": "directors.db",
+    "places": "places.db",
+    "visits": "visits.db",
+    "disclosures": "disclosures.db",
+    "jobs": "jobs.db",
+    # Cross-regulator queries run against notifications.db with the others attached
+    "federated": "notifications.db",
+}
+
+# Logical database name -> {schema alias: file inside backend/public} to ATTACH on connect
+DB_ATTACHMENTS = {
+    "federated": {
+        "rbi": "rbi.db",
+        "sebi": "sebi_excel_master.db",
+    },
+}
+
+# Pragmas applied to every new connection; override with SQLITE_PRAGMAS="key=value;key=value"
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": "5000",
+    "cache_size": "-8000",
+    "temp_store": "MEMORY",
+    "mmap_size": "67108864",
+}
+
+
+def _env_pragmas() -> Dict[str, str]:
+    """Merge SQLITE_PRAGMAS from the environment over the default pragmas"""
+    pragmas = dict(DEFAULT_PRAGMAS)
+    raw = os.getenv("SQLITE_PRAGMAS", "")
+    for item in raw.split(";"):
+        if "=" in item:
+            key, value = item.split("=", 1)
+            pragmas[key.strip()] = value.strip()
+    return pragmas
+
+
+class SQLitePool:
+    """Per-thread read connections plus one serialized writer for a single database file"""
+
+    def __init__(self, name: str, path: str, pool_size: int = 4,
+                 pragmas: Optional[Dict[str, str]] = None, timeout: float = 30.0,
+                 attachments: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.path = path
+        self.pool_size = pool_size
+        self.pragmas = dict(pragmas if pragmas is not None else DEFAULT_PRAGMAS)
+        self.timeout = timeout
+        self.attachments = dict(attachments or {})
+
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._reader_slots = threading.BoundedSemaphore(pool_size)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._monitor = None
+        self._monitor_inode = None
+        self._monitor_lock = threading.Lock()
+
+        self._stats = {
+            "connections_opened": 0,
+            "reads": 0,
+            "writes": 0,
+            "write_errors": 0,
+            "read_wait_seconds": 0.0,
+            "write_wait_seconds": 0.0,
+        }
+        self._stats_lock = threading.Lock()
+
+    def _bump(self, key: str, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _connect(self, read_only: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        for key, value in self.pragmas.items():
+            try:
+                conn.execute(f"PRAGMA {key}={value}")
+            except sqlite3.DatabaseError as e:
+                logger.warning(f"Could not apply PRAGMA {key}={value} on {self.name}: {e}")
+        for alias, path in self.attachments.items():
+            conn.execute("ATTACH DATABASE ? AS " + alias, (path,))
+        if read_only:
+            conn.execute("PRAGMA query_only=1")
+        self._bump("connections_opened")
+        return conn
+
+    def exists(self) -> bool:
+        """Whether the underlying database file and every attached file are present"""
+        # ATTACH would silently create an empty file, so never connect without them
+        return os.path.exists(self.path) and all(os.path.exists(p) for p in self.attachments.values())
+
+    def version(self) -> tuple:
+        """Token that changes whenever any connection commits to the database file
+
+        Combines the file's identity and mtime (catching a replaced file) with
+        PRAGMA data_version from a dedicated monitor connection (catching
+        every commit, including WAL commits that leave the main file alone).
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return (0,)
+        with self._monitor_lock:
+            if self._monitor is None or self._monitor_inode != st.st_ino:
+                if self._monitor is not None:
+                    self._monitor.close()
+                self._monitor = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+                self._monitor_inode = st.st_ino
+            data_version = self._monitor.execute("PRAGMA data_version").fetchone()[0]
+        return (st.st_ino, st.st_mtime_ns, st.st_size, data_version)
+
+    @contextmanager
+    def read(self):
+        """Yield this thread's read-only connection"""
+        started = time.perf_counter()
+        self._reader_slots.acquire()
+        self._bump("read_wait_seconds", time.perf_counter() - started)
+        try:
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._connect(read_only=True)
+                self._local.conn = conn
+                with self._readers_lock:
+                    self._readers.append(conn)
+            self._bump("reads")
+            try:
+                yield conn
+            finally:
+                # Never leave a read transaction open on a pooled connection
+                if conn.in_transaction:
+                    conn.rollback()
+        finally:
+            self._reader_slots.release()
+
+    @contextmanager
+    def write(self):
+        """Yield the single writer connection; commits on success, rolls back on error"""
+        started = time.perf_counter()
+        self._writer_lock.acquire()
+        self._bump("write_wait_seconds", time.perf_counter() - started)
+        try:
+            if self._writer is None:
+                self._writer = self._connect(read_only=False)
+            conn = self._writer
+            self._bump("writes")
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                self._bump("write_errors")
+                conn.rollback()
+                raise
+        finally:
+            self._writer_lock.release()
+
+    def stats(self) -> dict:
+        """Snapshot of pool counters for operators"""
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        with self._readers_lock:
+            snapshot["open_read_connections"] = len(self._readers)
+        snapshot["read_wait_seconds"] = round(snapshot["read_wait_seconds"], 6)
+        snapshot["write_wait_seconds"] = round(snapshot["write_wait_seconds"], 6)
+        snapshot["writer_open"] = self._writer is not None
+        snapshot["pool_size"] = self.pool_size
+        snapshot["path"] = os.path.basename(self.path)
+        if self.attachments:
+            snapshot["attached"] = {alias: os.path.basename(p) for alias, p in self.attachments.items()}
+        snapshot["pragmas"] = self.pragmas
+        return snapshot
+
+    def close(self):
+        """Close every connection owned by this pool"""
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        # Thread-local handles now point at closed connections; start fresh
+        self._local = threading.local()
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._monitor_lock:
+            if self._monitor is not None:
+                self._monitor.close()
+                self._monitor = None
+
+
+_pools: Dict[str, SQLitePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str) -> SQLitePool:
+    """Return the shared pool for a logical database name, creating it on first use"""
+    pool = _pools.get(name)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            if name not in DB_FILES:
+                raise KeyError(f"Unknown database: {name}")
+            pool = SQLitePool(
+                name,
+                os.path.join(PUBLIC_DIR, DB_FILES[name]),
+                pool_size=int(os.getenv("SQLITE_POOL_SIZE", "4")),
+                pragmas=_env_pragmas(),
+                timeout=float(os.getenv("SQLITE_POOL_TIMEOUT", "30")),
+                attachments={
+                    alias: os.path.join(PUBLIC_DIR, filename)
+                    for alias, filename in DB_ATTACHMENTS.get(name, {}).items()
+                },
+            )
+            _pools[name] = pool
+        return pool
+
+
+def pool_stats() -> Dict[str, dict]:
+    """Statistics for every pool that has been opened"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.stats() for pool in pools}
+
+
+def close_all_pools():
+    """Close all pools, used on application shutdown"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+# Pools inherited by a forked child, kept referenced so their handles are never closed from the child
+_inherited_pools = []
+
+
+def _forget_pools_in_child():
+    # SQLite connections must not be used across fork; the child opens its own on first use
+    global _pools, _pools_lock
+    _inherited_pools.extend(_pools.values())
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_pools_in_child)
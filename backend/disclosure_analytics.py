@@ -0,0 +1,134 @@
+"""
+Materialized analytics for the disclosure catalog in disclosures.db.
+
+Counts by classification, by modification month and by director are kept
+in small rollup tables that triggers on the disclosures table update as the
+catalog sync adds, re-indexes or removes documents, so the analytics
+endpoint reads a handful of rows. After every sync that changes the
+catalog, the current analytics are also saved as the snapshot for the day,
+which is what the endpoint's as_of parameter reads.
+"""
+
+import json
+import logging
+from datetime import date, datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Rollup table -> (key column, SQL expression for the key evaluated against NEW/OLD/disclosures)
+ROLLUPS = {
+    "disclosure_type_counts": ("disclosure_type", "{row}.classification"),
+    "disclosure_month_counts": ("month", "strftime('%Y-%m', {row}.mtime_ns / 1000000000, 'unixepoch', 'localtime')"),
+    "disclosure_director_counts": ("director", "{row}.director_name"),
+}
+
+TOP_DIRECTORS = 10
+
+
+def _increment(row: str) -> str:
+    return "\n".join(
+        f"INSERT INTO {table} ({column}, count) VALUES ({key.format(row=row)}, 1) "
+        f"ON CONFLICT({column}) DO UPDATE SET count = count + 1;"
+        for table, (column, key) in ROLLUPS.items()
+    )
+
+
+def _decrement(row: str) -> str:
+    statements = []
+    for table, (column, key) in ROLLUPS.items():
+        statements.append(f"UPDATE {table} SET count = count - 1 WHERE {column} = {key.format(row=row)};")
+        statements.append(f"DELETE FROM {table} WHERE {column} = {key.format(row=row)} AND count <= 0;")
+    return "\n".join(statements)
+
+
+def install_analytics_rollups(conn):
+    """Create and backfill the rollup tables and install their maintenance triggers"""
+    for table, (column, key) in ROLLUPS.items():
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {column} TEXT PRIMARY KEY,
+                count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(f"""
+            INSERT INTO {table} ({column}, count)
+            SELECT {key.format(row='disclosures')}, COUNT(*)
+            FROM disclosures
+            GROUP BY 1
+        """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_disclosures_analytics_insert
+        AFTER INSERT ON disclosures
+        BEGIN
+        {_increment('NEW')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_disclosures_analytics_delete
+        AFTER DELETE ON disclosures
+        BEGIN
+        {_decrement('OLD')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_disclosures_analytics_update
+        AFTER UPDATE OF classification, mtime_ns, director_name ON disclosures
+        BEGIN
+        {_decrement('OLD')}
+        {_increment('NEW')}
+        END
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS disclosure_analytics_snapshots (
+            snapshot_date TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            taken_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def read_analytics(conn) -> dict:
+    """Current analytics in the shape of DisclosureAnalyticsResponse"""
+    total = sum(row[0] for row in conn.execute("SELECT count FROM disclosure_type_counts"))
+    by_type = conn.execute(
+        "SELECT disclosure_type, count FROM disclosure_type_counts ORDER BY count DESC, disclosure_type"
+    ).fetchall()
+    by_month = [
+        (datetime.strptime(month, '%Y-%m').strftime('%b %Y'), count)
+        for month, count in conn.execute("SELECT month, count FROM disclosure_month_counts")
+    ]
+    by_director = conn.execute(
+        "SELECT director, count FROM disclosure_director_counts ORDER BY count DESC, director LIMIT ?",
+        (TOP_DIRECTORS,)
+    ).fetchall()
+    return {
+        'total_disclosures': total,
+        'by_type': [{'type': k, 'count': v} for k, v in by_type],
+        'by_month': [{'month': k, 'count': v} for k, v in sorted(by_month)],
+        'by_director': [{'director': k, 'count': v} for k, v in by_director],
+    }
+
+
+def record_snapshot(conn, snapshot_date: Optional[str] = None):
+    """Save the current analytics as the snapshot for a day (today by default)"""
+    conn.execute("""
+        INSERT INTO disclosure_analytics_snapshots (snapshot_date, payload) VALUES (?, ?)
+        ON CONFLICT(snapshot_date) DO UPDATE SET payload = excluded.payload, taken_at = CURRENT_TIMESTAMP
+    """, (snapshot_date or date.today().isoformat(), json.dumps(read_analytics(conn))))
+
+
+def read_snapshot(conn, as_of: str) -> Optional[dict]:
+    """Analytics as they stood at the end of a day, from the latest snapshot on or before it"""
+    row = conn.execute("""
+        SELECT snapshot_date, payload FROM disclosure_analytics_snapshots
+        WHERE snapshot_date <= ?
+        ORDER BY snapshot_date DESC
+        LIMIT 1
+    """, (as_of,)).fetchone()
+    if row is None:
+        return None
+    analytics = json.loads(row[1])
+    analytics['snapshot_date'] = row[0]
+    return analytics
@@ -0,0 +1,412 @@
+"""
+Persistent catalog of the Word documents in "Directors Discloser Output".
+
+Every .docx is scanned once and its metadata (DIN, director name,
+classification) is stored in disclosures.db. A sync
+compares each file's size and mtime with the catalog and only re-hashes
+files whose stats changed; only files whose content hash changed are
+parsed again. Listing disclosures is then a single query on the catalog.
+
+Rendered text is stored separately, keyed by content hash, the first time
+a document's content is requested, so identical documents share one
+rendering and it survives renames and reindexing.
+
+A row's id names one version of one document: ids never shift when other
+files come and go, and a file whose content changes is re-inserted under
+a new id, so anything served for an id can be cached indefinitely.
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from docx import Document as DocxDocument
+
+from docx_scan import iter_paragraph_texts, SCAN_ERRORS
+from disclosure_analytics import record_snapshot, ROLLUPS as ANALYTICS_ROLLUPS
+from worker_processes import worker_context
+
+logger = logging.getLogger(__name__)
+
+DISCLOSURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public", "Directors Discloser Output")
+
+DIN_PATTERN = re.compile(r'DIN\s*:\s*([0-9]{8})', re.IGNORECASE)
+
+# Keywords checked in order against the opening paragraphs; the first hit wins
+CLASSIFICATION_KEYWORDS = [
+    ("Shareholding", ("shareholding", "shares")),
+    ("Transaction", ("transaction", "acquisition")),
+    ("Interest", ("interest", "concern")),
+]
+DEFAULT_CLASSIFICATION = "MBP-1"
+CLASSIFY_PARAGRAPHS = 15
+
+# Modification-month bucket of a catalog row, shared with the analytics rollups
+MONTH_KEY = ANALYTICS_ROLLUPS["disclosure_month_counts"][1]
+
+# Fewer changed files than this are parsed inline rather than in a process pool
+PARALLEL_THRESHOLD = 8
+# Parsed documents are committed to the catalog in batches of this size
+SYNC_BATCH_SIZE = 200
+
+# Serializes syncs so concurrent requests do not parse the same files twice
+_sync_lock = threading.Lock()
+
+
+def is_disclosure_file(filename: str) -> bool:
+    return filename.endswith('.docx') and not filename.startswith('~$')
+
+
+def director_name_from_filename(filename: str) -> str:
+    return filename.replace('_MBP.docx', '').replace('.docx', '').strip()
+
+
+def stream_sha256(f: BinaryIO) -> str:
+    digest = hashlib.sha256()
+    for block in iter(lambda: f.read(1024 * 1024), b''):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def file_sha256(file_path: str) -> str:
+    with open(file_path, 'rb') as f:
+        return stream_sha256(f)
+
+
+def iter_file(f: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Yield an open file's remaining bytes in chunks, closing it at the end"""
+    try:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            yield block
+    finally:
+        f.close()
+
+
+def classify_text(text: str) -> Optional[str]:
+    """Classification label for one paragraph, or None if it has no keyword"""
+    text = text.lower()
+    for label, keywords in CLASSIFICATION_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return label
+    return None
+
+
+def classify_paragraphs(paragraphs: List[str]) -> str:
+    """Classify a disclosure from the text of its first 15 paragraphs"""
+    for text in paragraphs[:CLASSIFY_PARAGRAPHS]:
+        label = classify_text(text)
+        if label:
+            return label
+    return DEFAULT_CLASSIFICATION
+
+
+def scan_metadata(paragraphs: Iterable[str]) -> Dict[str, str]:
+    """Find the DIN and classification in a stream of paragraph texts
+
+    Stops pulling paragraphs as soon as the DIN is found and the
+    classification is settled, so a lazy source is read only that far.
+    """
+    din, classification = None, None
+    for idx, text in enumerate(paragraphs):
+        if classification is None and idx < CLASSIFY_PARAGRAPHS:
+            classification = classify_text(text)
+        if din is None:
+            din_match = DIN_PATTERN.search(text.strip())
+            if din_match:
+                din = din_match.group(1)
+        if din is not None and (classification is not None or idx >= CLASSIFY_PARAGRAPHS - 1):
+            break
+    return {'din': din or 'N/A', 'classification': classification or DEFAULT_CLASSIFICATION}
+
+
+def document_header(filename: str) -> str:
+    return f"Document: {filename}\n" + "=" * 80 + "\n\n"
+
+
+def render_document_body(paragraphs: List[str], tables: List[List[List[str]]]) -> str:
+    """Plain-text rendering of a disclosure's paragraphs and tables, below the header"""
+    content_parts = []
+    for text in paragraphs:
+        if text.strip():
+            content_parts.append(text + "\n")
+    if tables:
+        content_parts.append("\n" + "=" * 80 + "\n")
+        content_parts.append("TABLES\n")
+        content_parts.append("=" * 80 + "\n\n")
+        for idx, rows in enumerate(tables):
+            content_parts.append(f"Table {idx + 1}:\n")
+            for cells in rows:
+                content_parts.append(" | ".join(cells) + "\n")
+            content_parts.append("\n")
+    return "".join(content_parts)
+
+
+def render_disclosure(source):
+    """Rendered body text and table cells of a disclosure (a path or binary file), read through python-docx"""
+    doc = DocxDocument(source)
+    paragraphs = [para.text for para in doc.paragraphs]
+    tables = [
+        [[cell.text.strip() for cell in row.cells] for row in table.rows]
+        for table in doc.tables
+    ]
+    return render_document_body(paragraphs, tables), tables
+
+
+def extract_disclosure(file_path: str) -> Dict[str, str]:
+    """Catalog metadata for one document
+
+    Metadata comes from streaming word/document.xml, falling back to
+    python-docx for files that are not a plain docx package.
+    """
+    try:
+        return scan_metadata(iter_paragraph_texts(file_path))
+    except SCAN_ERRORS:
+        doc = DocxDocument(file_path)
+        return scan_metadata(para.text for para in doc.paragraphs)
+
+
+def load_rendered(pool, record: dict, f: BinaryIO) -> Dict[str, object]:
+    """Rendered content and tables of an opened disclosure, rendering from f on first use
+
+    Renderings are keyed by content hash, so a hit is one primary-key read.
+    """
+    with pool.read() as conn:
+        row = conn.execute(
+            "SELECT body, tables FROM rendered_disclosures WHERE content_hash = ?",
+            (record['content_hash'],)
+        ).fetchone()
+    if row is not None:
+        body, tables = row[0], json.loads(row[1])
+    else:
+        body, tables = render_disclosure(f)
+        with pool.write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO rendered_disclosures (content_hash, body, tables) VALUES (?, ?, ?)",
+                (record['content_hash'], body, json.dumps(tables))
+            )
+    return {'content': document_header(record['filename']) + body, 'tables': tables}
+
+
+def default_workers() -> int:
+    return int(os.getenv("DISCLOSURE_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+
+
+def _extract_worker(file_path: str):
+    # Runs in a worker process: report failures instead of raising across the pool
+    try:
+        return file_path, extract_disclosure(file_path), None
+    except Exception as e:
+        return file_path, None, str(e)
+
+
+def extract_many(file_paths: List[str], workers: Optional[int] = None) -> Iterator[tuple]:
+    """Parse many documents and yield (file_path, record, error) as each one completes
+
+    Batches of PARALLEL_THRESHOLD files or more are fanned out across a
+    process pool, since python-docx parsing is pure Python and holds the
+    GIL; smaller batches are parsed inline. A worker that dies fails only
+    the files it had not returned yet.
+    """
+    workers = workers or default_workers()
+    if workers <= 1 or len(file_paths) < PARALLEL_THRESHOLD:
+        for file_path in file_paths:
+            yield _extract_worker(file_path)
+        return
+
+    # Syncs run from request and watcher threads, so workers must not be forked from this process
+    with ProcessPoolExecutor(max_workers=min(workers, len(file_paths)), mp_context=worker_context()) as executor:
+        futures = {executor.submit(_extract_worker, file_path): file_path for file_path in file_paths}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # BrokenProcessPool and the like
+                yield futures[future], None, str(e)
+
+
+def _write_parsed(pool, rows: List[tuple]):
+    """Store freshly parsed documents; rows are (replace, insert values)"""
+    with pool.write() as conn:
+        for replace, values in rows:
+            if replace:
+                # Changed content gets a fresh id rather than an in-place update
+                conn.execute("DELETE FROM disclosures WHERE filename = ?", (values[0],))
+                conn.execute("""
+                    INSERT INTO disclosures
+                        (filename, size, mtime_ns, content_hash, din, director_name, classification, error)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, values)
+            else:
+                # Forced re-extraction of unchanged content keeps its id
+                conn.execute("""
+                    UPDATE disclosures SET
+                        size = ?, mtime_ns = ?, content_hash = ?, din = ?, director_name = ?,
+                        classification = ?, error = ?, indexed_at = CURRENT_TIMESTAMP
+                    WHERE filename = ?
+                """, values[1:] + values[:1])
+
+
+def sync_catalog(pool, directory: str = DISCLOSURES_DIR, only: Optional[Set[str]] = None,
+                 force: bool = False, workers: Optional[int] = None) -> Dict[str, int]:
+    """Bring the catalog in line with the files on disk and return what changed
+
+    With only, just those file names are checked (as reported by the
+    directory watcher) instead of the whole directory. With force, every
+    file is parsed again even if its content is unchanged. Parsed documents
+    are written in batches as they stream back from the extraction pool.
+    """
+    with _sync_lock:
+        with pool.read() as conn:
+            known = {
+                row[0]: (row[1], row[2], row[3])
+                for row in conn.execute("SELECT filename, size, mtime_ns, content_hash FROM disclosures")
+            }
+
+        filenames = sorted(f for f in os.listdir(directory) if is_disclosure_file(f)) if os.path.isdir(directory) else []
+        if only is not None:
+            filenames = [f for f in filenames if f in only]
+            known = {name: value for name, value in known.items() if name in only}
+        to_parse, touched = {}, []
+        counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+
+        for filename in filenames:
+            file_path = os.path.join(directory, filename)
+            try:
+                st = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            previous = known.get(filename)
+            if not force and previous and previous[0] == st.st_size and previous[1] == st.st_mtime_ns:
+                counts['unchanged'] += 1
+                continue
+
+            content_hash = file_sha256(file_path)
+            if previous and previous[2] == content_hash:
+                if force:
+                    to_parse[file_path] = (filename, st, content_hash, False)
+                else:
+                    # Touched but identical content: refresh the stats only
+                    touched.append((st.st_size, st.st_mtime_ns, filename))
+                counts['unchanged'] += 1
+                continue
+
+            to_parse[file_path] = (filename, st, content_hash, True)
+            counts['updated' if previous else 'added'] += 1
+
+        batch = []
+        for file_path, record, error in extract_many(list(to_parse), workers):
+            filename, st, content_hash, replace = to_parse[file_path]
+            if error is not None:
+                logger.warning(f"Error reading disclosure {filename}: {error}")
+                record = {'din': 'N/A', 'classification': DEFAULT_CLASSIFICATION}
+            batch.append((replace, (
+                filename, st.st_size, st.st_mtime_ns, content_hash, record['din'],
+                director_name_from_filename(filename), record['classification'], error
+            )))
+            if len(batch) >= SYNC_BATCH_SIZE:
+                _write_parsed(pool, batch)
+                batch = []
+
+        present = set(filenames)
+        removed = [(name,) for name in known if name not in present]
+        counts['removed'] = len(removed)
+
+        if batch or touched or removed:
+            if batch:
+                _write_parsed(pool, batch)
+            with pool.write() as conn:
+                conn.executemany(
+                    "UPDATE disclosures SET size = ?, mtime_ns = ? WHERE filename = ?", touched
+                )
+                conn.executemany("DELETE FROM disclosures WHERE filename = ?", removed)
+        if to_parse or touched or removed:
+            with pool.write() as conn:
+                record_snapshot(conn)
+                # Drop renderings no catalogued document refers to any more
+                conn.execute("""
+                    DELETE FROM rendered_disclosures
+                    WHERE content_hash NOT IN (SELECT content_hash FROM disclosures)
+                """)
+            logger.info(f"Disclosure catalog synced: {counts}")
+        return counts
+
+
+def list_disclosures(conn) -> List[tuple]:
+    """Catalog rows (id, filename, director_name, din, mtime_ns, classification) in filename order"""
+    return conn.execute("""
+        SELECT id, filename, director_name, din, mtime_ns, classification
+        FROM disclosures
+        ORDER BY filename
+    """).fetchall()
+
+
+def select_disclosures(conn, ids: Optional[List[int]] = None, director: Optional[str] = None,
+                       month: Optional[str] = None) -> List[tuple]:
+    """Catalog rows (id, filename) matching every given criterion, in filename order
+
+    director matches the director name case-insensitively and month is a
+    YYYY-MM of the file's modification time, as bucketed by the analytics.
+    """
+    clauses, params = [], []
+    if ids:
+        clauses.append(f"id IN ({','.join('?' for _ in ids)})")
+        params.extend(ids)
+    if director:
+        clauses.append("director_name = ? COLLATE NOCASE")
+        params.append(director)
+    if month:
+        clauses.append(f"{MONTH_KEY.format(row='disclosures')} = ?")
+        params.append(month)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return conn.execute(f"SELECT id, filename FROM disclosures {where} ORDER BY filename", params).fetchall()
+
+
+def _lookup(pool, disclosure_id: int) -> Optional[dict]:
+    with pool.read() as conn:
+        row = conn.execute("""
+            SELECT id, filename, size, mtime_ns, content_hash, error
+            FROM disclosures
+            WHERE id = ?
+        """, (disclosure_id,)).fetchone()
+    if row is None:
+        return None
+    return dict(zip(('id', 'filename', 'size', 'mtime_ns', 'content_hash', 'error'), row))
+
+
+def open_disclosure(pool, disclosure_id: int, directory: str = DISCLOSURES_DIR,
+                    verify: bool = True) -> Optional[Tuple[dict, BinaryIO]]:
+    """Open a disclosure by id and return (record, binary file)
+
+    Returns None if the id is unknown or its file no longer holds the
+    content the id names. The check runs on the opened handle, so everything
+    read from it is that version even if the path is replaced afterwards: a
+    handle whose size and mtime match the catalog is used as is, and one that
+    was only touched is re-hashed. The record also carries the absolute
+    file_path. Pass verify=False when a directory watcher keeps the catalog
+    current, to skip resyncing when the file has moved on.
+    """
+    record = _lookup(pool, disclosure_id)
+    if record is None:
+        return None
+    record['file_path'] = os.path.join(directory, record['filename'])
+    try:
+        f = open(record['file_path'], 'rb')
+    except FileNotFoundError:
+        f = None
+    if f is not None:
+        st = os.fstat(f.fileno())
+        if st.st_size == record['size'] and st.st_mtime_ns == record['mtime_ns']:
+            return record, f
+        if st.st_size == record['size'] and stream_sha256(f) == record['content_hash']:
+            f.seek(0)
+            return record, f
+        f.close()
+    # The file moved on since it was indexed, so this id no longer names it
+    if verify:
+        sync_catalog(pool, directory)
+    return None
@@ -0,0 +1,70 @@
+"""
+Streaming reader for the body paragraphs of a .docx file.
+
+Opens word/document.xml straight from the zip archive and walks it with
+iterparse, yielding the text of each top-level paragraph as soon as its
+closing tag is read. The text matches python-docx's Paragraph.text (runs
+and hyperlinks, tabs and line breaks), without building the document
+object model, so callers can stop reading once they have what they need.
+"""
+
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Iterator
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+DOCUMENT_PART = "word/document.xml"
+
+BODY = W + "body"
+PARAGRAPH = W + "p"
+RUN = W + "r"
+HYPERLINK = W + "hyperlink"
+BREAK = W + "br"
+BREAK_TYPE = W + "type"
+
+# Run children that contribute text, other than w:t and w:br
+RUN_TEXT = {
+    W + "tab": "\t",
+    W + "ptab": "\t",
+    W + "cr": "\n",
+    W + "noBreakHyphen": "-",
+}
+
+# Errors meaning the file is not a readable docx package
+SCAN_ERRORS = (zipfile.BadZipFile, KeyError, ET.ParseError)
+
+
+def _run_child_text(elem) -> str:
+    if elem.tag == W + "t":
+        return elem.text or ""
+    if elem.tag == BREAK:
+        # Page and column breaks carry no text, like python-docx
+        return "\n" if elem.get(BREAK_TYPE, "textWrapping") == "textWrapping" else ""
+    return RUN_TEXT.get(elem.tag, "")
+
+
+def iter_paragraph_texts(file_path: str) -> Iterator[str]:
+    """Yield the text of each paragraph directly under w:body, in document order"""
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open(DOCUMENT_PART) as part:
+            stack = []
+            parts = []
+            for event, elem in ET.iterparse(part, events=("start", "end")):
+                if event == "start":
+                    stack.append(elem.tag)
+                    continue
+                stack.pop()
+                depth = len(stack)
+                # stack now holds the ancestors of elem: [document, body, p, (hyperlink,) r]
+                if depth >= 3 and stack[1] == BODY and stack[2] == PARAGRAPH:
+                    parent = stack[-1]
+                    inner = stack[3:-1]
+                    if parent == RUN and inner in ([], [HYPERLINK]):
+                        parts.append(_run_child_text(elem))
+                elif depth == 2 and stack[1] == BODY:
+                    if elem.tag == PARAGRAPH:
+                        yield "".join(parts)
+                    parts = []
+                    # Body children are finished with; free their subtrees
+                    elem.clear()
@@ -0,0 +1,169 @@
+"""
+In-memory cache of parsed Excel sheets.
+
+Parsing a workbook through openpyxl is the slowest thing the server does,
+so parsed DataFrames are kept in an LRU bounded by their memory footprint.
+Entries are keyed by (path, sheet) and validated against the file's mtime
+and size, so an edited workbook is re-parsed on the next request. Threads
+that miss on the same sheet at the same time share a single parse.
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# infer_dtype results for object columns holding numbers and text side by side
+MIXED_DTYPES = ("mixed", "mixed-integer")
+
+
+def normalize_sheet(df: pd.DataFrame) -> pd.DataFrame:
+    """Give a parsed sheet the shape both read paths serve it in
+
+    Column names become strings, and mixed cell types (numbers and text in
+    one column) become text, as Arrow needs one type per column. The
+    sidecars are built from the same frame, so a cell has the same value and
+    sorts the same way whether it comes from a sidecar or a parsed sheet.
+    """
+    df = df.copy()
+    df.columns = [str(c) for c in df.columns]
+    for column in df.columns:
+        if df[column].dtype == object and pd.api.types.infer_dtype(df[column], skipna=True) in MIXED_DTYPES:
+            df[column] = df[column].map(lambda v: v if pd.isna(v) else str(v))
+    return df
+
+
+def _frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class WorkbookCache:
+    """LRU of parsed, normalized sheets; cached DataFrames are shared and must not be mutated"""
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._inflight: Dict[Tuple[str, str, int, int], Future] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    def load(self, file_path: str, sheet_name: str) -> pd.DataFrame:
+        """Return the parsed sheet, reading the workbook only if it changed since the last parse"""
+        path = os.path.abspath(file_path)
+        st = os.stat(path)
+        key = (path, sheet_name)
+        signature = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+            future = self._inflight.get(key + signature)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                owner = False
+            else:
+                self._stats["misses"] += 1
+                future = Future()
+                self._inflight[key + signature] = future
+                owner = True
+
+        if not owner:
+            return future.result()
+
+        try:
+            df = normalize_sheet(pd.read_excel(path, sheet_name=sheet_name))
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(df)
+            self._store(key, signature, df)
+            return df
+        finally:
+            with self._lock:
+                self._inflight.pop(key + signature, None)
+
+    def _store(self, key, signature, df: pd.DataFrame):
+        nbytes = _frame_bytes(df)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[2]
+            if nbytes > self.max_bytes:
+                logger.info(f"Not caching {key[0]} [{key[1]}]: {nbytes} bytes exceeds the cache size")
+                return
+            self._entries[key] = (signature, df, nbytes)
+            self._size += nbytes
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted[2]
+                self._stats["evictions"] += 1
+
+    def invalidate(self, file_path: Optional[str] = None):
+        """Drop cached sheets of one workbook, or of every workbook when no path is given"""
+        path = os.path.abspath(file_path) if file_path else None
+        with self._lock:
+            for key in [k for k in self._entries if path is None or k[0] == path]:
+                self._size -= self._entries.pop(key)[2]
+
+    def stats(self) -> dict:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["entries"] = len(self._entries)
+            snapshot["bytes"] = self._size
+            snapshot["sheets"] = [
+                {"file": os.path.basename(path), "sheet": sheet, "bytes": entry[2]}
+                for (path, sheet), entry in self._entries.items()
+            ]
+        snapshot["max_bytes"] = self.max_bytes
+        return snapshot
+
+
+def create_workbook_cache() -> WorkbookCache:
+    """Build the application cache, sized from EXCEL_CACHE_MAX_BYTES"""
+    return WorkbookCache(max_bytes=int(os.getenv("EXCEL_CACHE_MAX_BYTES", str(128 * 1024 * 1024))))
+
+
+def cell_matches(values: pd.Series, text: str) -> pd.Series:
+    """Which cells of a column contain text, case-insensitively, in their text form
+
+    Shared by the parse cache and the Arrow sidecars so a filter selects the
+    same rows on both paths.
+    """
+    return values.astype("string").str.contains(text, case=False, regex=False, na=False)
+
+
+def query_frame(df: pd.DataFrame, filters: List[Tuple[str, str]], sort: List[Tuple[str, bool]],
+                columns: Optional[List[str]], offset: int, limit: Optional[int]):
+    """Filter, sort, project and slice a cached sheet; returns (page, rows matching the filters)
+
+    Same semantics as excel_sidecar.query_table, and never modifies the cached frame.
+    """
+    if filters:
+        mask = pd.Series(True, index=df.index)
+        for column, text in filters:
+            mask &= cell_matches(df[column], text).to_numpy(dtype=bool)
+        df = df[mask]
+    if sort:
+        df = df.sort_values(
+            by=[column for column, _ in sort],
+            ascending=[not desc for _, desc in sort],
+            kind="stable",
+            na_position="last",
+        )
+    total = len(df)
+    if columns:
+        df = df[columns]
+    end = offset + limit if limit is not None else None
+    return df.iloc[offset:end], total
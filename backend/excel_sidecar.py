@@ -0,0 +1,216 @@
+"""
+Columnar sidecars for the Excel workbooks in backend/public/excel.
+
+A background converter parses each workbook once and writes every sheet to
+an uncompressed Arrow IPC file under public/excel/.columnar. The source
+workbook's mtime and size are stored in the sidecar's schema metadata, so
+a sidecar is only used while it matches the workbook on disk. Reads
+memory-map the sidecar, which keeps openpyxl off the request path and
+makes column projection and row slicing close to free.
+
+pyarrow is optional: without it no sidecars are written and callers fall
+back to parsing the workbook.
+"""
+
+import os
+import queue
+import hashlib
+import logging
+import threading
+import urllib.parse
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from excel_cache import cell_matches, normalize_sheet
+
+logger = logging.getLogger(__name__)
+
+EXCEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public", "excel")
+SIDECAR_DIR = os.path.join(EXCEL_DIR, ".columnar")
+WORKBOOK_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
+
+# Schema metadata keys tying a sidecar to the workbook it was built from
+SOURCE_MTIME_KEY = b"source_mtime_ns"
+SOURCE_SIZE_KEY = b"source_size"
+
+
+def _sidecar_prefix(file_path: str) -> str:
+    """File name prefix shared by the sidecars of one workbook
+
+    Workbooks with the same name in different directories get different
+    prefixes through a digest of the directory path.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    digest = hashlib.sha1(directory.encode("utf-8")).hexdigest()[:12]
+    return f"{digest}.{os.path.basename(file_path)}."
+
+
+def sidecar_path(file_path: str, sheet_name: str) -> str:
+    """Sidecar file for one sheet of a workbook"""
+    name = _sidecar_prefix(file_path) + urllib.parse.quote(str(sheet_name), safe="") + ".arrow"
+    return os.path.join(SIDECAR_DIR, name)
+
+
+def convert_workbook(file_path: str) -> List[str]:
+    """Write a sidecar for every sheet of a workbook and return the sheet names"""
+    st = os.stat(file_path)
+    metadata = {SOURCE_MTIME_KEY: str(st.st_mtime_ns).encode(), SOURCE_SIZE_KEY: str(st.st_size).encode()}
+    sheets = pd.read_excel(file_path, sheet_name=None)
+    os.makedirs(SIDECAR_DIR, exist_ok=True)
+
+    for sheet_name, df in sheets.items():
+        table = pa.Table.from_pandas(normalize_sheet(df), preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+        target = sidecar_path(file_path, sheet_name)
+        tmp = target + ".tmp"
+        with pa.OSFile(tmp, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        # Readers that still map the previous sidecar keep a valid view of it
+        os.replace(tmp, target)
+    return [str(name) for name in sheets]
+
+
+def remove_sidecars(file_path: str):
+    """Delete every sidecar generated from a workbook"""
+    prefix = _sidecar_prefix(file_path)
+    if not os.path.isdir(SIDECAR_DIR):
+        return
+    for name in os.listdir(SIDECAR_DIR):
+        if name.startswith(prefix) and name.endswith(".arrow"):
+            try:
+                os.remove(os.path.join(SIDECAR_DIR, name))
+            except FileNotFoundError:
+                pass
+
+
+def is_workbook_file(filename: str) -> bool:
+    return filename.lower().endswith(WORKBOOK_EXTENSIONS) and not filename.startswith("~$")
+
+
+def read_sidecar(file_path: str, sheet_name: str):
+    """Memory-map a sheet's sidecar as an Arrow table, or None if it is missing or stale"""
+    if pa is None:
+        return None
+    path = sidecar_path(file_path, sheet_name)
+    try:
+        st = os.stat(file_path)
+        # The table's buffers keep the mapping alive after the file is closed
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+    metadata = table.schema.metadata or {}
+    if (metadata.get(SOURCE_MTIME_KEY) != str(st.st_mtime_ns).encode()
+            or metadata.get(SOURCE_SIZE_KEY) != str(st.st_size).encode()):
+        return None
+    return table
+
+
+class SidecarConverter:
+    """Single background thread that (re)builds sidecars for queued workbooks"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {"converted": 0, "failed": 0}
+        self._errors: Dict[str, str] = {}
+
+    @property
+    def available(self) -> bool:
+        return pa is not None
+
+    def schedule(self, file_path: str):
+        """Queue a workbook for conversion unless it is already waiting"""
+        if pa is None:
+            return
+        path = os.path.abspath(file_path)
+        with self._lock:
+            if path in self._pending:
+                return
+            self._pending.add(path)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="excel-sidecars", daemon=True)
+                self._thread.start()
+        self._queue.put(path)
+
+    def scan(self, directory: str = EXCEL_DIR):
+        """Queue every workbook in a directory whose sidecars are missing or stale"""
+        if pa is None or not os.path.isdir(directory):
+            return
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not is_workbook_file(name):
+                continue
+            if not self.is_fresh(path):
+                self.schedule(path)
+
+    def is_fresh(self, file_path: str) -> bool:
+        """Whether every sheet of a workbook has an up-to-date sidecar"""
+        prefix = _sidecar_prefix(file_path)
+        if not os.path.isdir(SIDECAR_DIR):
+            return False
+        sheets = [
+            urllib.parse.unquote(name[len(prefix):-len(".arrow")])
+            for name in os.listdir(SIDECAR_DIR)
+            if name.startswith(prefix) and name.endswith(".arrow")
+        ]
+        return bool(sheets) and all(read_sidecar(file_path, sheet) is not None for sheet in sheets)
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            with self._lock:
+                self._pending.discard(path)
+            try:
+                if os.path.exists(path):
+                    sheets = convert_workbook(path)
+                    logger.info(f"Wrote columnar sidecars for {os.path.basename(path)}: {sheets}")
+                    with self._lock:
+                        self._stats["converted"] += 1
+                        self._errors.pop(path, None)
+            except Exception as e:
+                logger.error(f"Sidecar conversion failed for {path}: {e}")
+                with self._lock:
+                    self._stats["failed"] += 1
+                    self._errors[path] = str(e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["pending"] = len(self._pending)
+            snapshot["errors"] = {os.path.basename(p): e for p, e in self._errors.items()}
+        snapshot["available"] = self.available
+        return snapshot
+
+
+def query_table(table, filters: List[Tuple[str, str]], sort: List[Tuple[str, bool]],
+                columns: Optional[List[str]], offset: int, limit: Optional[int]):
+    """Filter, sort, project and slice a sidecar table; returns (page, rows matching the filters)
+
+    Each filter is a (column, text) pair matched as a case-insensitive
+    substring of the cell's text; sort is a list of (column, descending).
+    Filtered columns are matched through excel_cache.cell_matches, so a cell
+    is rendered as the same text whether it comes from a sidecar or a parsed sheet.
+    """
+    if filters:
+        mask = np.ones(table.num_rows, dtype=bool)
+        for column, text in filters:
+            mask &= cell_matches(table[column].to_pandas(), text).to_numpy(dtype=bool)
+        table = table.filter(pa.array(mask))
+    if sort:
+        table = table.sort_by([(column, "descending" if desc else "ascending") for column, desc in sort])
+    total = table.num_rows
+    if columns:
+        table = table.select(columns)
+    table = table.slice(offset, limit) if limit is not None else table.slice(offset)
+    return table, total
@@ -1,12 +1,14 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse, Response
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, validator
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import os
-import pandas as pd
 import json
+import base64
+import gzip
 import logging
 from dotenv import load_dotenv
 import asyncio
@@ -17,7 +19,28 @@ import urllib.parse
 from datetime import datetime
 from typing import Union
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from docx import Document as DocxDocument
+from db_pool import get_pool, pool_stats, close_all_pools
+from bse_rollups import ensure_bse_rollups
+from feed_rollups import FEED_ROLLUPS, ensure_feed_rollup
+from db_migrations import migrate_all, applied_versions, ensure_indexes, DMY_DATE_TO_ISO, REQUIRED_INDEXES
+from search_index import SEARCH_SOURCES, ensure_search_index, build_match_query, search_source
+from response_cache import create_response_cache, etag_matches
+from excel_cache import create_workbook_cache, query_frame
+from excel_sidecar import SidecarConverter, read_sidecar, query_table, remove_sidecars, is_workbook_file, EXCEL_DIR
+from disclosure_catalog import (
+    sync_catalog, list_disclosures, open_disclosure, load_rendered, select_disclosures, iter_file,
+    is_disclosure_file, DISCLOSURES_DIR
+)
+from fs_watcher import create_directory_watcher
+from disclosure_analytics import read_analytics, read_snapshot
+from zip_stream import stream_zip, archive_size
+from minutes_templates import (
+    TemplateCache, template_path, placeholder_values, is_template_file, batch_entries, create_rendered_cache,
+    create_render_pool, TEMPLATES_DIR, DOCX_MEDIA_TYPE, BATCH_LIMIT
+)
+from minutes_archive import create_minutes_archive
+from job_queue import create_job_workers, submit_job, get_job, cancel_job, SUCCEEDED, JOB_RESULTS_DIR
+from document_jobs import JOB_HANDLERS
 
 # Load environment variables
 load_dotenv()
@@ -29,6 +52,15 @@ logger = logging.getLogger(__name__)
 # Initialize FastAPI app
 app = FastAPI(title="Financial Data API", version="1.0.0", docs_url="/api/docs", redoc_url="/api/redoc")
 
+# Server-side response cache with ETag revalidation for read-only GET endpoints.
+# Registered before CORS so cached and 304 responses still get CORS headers.
+response_cache = create_response_cache()
+
+@app.middleware("http")
+async def response_cache_middleware(request: Request, call_next):
+    # ETags read database versions, so they share the endpoints' thread pool
+    return await response_cache.handle(request, call_next, thread_pool)
+
 # Add CORS middleware with more permissive settings
 app.add_middleware(
     CORSMiddleware,
@@ -47,6 +79,7 @@ class ExcelDataResponse(BaseModel):
     data: List[Dict[str, Any]]
     columns: List[str]
     count: int
+    total: int
 
 
 
@@ -63,6 +96,48 @@ class SEBIExcelSummary(BaseModel):
 class SEBIAnalysisDataResponse(BaseModel):
     data: List[SEBIExcelSummary]
     count: int
+    next_cursor: Optional[str] = None
+
+# Add Pydantic models for full-text search
+class SearchHit(BaseModel):
+    source: str
+    id: Optional[int]
+    date: Optional[str]
+    entity_name: Optional[str] = None
+    nature: Optional[str] = None
+    pdf_link: Optional[str]
+    snippet: str
+    score: float
+    relevance: float
+
+class SearchResponse(BaseModel):
+    query: str
+    data: List[SearchHit]
+    count: int
+    by_source: Dict[str, int]
+
+# Add Pydantic models for the cross-regulator notification feed
+class FeedItem(BaseModel):
+    source: str
+    id: Optional[int]
+    date: Optional[str]
+    entity_name: Optional[str] = None
+    nature: Optional[str] = None
+    summary: Optional[str]
+    pdf_link: Optional[str]
+
+class FeedMonth(BaseModel):
+    month: str
+    bse: int
+    sebi: int
+    rbi: int
+    total: int
+
+class NotificationFeedResponse(BaseModel):
+    data: List[FeedItem]
+    next_cursor: Optional[str] = None
+    totals: Dict[str, int]
+    monthly: List[FeedMonth]
 
 # Add Pydantic model for BSE alerts data
 class BSEAlertsDataResponse(BaseModel):
@@ -131,62 +206,300 @@ class DisclosuresResponse(BaseModel):
 
 class DisclosureContentResponse(BaseModel):
     content: str
+    tables: Optional[List[List[List[str]]]] = None
 
 class DisclosureAnalyticsResponse(BaseModel):
     total_disclosures: int
     by_type: List[Dict[str, Any]]
     by_month: List[Dict[str, Any]]
     by_director: List[Dict[str, Any]]
+    snapshot_date: Optional[str] = None
+
+class DisclosureBundleRequest(BaseModel):
+    ids: Optional[List[int]] = None
+    director: Optional[str] = None
+    month: Optional[str] = None
+
+class JobStatusResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    done: int
+    total: int
+    message: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int
+    cancel_requested: bool
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    expires_at: Optional[str] = None
+    result_url: Optional[str] = None
+
+
+
 
 
+# Keyset pagination helpers
+def encode_cursor(values: List[Any]) -> str:
+    """Encode the sort key of the last returned row into an opaque cursor"""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
 
+# Accepted cursor value type for a numeric key column
+CURSOR_NUMBER = (int, float)
+
+# Largest page the list endpoints return; the dashboards fetch up to 1000 rows at once
+MAX_PAGE_SIZE = 10000
+
+def decode_cursor(cursor: str, types: Tuple[Any, ...]) -> List[Any]:
+    """Decode a cursor produced by encode_cursor, rejecting anything malformed
+
+    types holds the accepted type (or tuple of types) of each key column, in order.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    for value, expected in zip(values, types):
+        # bool is an int subclass but never a key column value
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return values
+
+def validate_iso_date(value: Optional[str], name: str) -> Optional[str]:
+    """Check that an optional query parameter is a YYYY-MM-DD date"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be a date in YYYY-MM-DD format")
+
+def init_bse_rollups():
+    """Build the BSE count rollups in notifications.db if they are missing"""
+    pool = get_pool("notifications")
+    if not pool.exists():
+        return
+    try:
+        ensure_bse_rollups(pool)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not build BSE rollups: {e}")
+
+def init_feed_rollups():
+    """Build the SEBI and RBI monthly count rollups for every source database that exists"""
+    for source in FEED_ROLLUPS.values():
+        pool = get_pool(source["database"])
+        if not pool.exists():
+            continue
+        try:
+            ensure_feed_rollup(pool, source)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not build {source['rollup']}: {e}")
+
+def init_required_indexes():
+    """Recreate list indexes that an ingest job dropped along with their table"""
+    for name, indexes in REQUIRED_INDEXES.items():
+        pool = get_pool(name)
+        if not pool.exists():
+            continue
+        try:
+            ensure_indexes(pool, indexes)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not check indexes of {name}: {e}")
+
+def init_search_indexes():
+    """Build the full-text search indexes for every source database that exists"""
+    for source in SEARCH_SOURCES.values():
+        pool = get_pool(source["database"])
+        if not pool.exists():
+            continue
+        try:
+            ensure_search_index(pool, source)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not build search index {source['fts']}: {e}")
 
+def init_disclosure_catalog():
+    """Index new or changed director disclosure documents into the catalog"""
+    try:
+        sync_catalog(get_pool("disclosures"))
+    except Exception as e:
+        logger.warning(f"Could not sync disclosure catalog: {e}")
+
+# Watch the document directories so read endpoints never rescan them
+fs_watcher = create_directory_watcher()
+minutes_templates = TemplateCache()
+minutes_archive = create_minutes_archive()
+rendered_minutes = create_rendered_cache()
+render_pool = create_render_pool()
+
+# Worker processes for long-running document jobs
+job_workers = create_job_workers(JOB_HANDLERS)
+
+def on_disclosures_changed(names):
+    sync_catalog(get_pool("disclosures"), only=names)
+
+def rescan_disclosures():
+    sync_catalog(get_pool("disclosures"))
+
+def on_workbooks_changed(names):
+    for name in names:
+        file_path = os.path.join(EXCEL_DIR, name)
+        workbook_cache.invalidate(file_path)
+        if os.path.exists(file_path):
+            excel_sidecars.schedule(file_path)
+        else:
+            remove_sidecars(file_path)
+
+def rescan_workbooks():
+    workbook_cache.invalidate()
+    excel_sidecars.scan()
+
+def on_templates_changed(names):
+    for name in names:
+        minutes_templates.invalidate(os.path.join(TEMPLATES_DIR, name))
+
+def rescan_templates():
+    minutes_templates.invalidate()
+
+def init_fs_watcher():
+    """Start watching disclosures, workbooks and meeting templates
+
+    Waits until the watches are in place, so the full scans that follow at
+    startup cannot miss a change made in between.
+    """
+    fs_watcher.watch(DISCLOSURES_DIR, on_disclosures_changed, include=is_disclosure_file, rescan=rescan_disclosures)
+    fs_watcher.watch(EXCEL_DIR, on_workbooks_changed, include=is_workbook_file, rescan=rescan_workbooks)
+    fs_watcher.watch(TEMPLATES_DIR, on_templates_changed, include=is_template_file, rescan=rescan_templates)
+    fs_watcher.start()
+    if fs_watcher.wait_ready():
+        # The catalog now changes only through the watcher, so its listing can be revalidated by ETag
+        response_cache.routes["/api/directors-disclosures"] = ["disclosures"]
+        response_cache.routes["/api/directors-disclosures/analytics"] = ["disclosures"]
 
 # Initialize visits database
 def init_visits_db():
     """Initialize the visits database with a visits table"""
-    db_path = os.path.join(os.path.dirname(__file__), "public", "visits.db")
+    pool = get_pool("visits")
     
     # Create database and table if they don't exist
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Create visits table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS visits (
-            id INTEGER PRIMARY KEY,
-            count INTEGER DEFAULT 0,
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+    with pool.write() as conn:
+        cursor = conn.cursor()
     
-    # Initialize with a default row if table is empty
-    cursor.execute("SELECT COUNT(*) FROM visits")
-    if cursor.fetchone()[0] == 0:
-        cursor.execute("INSERT INTO visits (count) VALUES (0)")
+        # Create visits table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS visits (
+                id INTEGER PRIMARY KEY,
+                count INTEGER DEFAULT 0,
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
     
-    conn.commit()
-    conn.close()
+        # Initialize with a default row if table is empty
+        cursor.execute("SELECT COUNT(*) FROM visits")
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("INSERT INTO visits (count) VALUES (0)")
 
 # Call init_visits_db on startup
 @app.on_event("startup")
 async def startup_event():
     init_visits_db()
+    migrate_all()
+    init_required_indexes()
+    job_workers.start()
+    init_bse_rollups()
+    init_feed_rollups()
+    init_search_indexes()
+    init_fs_watcher()
+    excel_sidecars.scan()
+    init_disclosure_catalog()
+    minutes_archive.collect()
+
+# Close pooled SQLite connections on shutdown
+@app.on_event("shutdown")
+async def shutdown_event():
+    fs_watcher.stop()
+    job_workers.stop()
+    render_pool.shutdown()
+    close_all_pools()
+
+# Add endpoint to expose SQLite connection pool statistics
+@app.get("/api/db-pool-stats")
+async def get_db_pool_stats():
+    """Get statistics for every open SQLite connection pool"""
+    return {"pools": pool_stats()}
+
+# Add endpoint to expose response cache statistics
+@app.get("/api/response-cache-stats")
+async def get_response_cache_stats():
+    """Get hit, miss and revalidation counters for the response cache"""
+    return response_cache.stats()
+
+# Add endpoint to expose parsed workbook cache statistics
+@app.get("/api/excel-cache-stats")
+async def get_excel_cache_stats():
+    """Get hit, miss and coalesced-parse counters for the Excel workbook cache"""
+    return {**workbook_cache.stats(), "sidecars": excel_sidecars.stats()}
+
+# Add endpoint to expose directory watcher status
+@app.get("/api/fs-watcher-stats")
+async def get_fs_watcher_stats():
+    """Get the backend, event and dispatch counters of the directory watcher"""
+    return fs_watcher.stats()
+
+# Add endpoint to expose compiled minutes template statistics
+@app.get("/api/minutes-template-stats")
+async def get_minutes_template_stats():
+    """Get counters for the compiled minutes templates, the generated minutes cache and the archive"""
+    return {
+        **minutes_templates.stats(),
+        "rendered": rendered_minutes.stats(),
+        "render_pool": render_pool.stats(),
+        "archive": minutes_archive.stats()
+    }
+
+# Add endpoint to expose background job queue status
+@app.get("/api/job-queue-stats")
+async def get_job_queue_stats():
+    """Get job counts by status and the state of the job worker processes"""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(thread_pool, job_workers.stats)
+
+# Add endpoint to list applied schema migrations per database
+@app.get("/api/schema-versions")
+async def get_schema_versions():
+    """Get the schema migrations recorded in each migrated database"""
+    def fetch_versions():
+        versions = {}
+        for name in ("notifications", "rbi", "sebi", "disclosures"):
+            pool = get_pool(name)
+            if not pool.exists():
+                continue
+            with pool.read() as conn:
+                versions[name] = applied_versions(conn)
+        return versions
+    
+    loop = asyncio.get_event_loop()
+    versions = await loop.run_in_executor(thread_pool, fetch_versions)
+    
+    return {"databases": versions}
 
 # Add endpoint to get visit count
 @app.get("/visits/count", response_model=VisitCountResponse)
 async def get_visit_count():
     """Get the current visit count"""
     try:
-        db_path = os.path.join(os.path.dirname(__file__), "public", "visits.db")
+        pool = get_pool("visits")
         
         def fetch_visit_count():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT count FROM visits WHERE id = 1")
-            result = cursor.fetchone()
-            conn.close()
-            return result[0] if result else 0
+            with pool.read() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT count FROM visits WHERE id = 1")
+                result = cursor.fetchone()
+                return result[0] if result else 0
         
         loop = asyncio.get_event_loop()
         count = await loop.run_in_executor(thread_pool, fetch_visit_count)
@@ -205,21 +518,19 @@ async def get_visit_count():
 async def increment_visit_count():
     """Increment the visit count by 1"""
     try:
-        db_path = os.path.join(os.path.dirname(__file__), "public", "visits.db")
+        pool = get_pool("visits")
         
         def update_visit_count():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("UPDATE visits SET count = count + 1, last_updated = CURRENT_TIMESTAMP WHERE id = 1")
-            conn.commit()
+            with pool.write() as conn:
+                cursor = conn.cursor()
+                cursor.execute("UPDATE visits SET count = count + 1, last_updated = CURRENT_TIMESTAMP WHERE id = 1")
             
-            # Get the new count
-            cursor.execute("SELECT count FROM visits WHERE id = 1")
-            result = cursor.fetchone()
-            new_count = result[0] if result else 0
+                # Get the new count
+                cursor.execute("SELECT count FROM visits WHERE id = 1")
+                result = cursor.fetchone()
+                new_count = result[0] if result else 0
             
-            conn.close()
-            return new_count
+                return new_count
         
         loop = asyncio.get_event_loop()
         new_count = await loop.run_in_executor(thread_pool, update_visit_count)
@@ -234,11 +545,53 @@ async def increment_visit_count():
         logger.error(f"Error incrementing visit count: {error_message}")
         raise HTTPException(status_code=500, detail=f"Failed to increment visit count: {error_message}")
 
-async def read_excel_sheet(file_path: str, sheet_name: str):
-    """Read a specific sheet from an Excel file asynchronously using thread pool"""
-    loop = asyncio.get_event_loop()
-    func = partial(pd.read_excel, file_path, sheet_name=sheet_name)
-    return await loop.run_in_executor(thread_pool, func)
+# Parsed Excel sheets, reused until the workbook's mtime or size changes
+workbook_cache = create_workbook_cache()
+
+# Background conversion of workbooks into memory-mapped columnar sidecars
+excel_sidecars = SidecarConverter()
+
+def parse_excel_query(filters: Optional[List[str]], sort: Optional[str]):
+    """Parse filter=column:text values and a sort=col,-col spec for /excel-data"""
+    parsed_filters = []
+    for item in filters or []:
+        column, sep, text = item.partition(":")
+        if not sep or not column.strip():
+            raise HTTPException(status_code=400, detail="filter must be in column:text format")
+        parsed_filters.append((column.strip(), text))
+    parsed_sort = []
+    for item in (sort or "").split(","):
+        item = item.strip()
+        if item:
+            parsed_sort.append((item.lstrip("-"), item.startswith("-")))
+    return parsed_filters, parsed_sort
+
+def load_excel_page(file_path: str, sheet_name: str, columns: Optional[List[str]] = None,
+                    offset: int = 0, limit: Optional[int] = None,
+                    filters: Optional[List[Any]] = None, sort: Optional[List[Any]] = None):
+    """Filter, sort, project and slice a sheet, from its sidecar when it is current
+
+    Returns the page as a DataFrame and the number of rows matching the filters.
+    """
+    filters, sort = filters or [], sort or []
+    requested = (columns or []) + [c for c, _ in filters] + [c for c, _ in sort]
+
+    table = read_sidecar(file_path, sheet_name)
+    if table is not None:
+        missing = [c for c in requested if c not in table.column_names]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(missing)}")
+        page, total = query_table(table, filters, sort, columns, offset, limit)
+        return page.to_pandas(), total
+
+    # No current sidecar yet: parse the workbook and have it converted for next time
+    if excel_sidecars.available and not excel_sidecars.is_fresh(file_path):
+        excel_sidecars.schedule(file_path)
+    df = workbook_cache.load(file_path, sheet_name)
+    missing = [c for c in requested if c not in df.columns]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(missing)}")
+    return query_frame(df, filters, sort, columns, offset, limit)
 
 # NOTE: The root endpoint (/) is intentionally not defined here to allow
 # the React app to be served from the root path via static file serving.
@@ -254,9 +607,23 @@ async def health_check():
     }
 
 @app.get("/excel-data/{file_name}", response_model=ExcelDataResponse)
-async def get_excel_data(file_name: str, sheet_name: str = "Sheet1"):
-    """Get data from an Excel file"""
+async def get_excel_data(file_name: str, sheet_name: str = "Sheet1", columns: Optional[str] = None,
+                         limit: Optional[int] = None, offset: int = 0, sort: Optional[str] = None,
+                         filters: Optional[List[str]] = Query(None, alias="filter")):
+    """Get data from an Excel file
+
+    columns is a comma-separated list of column names to return; sort is a
+    comma-separated list of columns, each prefixed with '-' for descending;
+    every filter=column:text keeps rows whose cell contains text
+    (case-insensitive). limit and offset then select a slice of the result,
+    and total is the number of rows that matched the filters.
+    """
     try:
+        if (limit is not None and limit < 0) or offset < 0:
+            raise HTTPException(status_code=400, detail="limit and offset must be non-negative")
+        column_list = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+        filter_list, sort_list = parse_excel_query(filters, sort)
+        
         # Define the path to the Excel file in the public folder
         excel_folder = os.path.join(os.path.dirname(__file__), "public", "excel")
         file_path = os.path.join(excel_folder, file_name)
@@ -285,8 +652,10 @@ async def get_excel_data(file_name: str, sheet_name: str = "Sheet1"):
                 if not os.path.exists(file_path):
                     raise HTTPException(status_code=404, detail=f"Excel file {file_name} not found")
         
-        # Read the Excel file asynchronously
-        df = await read_excel_sheet(file_path, sheet_name)
+        # Read the requested slice asynchronously
+        loop = asyncio.get_event_loop()
+        func = partial(load_excel_page, file_path, sheet_name, column_list, offset, limit, filter_list, sort_list)
+        df, total = await loop.run_in_executor(thread_pool, func)
         
         # Convert to list of dictionaries
         data = df.to_dict('records')
@@ -295,149 +664,265 @@ async def get_excel_data(file_name: str, sheet_name: str = "Sheet1"):
         return ExcelDataResponse(
             data=data,
             columns=columns,
-            count=len(data)
+            count=len(data),
+            total=total
         )
+    except HTTPException:
+        raise
     except Exception as e:
         error_message = str(e)
         logger.error(f"Error reading Excel file {file_name}: {error_message}")
         raise HTTPException(status_code=500, detail=f"Failed to read Excel file: {error_message}")
 
+def fetch_bse_alerts_page(conn, limit: int, offset: int = 0, cursor_values: Optional[List[Any]] = None):
+    """Fetch one page of linked DailyLogs rows ordered newest first
+
+    Rows are (SrNo, EntityName, Link, Nature, Summary, Date, rowid). When
+    cursor_values holds the (Date, SrNo, rowid) of the previous page's last
+    row the query seeks straight past it instead of skipping with OFFSET.
+
+    DailyLogs has no INTEGER PRIMARY KEY, so rowid only breaks ties between
+    rows with the same Date and SrNo. A VACUUM or an ingest that replaces
+    the table renumbers rows, and a cursor issued before one may then skip or
+    repeat rows within such a tie.
+    """
+    # Only include records where Link is not NULL and not 'NIL'
+    if cursor_values:
+        last_date, last_srno, last_rowid = cursor_values
+        return conn.execute("""
+            SELECT SrNo, EntityName, Link, Nature, Summary, Date, rowid 
+            FROM DailyLogs 
+            WHERE Link IS NOT NULL AND Link != 'NIL'
+            AND Date <= ?
+            AND (Date < ? OR (Date = ? AND (SrNo > ? OR (SrNo = ? AND rowid > ?))))
+            ORDER BY Date DESC, SrNo ASC, rowid ASC 
+            LIMIT ?
+        """, (last_date, last_date, last_date, last_srno, last_srno, last_rowid, limit)).fetchall()
+    return conn.execute("""
+        SELECT SrNo, EntityName, Link, Nature, Summary, Date, rowid 
+        FROM DailyLogs 
+        WHERE Link IS NOT NULL AND Link != 'NIL'
+        ORDER BY Date DESC, SrNo ASC, rowid ASC 
+        LIMIT ? OFFSET ?
+    """, (limit, offset)).fetchall()
+
 # Add a new endpoint for BSE alerts data
 @app.get("/bse-alerts", response_model=SEBIAnalysisDataResponse)
-async def get_bse_alerts_data(limit: int = 100, offset: int = 0):
+async def get_bse_alerts_data(limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0),
+                              cursor: Optional[str] = None):
     """Get BSE alerts data from the notifications database"""
     try:
+        # A cursor carries the (Date, SrNo, rowid) of the last row already seen
+        cursor_values = decode_cursor(cursor, (str, CURSOR_NUMBER, int)) if cursor else None
+        
         # Define path to the notifications database file
-        db_path = os.path.join(os.path.dirname(__file__), "public", "notifications.db")
+        pool = get_pool("notifications")
         
         # Check if database file exists
-        if not os.path.exists(db_path):
+        if not pool.exists():
             raise HTTPException(status_code=404, detail="BSE alerts database file not found")
         
         # Connect to the database and fetch data
         def fetch_bse_data():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # First, get the total count of records that match our criteria
-            cursor.execute("""
-                SELECT COUNT(*) 
-                FROM DailyLogs 
-                WHERE Link IS NOT NULL AND Link != 'NIL'
-            """)
-            total_count = cursor.fetchone()[0]
-            
-            # Fetch data from DailyLogs table with limit and offset for pagination
-            # Only include records where Link is not NULL and not 'NIL'
-            cursor.execute("""
-                SELECT SrNo, EntityName, Link, Nature, Summary, Date 
-                FROM DailyLogs 
-                WHERE Link IS NOT NULL AND Link != 'NIL'
-                ORDER BY Date DESC, SrNo ASC 
-                LIMIT ? OFFSET ?
-            """, (limit, offset))
-            
-            rows = cursor.fetchall()
-            
-            # Get column names
-            column_names = [description[0] for description in cursor.description]
-            
-            # Convert to list of dictionaries
-            data = []
-            for row in rows:
-                # Create a dictionary with the expected keys for the frontend
-                record = dict(zip(column_names, row))
+            ensure_indexes(pool, REQUIRED_INDEXES["notifications"])
+            with pool.read() as conn:
+                cursor = conn.cursor()
+            
+                # First, get the total count of records that match our criteria
+                cursor.execute("""
+                    SELECT COUNT(*) 
+                    FROM DailyLogs 
+                    WHERE Link IS NOT NULL AND Link != 'NIL'
+                """)
+                total_count = cursor.fetchone()[0]
+            
+                # Fetch data from DailyLogs table, seeking past the cursor when one is given
+                rows = fetch_bse_alerts_page(conn, limit + 1, offset, cursor_values)
+            
+                # The extra row only tells us whether another page exists
+                next_cursor = None
+                if len(rows) > limit:
+                    rows = rows[:limit]
+                    last = rows[-1]
+                    next_cursor = encode_cursor([last[5], last[0], last[6]])
+            
+                # Column names (rowid is only used for the cursor)
+                column_names = ['SrNo', 'EntityName', 'Link', 'Nature', 'Summary', 'Date']
+            
+                # Convert to list of dictionaries
+                data = []
+                for row in rows:
+                    # Create a dictionary with the expected keys for the frontend
+                    record = dict(zip(column_names, row[:6]))
                 
-                # Rename keys to match the frontend expectations
-                record['id'] = record.pop('SrNo', None)
-                record['date_key'] = record.pop('Date', '')
-                record['row_index'] = record.pop('SrNo', 0)  # Use SrNo as row_index
-                record['pdf_link'] = record.pop('Link', '')
-                record['summary'] = record.pop('Summary', '')
-                record['inserted_at'] = record.pop('Date', '')  # Use Date as inserted_at
-                # Preserve EntityName and Nature for BSE alerts
-                if 'EntityName' in record:
-                    record['entity_name'] = record.pop('EntityName')
-                else:
-                    record['entity_name'] = None
-                if 'Nature' in record:
-                    record['nature'] = record.pop('Nature')
-                else:
-                    record['nature'] = None
+                    # Rename keys to match the frontend expectations
+                    record['id'] = record.pop('SrNo', None)
+                    record['date_key'] = record.pop('Date', '')
+                    record['row_index'] = record.pop('SrNo', 0)  # Use SrNo as row_index
+                    record['pdf_link'] = record.pop('Link', '')
+                    record['summary'] = record.pop('Summary', '')
+                    record['inserted_at'] = record.pop('Date', '')  # Use Date as inserted_at
+                    # Preserve EntityName and Nature for BSE alerts
+                    if 'EntityName' in record:
+                        record['entity_name'] = record.pop('EntityName')
+                    else:
+                        record['entity_name'] = None
+                    if 'Nature' in record:
+                        record['nature'] = record.pop('Nature')
+                    else:
+                        record['nature'] = None
                 
-                data.append(record)
+                    data.append(record)
             
-            conn.close()
-            return data, total_count
+                return data, total_count, next_cursor
         
         # Run the database operation in a thread pool
         loop = asyncio.get_event_loop()
-        data, total_count = await loop.run_in_executor(thread_pool, fetch_bse_data)
+        data, total_count, next_cursor = await loop.run_in_executor(thread_pool, fetch_bse_data)
         
         return SEBIAnalysisDataResponse(
             data=data,
-            count=total_count
+            count=total_count,
+            next_cursor=next_cursor
         )
+    except HTTPException:
+        raise
     except Exception as e:
         error_message = str(e)
         logger.error(f"Error fetching BSE alerts data: {error_message}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch BSE alerts data: {error_message}")
 
+# Rows read from SQLite per chunk of the streaming export
+BSE_EXPORT_BATCH_SIZE = 500
+
+@app.get("/bse-alerts/export")
+async def export_bse_alerts(format: str = "ndjson"):
+    """Stream every linked BSE alert as NDJSON or as a single JSON array"""
+    pool = get_pool("notifications")
+    
+    if not pool.exists():
+        raise HTTPException(status_code=404, detail="BSE alerts database file not found")
+    if format not in ("ndjson", "json"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'json'")
+    
+    def generate_chunks():
+        # Keyset batches keep memory flat and release the pooled connection between chunks
+        ensure_indexes(pool, REQUIRED_INDEXES["notifications"])
+        cursor_values = None
+        first = True
+        if format == "json":
+            yield "["
+        while True:
+            with pool.read() as conn:
+                rows = fetch_bse_alerts_page(conn, BSE_EXPORT_BATCH_SIZE, 0, cursor_values)
+            if not rows:
+                break
+            
+            records = [json.dumps({
+                'id': int(row[0]) if row[0] is not None else None,
+                'date_key': row[5] or '',
+                'row_index': int(row[0]) if row[0] is not None else 0,
+                'pdf_link': row[2],
+                'summary': row[4],
+                'inserted_at': row[5] or '',
+                'entity_name': row[1],
+                'nature': row[3]
+            }) for row in rows]
+            
+            if format == "json":
+                yield ("" if first else ",") + ",".join(records)
+            else:
+                yield "\n".join(records) + "\n"
+            first = False
+            
+            if len(rows) < BSE_EXPORT_BATCH_SIZE:
+                break
+            last = rows[-1]
+            cursor_values = [last[5], last[0], last[6]]
+        if format == "json":
+            yield "]"
+    
+    media_type = "application/json" if format == "json" else "application/x-ndjson"
+    return StreamingResponse(generate_chunks(), media_type=media_type)
+
 # Add endpoint for SEBI analysis data
 @app.get("/sebi-analysis-data", response_model=SEBIAnalysisDataResponse)
-async def get_sebi_excel_data(limit: int = 100, offset: int = 0):
+async def get_sebi_excel_data(limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0),
+                              cursor: Optional[str] = None):
     """Get SEBI analysis data from the SEBI database"""
     try:
+        # A cursor carries the (date_key, row_index) of the last row already seen
+        cursor_values = decode_cursor(cursor, (str, int)) if cursor else None
+        
         # Define the path to the SEBI database file
-        db_path = os.path.join(os.path.dirname(__file__), "public", "sebi_excel_master.db")
+        pool = get_pool("sebi")
         
         # Check if database file exists
-        if not os.path.exists(db_path):
+        if not pool.exists():
             raise HTTPException(status_code=404, detail="SEBI database file not found")
         
         # Connect to the database and fetch data
         def fetch_sebi_data():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # First, get the total count of records
-            cursor.execute("SELECT COUNT(*) FROM excel_summaries")
-            total_count = cursor.fetchone()[0]
-            
-            # Fetch data from excel_summaries table with limit and offset for pagination
-            cursor.execute("""
-                SELECT id, date_key, row_index, pdf_link, summary, inserted_at 
-                FROM excel_summaries 
-                ORDER BY date_key DESC, row_index ASC 
-                LIMIT ? OFFSET ?
-            """, (limit, offset))
-            
-            rows = cursor.fetchall()
-            
-            # Convert to list of dictionaries
-            data = []
-            for row in rows:
-                record = {
-                    'id': row[0],
-                    'date_key': row[1],
-                    'row_index': row[2],
-                    'pdf_link': row[3],
-                    'summary': row[4],
-                    'inserted_at': row[5]
-                }
-                data.append(record)
-            
-            conn.close()
-            return data, total_count
+            with pool.read() as conn:
+                cursor = conn.cursor()
+            
+                # First, get the total count of records
+                cursor.execute("SELECT COUNT(*) FROM excel_summaries")
+                total_count = cursor.fetchone()[0]
+            
+                # Fetch data from excel_summaries table, seeking past the cursor when one is given
+                if cursor_values:
+                    last_date_key, last_row_index = cursor_values
+                    cursor.execute("""
+                        SELECT id, date_key, row_index, pdf_link, summary, inserted_at 
+                        FROM excel_summaries 
+                        WHERE date_key <= ?
+                        AND (date_key < ? OR (date_key = ? AND row_index > ?))
+                        ORDER BY date_key DESC, row_index ASC 
+                        LIMIT ?
+                    """, (last_date_key, last_date_key, last_date_key, last_row_index, limit + 1))
+                else:
+                    cursor.execute("""
+                        SELECT id, date_key, row_index, pdf_link, summary, inserted_at 
+                        FROM excel_summaries 
+                        ORDER BY date_key DESC, row_index ASC 
+                        LIMIT ? OFFSET ?
+                    """, (limit + 1, offset))
+            
+                rows = cursor.fetchall()
+            
+                # The extra row only tells us whether another page exists
+                next_cursor = None
+                if len(rows) > limit:
+                    rows = rows[:limit]
+                    next_cursor = encode_cursor([rows[-1][1], rows[-1][2]])
+            
+                # Convert to list of dictionaries
+                data = []
+                for row in rows:
+                    record = {
+                        'id': row[0],
+                        'date_key': row[1],
+                        'row_index': row[2],
+                        'pdf_link': row[3],
+                        'summary': row[4],
+                        'inserted_at': row[5]
+                    }
+                    data.append(record)
+            
+                return data, total_count, next_cursor
         
         # Run the database operation in a thread pool
         loop = asyncio.get_event_loop()
-        data, total_count = await loop.run_in_executor(thread_pool, fetch_sebi_data)
+        data, total_count, next_cursor = await loop.run_in_executor(thread_pool, fetch_sebi_data)
         
         return SEBIAnalysisDataResponse(
             data=data,
-            count=total_count
+            count=total_count,
+            next_cursor=next_cursor
         )
+    except HTTPException:
+        raise
     except Exception as e:
         error_message = str(e)
         logger.error(f"Error fetching SEBI analysis data: {error_message}")
@@ -445,65 +930,102 @@ async def get_sebi_excel_data(limit: int = 100, offset: int = 0):
 
 # Add endpoint for RBI analysis data
 @app.get("/rbi-analysis-data", response_model=SEBIAnalysisDataResponse)
-async def get_rbi_excel_data(limit: int = 100, offset: int = 0):
-    """Get RBI analysis data from the RBI database"""
+async def get_rbi_excel_data(limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0),
+                             cursor: Optional[str] = None,
+                             start_date: Optional[str] = None, end_date: Optional[str] = None):
+    """Get RBI analysis data from the RBI database, optionally within an inclusive YYYY-MM-DD range"""
     try:
+        # A cursor carries the (run_date_iso, id) of the last row already seen
+        cursor_values = decode_cursor(cursor, (str, int)) if cursor else None
+        start_date = validate_iso_date(start_date, "start_date")
+        end_date = validate_iso_date(end_date, "end_date")
+        
         # Define the path to the RBI database file
-        db_path = os.path.join(os.path.dirname(__file__), "public", "rbi.db")
+        pool = get_pool("rbi")
         
         # Check if database file exists
-        if not os.path.exists(db_path):
+        if not pool.exists():
             raise HTTPException(status_code=404, detail="RBI database file not found")
         
+        # Only exclude records where both pdf_link and summary are 'NIL'
+        conditions = ["NOT (pdf_link = 'NIL' AND summary = 'NIL')"]
+        params = []
+        if start_date:
+            conditions.append("run_date_iso >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("run_date_iso <= ?")
+            params.append(end_date)
+        where = " AND ".join(conditions)
+        
         # Connect to the database and fetch data
         def fetch_rbi_data():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # First, get the total count of records that match our criteria
-            cursor.execute("""
-                SELECT COUNT(*) 
-                FROM master_summaries 
-                WHERE NOT (pdf_link = 'NIL' AND summary = 'NIL')
-            """)
-            total_count = cursor.fetchone()[0]
-            
-            # Fetch data from master_summaries table with limit and offset for pagination
-            # Only exclude records where both pdf_link and summary are 'NIL'
-            cursor.execute("""
-                SELECT id, run_date, pdf_link, summary, created_at 
-                FROM master_summaries 
-                WHERE NOT (pdf_link = 'NIL' AND summary = 'NIL')
-                ORDER BY run_date DESC, id ASC 
-                LIMIT ? OFFSET ?
-            """, (limit, offset))
-            
-            rows = cursor.fetchall()
-            
-            # Convert to list of dictionaries
-            data = []
-            for row in rows:
-                record = {
-                    'id': row[0],
-                    'date_key': row[1],  # Using date_key to match frontend expectations
-                    'row_index': row[0],  # Using id as row_index
-                    'pdf_link': row[2],
-                    'summary': row[3],
-                    'inserted_at': row[4]
-                }
-                data.append(record)
-            
-            conn.close()
-            return data, total_count
+            with pool.read() as conn:
+                cursor = conn.cursor()
+            
+                # First, get the total count of records that match our criteria
+                cursor.execute(f"""
+                    SELECT COUNT(*) 
+                    FROM master_summaries 
+                    WHERE {where}
+                """, params)
+                total_count = cursor.fetchone()[0]
+            
+                # Fetch data from master_summaries table newest first, seeking past the cursor when one is given
+                if cursor_values:
+                    last_run_date, last_id = cursor_values
+                    cursor.execute(f"""
+                        SELECT id, run_date, pdf_link, summary, created_at, run_date_iso 
+                        FROM master_summaries 
+                        WHERE {where}
+                        AND run_date_iso <= ?
+                        AND (run_date_iso < ? OR (run_date_iso = ? AND id > ?))
+                        ORDER BY run_date_iso DESC, id ASC 
+                        LIMIT ?
+                    """, params + [last_run_date, last_run_date, last_run_date, last_id, limit + 1])
+                else:
+                    cursor.execute(f"""
+                        SELECT id, run_date, pdf_link, summary, created_at, run_date_iso 
+                        FROM master_summaries 
+                        WHERE {where}
+                        ORDER BY run_date_iso DESC, id ASC 
+                        LIMIT ? OFFSET ?
+                    """, params + [limit + 1, offset])
+            
+                rows = cursor.fetchall()
+            
+                # The extra row only tells us whether another page exists
+                next_cursor = None
+                if len(rows) > limit:
+                    rows = rows[:limit]
+                    next_cursor = encode_cursor([rows[-1][5], rows[-1][0]])
+            
+                # Convert to list of dictionaries
+                data = []
+                for row in rows:
+                    record = {
+                        'id': row[0],
+                        'date_key': row[1],  # Using date_key to match frontend expectations
+                        'row_index': row[0],  # Using id as row_index
+                        'pdf_link': row[2],
+                        'summary': row[3],
+                        'inserted_at': row[4]
+                    }
+                    data.append(record)
+            
+                return data, total_count, next_cursor
         
         # Run the database operation in a thread pool
         loop = asyncio.get_event_loop()
-        data, total_count = await loop.run_in_executor(thread_pool, fetch_rbi_data)
+        data, total_count, next_cursor = await loop.run_in_executor(thread_pool, fetch_rbi_data)
         
         return SEBIAnalysisDataResponse(
             data=data,
-            count=total_count
+            count=total_count,
+            next_cursor=next_cursor
         )
+    except HTTPException:
+        raise
     except Exception as e:
         error_message = str(e)
         logger.error(f"Error fetching RBI analysis data: {error_message}")
@@ -517,30 +1039,29 @@ async def get_bse_monthly_count():
     """Get the count of BSE notifications for the current month"""
     try:
         # Define path to the notifications database file
-        db_path = os.path.join(os.path.dirname(__file__), "public", "notifications.db")
+        pool = get_pool("notifications")
         
         # Check if database file exists
-        if not os.path.exists(db_path):
+        if not pool.exists():
             raise HTTPException(status_code=404, detail="Notifications database file not found")
         
         # Connect to the database and fetch count
         def fetch_bse_monthly_count():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            ensure_bse_rollups(pool)
+            with pool.read() as conn:
+                cursor = conn.cursor()
             
-            # Get count of records for current month where Link is not NULL and not 'NIL'
-            cursor.execute("""
-                SELECT COUNT(*) 
-                FROM DailyLogs 
-                WHERE Date >= date('now', 'start of month') 
-                AND Date < date('now', 'start of month', '+1 month')
-                AND Link IS NOT NULL AND Link != 'NIL'
-            """)
+                # Sum the daily rollup rows for the current month
+                cursor.execute("""
+                    SELECT IFNULL(SUM(count), 0) 
+                    FROM bse_daily_counts 
+                    WHERE day >= date('now', 'start of month') 
+                    AND day < date('now', 'start of month', '+1 month')
+                """)
             
-            count = cursor.fetchone()[0]
-            conn.close()
+                count = cursor.fetchone()[0]
             
-            return {"count": count}
+                return {"count": count}
         
         # Run the database operation in a thread pool
         loop = asyncio.get_event_loop()
@@ -558,55 +1079,46 @@ async def get_bse_alerts_monthly_count():
     """Get monthly count of BSE alerts from the notifications database"""
     try:
         # Define path to the notifications database file
-        db_path = os.path.join(os.path.dirname(__file__), "public", "notifications.db")
+        pool = get_pool("notifications")
        
         # Check if database file exists
-        if not os.path.exists(db_path):
+        if not pool.exists():
             raise HTTPException(status_code=404, detail="BSE alerts database file not found")
        
         # Connect to the database and fetch data
         def fetch_counts():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            ensure_bse_rollups(pool)
+            with pool.read() as conn:
+                cursor = conn.cursor()
            
-            # Get count of records grouped by month
-            cursor.execute("""
-                SELECT
-                    strftime('%Y-%m', Date) as month,
-                    COUNT(*) as count
-                FROM DailyLogs
-                WHERE Link IS NOT NULL AND Link != 'NIL'
-                GROUP BY strftime('%Y-%m', Date)
-                ORDER BY month DESC
-            """)
+                # Read the per-month rollup rows
+                cursor.execute("""
+                    SELECT
+                        NULLIF(month, '') as month,
+                        count
+                    FROM bse_monthly_counts
+                    ORDER BY month DESC
+                """)
            
-            rows = cursor.fetchall()
+                rows = cursor.fetchall()
            
-            # Convert to list of dictionaries
-            monthly_data = []
-            for row in rows:
-                monthly_data.append({
-                    'month': row[0],
-                    'count': row[1]
-                })
-           
-            # Get total count of all BSE notifications
-            cursor.execute("""
-                SELECT COUNT(*)
-                FROM DailyLogs
-                WHERE Link IS NOT NULL AND Link != 'NIL'
-            """)
+                # Convert to list of dictionaries
+                monthly_data = []
+                for row in rows:
+                    monthly_data.append({
+                        'month': row[0],
+                        'count': row[1]
+                    })
            
-            total_count = cursor.fetchone()[0]
+                # Total count of all BSE notifications is the sum of the months
+                total_count = sum(item['count'] for item in monthly_data)
            
-            # Calculate average notifications per month
-            average_count = 0
-            if len(monthly_data) > 0:
-                total_notifications = sum(item['count'] for item in monthly_data)
-                average_count = round(total_notifications / len(monthly_data))
+                # Calculate average notifications per month
+                average_count = 0
+                if len(monthly_data) > 0:
+                    average_count = round(total_count / len(monthly_data))
            
-            conn.close()
-            return monthly_data, total_count, average_count
+                return monthly_data, total_count, average_count
        
         # Run the database operation in a thread pool
         loop = asyncio.get_event_loop()
@@ -622,26 +1134,25 @@ async def get_bse_alerts_monthly_count():
 async def get_bse_alerts_monthly_total():
     """Get total count of BSE alerts for the current month"""
     try:
-        db_path = os.path.join(os.path.dirname(__file__), "public", "notifications.db")
+        pool = get_pool("notifications")
 
-        if not os.path.exists(db_path):
+        if not pool.exists():
             raise HTTPException(status_code=404, detail="BSE alerts database file not found")
 
         def fetch_total_count():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            ensure_bse_rollups(pool)
+            with pool.read() as conn:
+                cursor = conn.cursor()
 
-            cursor.execute("""
-                SELECT COUNT(*)
-                FROM DailyLogs
-                WHERE Date >= date('now', 'start of month')
-                AND Date < date('now', 'start of month', '+1 month')
-                AND Link IS NOT NULL AND Link != 'NIL'
-            """)
+                cursor.execute("""
+                    SELECT IFNULL(SUM(count), 0)
+                    FROM bse_daily_counts
+                    WHERE day >= date('now', 'start of month')
+                    AND day < date('now', 'start of month', '+1 month')
+                """)
 
-            count = cursor.fetchone()[0]
-            conn.close()
-            return count
+                count = cursor.fetchone()[0]
+                return count
 
         loop = asyncio.get_event_loop()
         total_count = await loop.run_in_executor(thread_pool, fetch_total_count)
@@ -652,28 +1163,108 @@ async def get_bse_alerts_monthly_total():
         logger.error(f"Error fetching BSE alerts monthly total count: {error_message}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch BSE alerts monthly total count: {error_message}")
 
+@app.get("/api/bse-alerts-entity-count")
+async def get_bse_alerts_entity_count():
+    """Get count of BSE alerts per entity"""
+    try:
+        pool = get_pool("notifications")
+
+        if not pool.exists():
+            raise HTTPException(status_code=404, detail="BSE alerts database file not found")
+
+        def fetch_entity_counts():
+            ensure_bse_rollups(pool)
+            with pool.read() as conn:
+                cursor = conn.cursor()
+
+                cursor.execute("""
+                    SELECT NULLIF(entity_name, ''), count
+                    FROM bse_entity_counts
+                    ORDER BY count DESC, entity_name ASC
+                """)
+
+                return [{'entity_name': row[0], 'count': row[1]} for row in cursor.fetchall()]
+
+        loop = asyncio.get_event_loop()
+        entity_data = await loop.run_in_executor(thread_pool, fetch_entity_counts)
+
+        return {"entity_data": entity_data, "total_count": sum(item['count'] for item in entity_data)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_message = str(e)
+        logger.error(f"Error fetching BSE alerts entity count: {error_message}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch BSE alerts entity count: {error_message}")
+
+@app.get("/api/search", response_model=SearchResponse)
+async def search_notifications(q: str, source: Optional[str] = None, limit: int = 20, offset: int = 0):
+    """Full-text search across BSE, SEBI and RBI summaries with ranked, highlighted snippets"""
+    try:
+        match = build_match_query(q)
+        if not match:
+            raise HTTPException(status_code=400, detail="Search query must contain at least one word")
+        if source and source not in SEARCH_SOURCES:
+            raise HTTPException(status_code=400, detail=f"source must be one of: {', '.join(SEARCH_SOURCES)}")
+        if limit < 1 or offset < 0:
+            raise HTTPException(status_code=400, detail="limit must be positive and offset non-negative")
+        
+        source_names = [source] if source else list(SEARCH_SOURCES)
+        
+        def run_search():
+            hits = []
+            by_source = {}
+            for name in source_names:
+                pool = get_pool(SEARCH_SOURCES[name]["database"])
+                if not pool.exists():
+                    continue
+                ensure_search_index(pool, SEARCH_SOURCES[name])
+                with pool.read() as conn:
+                    # Each source only needs enough hits to fill the requested page
+                    result = search_source(conn, name, match, offset + limit)
+                by_source[name] = result['total']
+                hits.extend(result['hits'])
+            
+            # Merge on per-source relevance; raw bm25 scores (lower is better) only break ties within a source
+            hits.sort(key=lambda hit: (-hit['relevance'], hit['score']))
+            return hits[offset:offset + limit], by_source
+        
+        loop = asyncio.get_event_loop()
+        hits, by_source = await loop.run_in_executor(thread_pool, run_search)
+        
+        return SearchResponse(
+            query=q,
+            data=hits,
+            count=sum(by_source.values()),
+            by_source=by_source
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_message = str(e)
+        logger.error(f"Error searching notifications: {error_message}")
+        raise HTTPException(status_code=500, detail=f"Failed to search notifications: {error_message}")
+
 @app.get("/api/rbi-total-count")
 async def get_rbi_total_count():
     """Get total count of RBI notifications"""
     try:
-        db_path = os.path.join(os.path.dirname(__file__), "public", "rbi.db")
+        pool = get_pool("rbi")
 
-        if not os.path.exists(db_path):
+        if not pool.exists():
             raise HTTPException(status_code=404, detail="RBI database file not found")
 
         def fetch_total_count():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            with pool.read() as conn:
+                cursor = conn.cursor()
 
-            cursor.execute("""
-                SELECT COUNT(*) 
-                FROM master_summaries 
-                WHERE NOT (pdf_link = 'NIL' AND summary = 'NIL')
-            """)
+                cursor.execute("""
+                    SELECT COUNT(*) 
+                    FROM master_summaries 
+                    WHERE NOT (pdf_link = 'NIL' AND summary = 'NIL')
+                """)
 
-            count = cursor.fetchone()[0]
-            conn.close()
-            return count
+                count = cursor.fetchone()[0]
+                return count
 
         loop = asyncio.get_event_loop()
         total_count = await loop.run_in_executor(thread_pool, fetch_total_count)
@@ -688,20 +1279,19 @@ async def get_rbi_total_count():
 async def get_sebi_total_count():
     """Get total count of SEBI notifications"""
     try:
-        db_path = os.path.join(os.path.dirname(__file__), "public", "sebi_excel_master.db")
+        pool = get_pool("sebi")
 
-        if not os.path.exists(db_path):
+        if not pool.exists():
             raise HTTPException(status_code=404, detail="SEBI database file not found")
 
         def fetch_total_count():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            with pool.read() as conn:
+                cursor = conn.cursor()
 
-            cursor.execute("SELECT COUNT(*) FROM excel_summaries")
+                cursor.execute("SELECT COUNT(*) FROM excel_summaries")
 
-            count = cursor.fetchone()[0]
-            conn.close()
-            return count
+                count = cursor.fetchone()[0]
+                return count
 
         loop = asyncio.get_event_loop()
         total_count = await loop.run_in_executor(thread_pool, fetch_total_count)
@@ -712,6 +1302,143 @@ async def get_sebi_total_count():
         logger.error(f"Error fetching SEBI total count: {error_message}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch SEBI total count: {error_message}")
 
+# Every notification of each regulator, with an ISO date and a per-source sort key
+FEDERATED_FEED_SOURCES = {
+    "bse": """
+        SELECT 'bse' AS source, d.rowid AS sort_key, d.SrNo AS id, d.Date AS date,
+               d.EntityName AS entity_name, d.Nature AS nature, d.Summary AS summary, d.Link AS pdf_link
+        FROM main.DailyLogs d
+        WHERE d.Link IS NOT NULL AND d.Link != 'NIL'
+    """,
+    "sebi": """
+        SELECT 'sebi' AS source, s.id AS sort_key, s.id AS id, """ + DMY_DATE_TO_ISO.format(col="s.date_key") + """ AS date,
+               NULL AS entity_name, NULL AS nature, s.summary AS summary, s.pdf_link AS pdf_link
+        FROM sebi.excel_summaries s
+    """,
+    "rbi": """
+        SELECT 'rbi' AS source, r.id AS sort_key, r.id AS id, r.run_date_iso AS date,
+               NULL AS entity_name, NULL AS nature, r.summary AS summary, r.pdf_link AS pdf_link
+        FROM rbi.master_summaries r
+        WHERE NOT (r.pdf_link = 'NIL' AND r.summary = 'NIL')
+    """,
+}
+
+def fetch_feed_page(conn, limit: int, cursor_values: Optional[List[Any]] = None):
+    """Fetch one page of the merged feed ordered by date DESC, source ASC, sort_key ASC
+
+    Each source seeks past the (date, source, sort_key) cursor and is cut to
+    `limit` rows on its own, so only those rows are merged and sorted.
+    """
+    branches, params = [], []
+    for source, sql in FEDERATED_FEED_SOURCES.items():
+        where = ""
+        if cursor_values:
+            last_date, last_source, last_key = cursor_values
+            # The source is constant within a branch, so the cursor reduces to a date (and key) bound
+            if source < last_source:
+                where, bound = "WHERE date < ?", [last_date]
+            elif source == last_source:
+                where, bound = "WHERE date < ? OR (date = ? AND sort_key > ?)", [last_date, last_date, last_key]
+            else:
+                where, bound = "WHERE date <= ?", [last_date]
+            params.extend(bound)
+        branches.append(f"""
+            SELECT * FROM (
+                SELECT * FROM ({sql}) {where}
+                ORDER BY date DESC, sort_key ASC
+                LIMIT ?
+            )
+        """)
+        params.append(limit)
+    return conn.execute(f"""
+        SELECT * FROM ({" UNION ALL ".join(branches)})
+        ORDER BY date DESC, source ASC, sort_key ASC
+        LIMIT ?
+    """, params + [limit]).fetchall()
+
+@app.get("/api/notifications-feed", response_model=NotificationFeedResponse)
+async def get_notifications_feed(limit: int = 50, cursor: Optional[str] = None):
+    """Get a merged newest-first BSE/SEBI/RBI feed with per-source totals and monthly breakdowns
+
+    Pass limit=0 to fetch only the totals and monthly breakdowns.
+    """
+    try:
+        # A cursor carries the (date, source, sort_key) of the last item already seen
+        cursor_values = decode_cursor(cursor, (str, str, int)) if cursor else None
+        
+        pool = get_pool("federated")
+        
+        if not pool.exists():
+            raise HTTPException(status_code=404, detail="Notification database files not found")
+        
+        def fetch_feed():
+            # Monthly counts come from the rollups kept in each source's own database
+            ensure_bse_rollups(get_pool("notifications"))
+            for source in FEED_ROLLUPS.values():
+                ensure_feed_rollup(get_pool(source["database"]), source)
+            with pool.read() as conn:
+                items = []
+                next_cursor = None
+                if limit > 0:
+                    rows = fetch_feed_page(conn, limit + 1, cursor_values)
+                    
+                    # The extra row only tells us whether another page exists
+                    if len(rows) > limit:
+                        rows = rows[:limit]
+                        next_cursor = encode_cursor([rows[-1][3], rows[-1][0], rows[-1][1]])
+                    
+                    items = [{
+                        'source': row[0],
+                        'id': int(row[2]) if row[2] is not None else None,
+                        'date': row[3],
+                        'entity_name': row[4],
+                        'nature': row[5],
+                        'summary': row[6],
+                        'pdf_link': row[7]
+                    } for row in rows]
+                
+                # Per-month counts for each source, newest month first
+                monthly_rows = conn.execute("""
+                    SELECT month, source, count FROM (
+                        SELECT month, 'bse' AS source, count FROM main.bse_monthly_counts
+                        UNION ALL
+                        SELECT month, 'sebi', count FROM sebi.sebi_monthly_counts
+                        UNION ALL
+                        SELECT month, 'rbi', count FROM rbi.rbi_monthly_counts
+                    )
+                    ORDER BY month DESC
+                """).fetchall()
+            
+            # Totals match /api/bse-alerts-monthly-count, /api/sebi-total-count and /api/rbi-total-count;
+            # rows without a usable date count towards them but not towards any month
+            totals = {'bse': 0, 'sebi': 0, 'rbi': 0}
+            months = {}
+            for month, source, count in monthly_rows:
+                totals[source] += count
+                if not month:
+                    continue
+                entry = months.setdefault(month, {'month': month, 'bse': 0, 'sebi': 0, 'rbi': 0, 'total': 0})
+                entry[source] += count
+                entry['total'] += count
+            
+            return items, next_cursor, totals, list(months.values())
+        
+        loop = asyncio.get_event_loop()
+        items, next_cursor, totals, monthly = await loop.run_in_executor(thread_pool, fetch_feed)
+        
+        return NotificationFeedResponse(
+            data=items,
+            next_cursor=next_cursor,
+            totals=totals,
+            monthly=monthly
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_message = str(e)
+        logger.error(f"Error fetching notifications feed: {error_message}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch notifications feed: {error_message}")
+
 # Add endpoint for SEBI analysis data
 @app.get("/sebi-analysis-data", response_model=SEBIAnalysisDataResponse)
 async def get_sebi_analysis_data(limit: int = 10, offset: int = 0):
@@ -784,27 +1511,26 @@ async def admin_login(credentials: AdminLoginRequest):
     """Authenticate admin user"""
     try:
         # Define path to the email database file
-        db_path = os.path.join(os.path.dirname(__file__), "public", "email_data.db")
+        pool = get_pool("email")
         
         # Check if database file exists
-        if not os.path.exists(db_path):
+        if not pool.exists():
             raise HTTPException(status_code=404, detail="Database file not found")
         
         # Connect to the database and verify credentials
         def verify_admin_credentials():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            with pool.read() as conn:
+                cursor = conn.cursor()
             
-            # Check if the provided credentials match any admin user
-            cursor.execute("""
-                SELECT id, username FROM admin_credentials 
-                WHERE username = ? AND password = ?
-            """, (credentials.username, credentials.password))
+                # Check if the provided credentials match any admin user
+                cursor.execute("""
+                    SELECT id, username FROM admin_credentials 
+                    WHERE username = ? AND password = ?
+                """, (credentials.username, credentials.password))
             
-            result = cursor.fetchone()
-            conn.close()
+                result = cursor.fetchone()
             
-            return result
+                return result
         
         # Run the database operation in a thread pool
         loop = asyncio.get_event_loop()
@@ -834,31 +1560,30 @@ async def get_emails(search: Optional[str] = None):
     """Get all email addresses with optional search filter"""
     try:
         # Define path to the email database file
-        db_path = os.path.join(os.path.dirname(__file__), "public", "email_data.db")
+        pool = get_pool("email")
         
         # Check if database file exists
-        if not os.path.exists(db_path):
+        if not pool.exists():
             raise HTTPException(status_code=404, detail="Database file not found")
         
         # Connect to the database and fetch emails
         def fetch_emails():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Build query with optional search filter
-            if search:
-                # Case-insensitive search in email column
-                query = "SELECT email FROM email WHERE LOWER(email) LIKE LOWER(?) ORDER BY email"
-                search_pattern = f"%{search}%"
-                cursor.execute(query, (search_pattern,))
-            else:
-                # Get all emails
-                cursor.execute("SELECT email FROM email ORDER BY email")
+            with pool.read() as conn:
+                cursor = conn.cursor()
+            
+                # Build query with optional search filter
+                if search:
+                    # Case-insensitive search in email column
+                    query = "SELECT email FROM email WHERE LOWER(email) LIKE LOWER(?) ORDER BY email"
+                    search_pattern = f"%{search}%"
+                    cursor.execute(query, (search_pattern,))
+                else:
+                    # Get all emails
+                    cursor.execute("SELECT email FROM email ORDER BY email")
             
-            rows = cursor.fetchall()
-            conn.close()
+                rows = cursor.fetchall()
             
-            return [row[0] for row in rows]
+                return [row[0] for row in rows]
         
         # Run the database operation in a thread pool
         loop = asyncio.get_event_loop()
@@ -889,31 +1614,28 @@ async def add_email(email_entry: EmailEntry):
             raise HTTPException(status_code=400, detail="Only emails from adani.com or pspprojects.com domains are allowed")
         
         # Define path to the email database file
-        db_path = os.path.join(os.path.dirname(__file__), "public", "email_data.db")
+        pool = get_pool("email")
         
         # Check if database file exists
-        if not os.path.exists(db_path):
+        if not pool.exists():
             raise HTTPException(status_code=404, detail="Database file not found")
         
         # Connect to the database and add email
         def add_email_to_db():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            with pool.write() as conn:
+                cursor = conn.cursor()
             
-            # Check if email already exists (case-insensitive)
-            cursor.execute("SELECT COUNT(*) FROM email WHERE LOWER(email) = LOWER(?)", (email_entry.email,))
-            count = cursor.fetchone()[0]
+                # Check if email already exists (case-insensitive)
+                cursor.execute("SELECT COUNT(*) FROM email WHERE LOWER(email) = LOWER(?)", (email_entry.email,))
+                count = cursor.fetchone()[0]
             
-            if count > 0:
-                conn.close()
-                raise HTTPException(status_code=409, detail="Email already exists")
+                if count > 0:
+                    raise HTTPException(status_code=409, detail="Email already exists")
             
-            # Insert new email
-            cursor.execute("INSERT INTO email (email) VALUES (?)", (email_entry.email,))
-            conn.commit()
-            conn.close()
+                # Insert new email
+                cursor.execute("INSERT INTO email (email) VALUES (?)", (email_entry.email,))
             
-            return email_entry.email
+                return email_entry.email
         
         # Run the database operation in a thread pool
         loop = asyncio.get_event_loop()
@@ -936,31 +1658,28 @@ async def delete_email(email_address: str):
         email = urllib.parse.unquote(email_address)
         
         # Define path to the email database file
-        db_path = os.path.join(os.path.dirname(__file__), "public", "email_data.db")
+        pool = get_pool("email")
         
         # Check if database file exists
-        if not os.path.exists(db_path):
+        if not pool.exists():
             raise HTTPException(status_code=404, detail="Database file not found")
         
         # Connect to the database and delete email
         def delete_email_from_db():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            with pool.write() as conn:
+                cursor = conn.cursor()
             
-            # Check if email exists
-            cursor.execute("SELECT COUNT(*) FROM email WHERE email = ?", (email,))
-            count = cursor.fetchone()[0]
+                # Check if email exists
+                cursor.execute("SELECT COUNT(*) FROM email WHERE email = ?", (email,))
+                count = cursor.fetchone()[0]
             
-            if count == 0:
-                conn.close()
-                raise HTTPException(status_code=404, detail="Email not found")
+                if count == 0:
+                    raise HTTPException(status_code=404, detail="Email not found")
             
-            # Delete the email
-            cursor.execute("DELETE FROM email WHERE email = ?", (email,))
-            conn.commit()
-            conn.close()
+                # Delete the email
+                cursor.execute("DELETE FROM email WHERE email = ?", (email,))
             
-            return email
+                return email
         
         # Run the database operation in a thread pool
         loop = asyncio.get_event_loop()
@@ -980,24 +1699,23 @@ async def delete_email(email_address: str):
 async def get_directors_master():
     """Get all directors from directors database"""
     try:
-        db_path = os.path.join(os.path.dirname(__file__), "public", "directors.db")
+        pool = get_pool("directors")
         
-        if not os.path.exists(db_path):
+        if not pool.exists():
             raise HTTPException(status_code=404, detail="Directors database not found")
         
         def fetch_directors():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, name, din, created_at FROM directors ORDER BY name")
-            rows = cursor.fetchall()
-            conn.close()
+            with pool.read() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id, name, din, created_at FROM directors ORDER BY name")
+                rows = cursor.fetchall()
             
-            return [{
-                'id': row[0],
-                'name': row[1],
-                'din': row[2],
-                'created_at': row[3]
-            } for row in rows]
+                return [{
+                    'id': row[0],
+                    'name': row[1],
+                    'din': row[2],
+                    'created_at': row[3]
+                } for row in rows]
         
         loop = asyncio.get_event_loop()
         directors = await loop.run_in_executor(thread_pool, fetch_directors)
@@ -1022,37 +1740,34 @@ class DirectorUpdateRequest(BaseModel):
 async def create_director(request: DirectorCreateRequest):
     """Create a new director in directors database"""
     try:
-        db_path = os.path.join(os.path.dirname(__file__), "public", "directors.db")
+        pool = get_pool("directors")
         
         def insert_director():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Check if director with same DIN already exists
-            cursor.execute("SELECT id FROM directors WHERE din = ?", (request.din,))
-            if cursor.fetchone():
-                conn.close()
-                raise HTTPException(status_code=400, detail="Director with this DIN already exists")
-            
-            # Insert new director
-            cursor.execute(
-                "INSERT INTO directors (name, din) VALUES (?, ?)",
-                (request.name, request.din)
-            )
-            director_id = cursor.lastrowid
+            with pool.write() as conn:
+                cursor = conn.cursor()
+            
+                # Check if director with same DIN already exists
+                cursor.execute("SELECT id FROM directors WHERE din = ?", (request.din,))
+                if cursor.fetchone():
+                    raise HTTPException(status_code=400, detail="Director with this DIN already exists")
+            
+                # Insert new director
+                cursor.execute(
+                    "INSERT INTO directors (name, din) VALUES (?, ?)",
+                    (request.name, request.din)
+                )
+                director_id = cursor.lastrowid
             
-            # Fetch the created director
-            cursor.execute("SELECT id, name, din, created_at FROM directors WHERE id = ?", (director_id,))
-            row = cursor.fetchone()
-            conn.commit()
-            conn.close()
+                # Fetch the created director
+                cursor.execute("SELECT id, name, din, created_at FROM directors WHERE id = ?", (director_id,))
+                row = cursor.fetchone()
             
-            return {
-                'id': row[0],
-                'name': row[1],
-                'din': row[2],
-                'created_at': row[3]
-            }
+                return {
+                    'id': row[0],
+                    'name': row[1],
+                    'din': row[2],
+                    'created_at': row[3]
+                }
         
         loop = asyncio.get_event_loop()
         director = await loop.run_in_executor(thread_pool, insert_director)
@@ -1068,42 +1783,38 @@ async def create_director(request: DirectorCreateRequest):
 async def update_director(director_id: int, request: DirectorUpdateRequest):
     """Update an existing director in directors database"""
     try:
-        db_path = os.path.join(os.path.dirname(__file__), "public", "directors.db")
+        pool = get_pool("directors")
         
         def update_director_data():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            with pool.write() as conn:
+                cursor = conn.cursor()
+            
+                # Check if director exists
+                cursor.execute("SELECT id FROM directors WHERE id = ?", (director_id,))
+                if not cursor.fetchone():
+                    raise HTTPException(status_code=404, detail="Director not found")
+            
+                # Check if another director has the same DIN
+                cursor.execute("SELECT id FROM directors WHERE din = ? AND id != ?", (request.din, director_id))
+                if cursor.fetchone():
+                    raise HTTPException(status_code=400, detail="Another director with this DIN already exists")
+            
+                # Update director
+                cursor.execute(
+                    "UPDATE directors SET name = ?, din = ? WHERE id = ?",
+                    (request.name, request.din, director_id)
+                )
             
-            # Check if director exists
-            cursor.execute("SELECT id FROM directors WHERE id = ?", (director_id,))
-            if not cursor.fetchone():
-                conn.close()
-                raise HTTPException(status_code=404, detail="Director not found")
-            
-            # Check if another director has the same DIN
-            cursor.execute("SELECT id FROM directors WHERE din = ? AND id != ?", (request.din, director_id))
-            if cursor.fetchone():
-                conn.close()
-                raise HTTPException(status_code=400, detail="Another director with this DIN already exists")
-            
-            # Update director
-            cursor.execute(
-                "UPDATE directors SET name = ?, din = ? WHERE id = ?",
-                (request.name, request.din, director_id)
-            )
+                # Fetch updated director
+                cursor.execute("SELECT id, name, din, created_at FROM directors WHERE id = ?", (director_id,))
+                row = cursor.fetchone()
             
-            # Fetch updated director
-            cursor.execute("SELECT id, name, din, created_at FROM directors WHERE id = ?", (director_id,))
-            row = cursor.fetchone()
-            conn.commit()
-            conn.close()
-            
-            return {
-                'id': row[0],
-                'name': row[1],
-                'din': row[2],
-                'created_at': row[3]
-            }
+                return {
+                    'id': row[0],
+                    'name': row[1],
+                    'din': row[2],
+                    'created_at': row[3]
+                }
         
         loop = asyncio.get_event_loop()
         director = await loop.run_in_executor(thread_pool, update_director_data)
@@ -1119,22 +1830,19 @@ async def update_director(director_id: int, request: DirectorUpdateRequest):
 async def delete_director(director_id: int):
     """Delete a director from directors database"""
     try:
-        db_path = os.path.join(os.path.dirname(__file__), "public", "directors.db")
+        pool = get_pool("directors")
         
         def delete_director_data():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            with pool.write() as conn:
+                cursor = conn.cursor()
             
-            # Check if director exists
-            cursor.execute("SELECT id FROM directors WHERE id = ?", (director_id,))
-            if not cursor.fetchone():
-                conn.close()
-                raise HTTPException(status_code=404, detail="Director not found")
+                # Check if director exists
+                cursor.execute("SELECT id FROM directors WHERE id = ?", (director_id,))
+                if not cursor.fetchone():
+                    raise HTTPException(status_code=404, detail="Director not found")
             
-            # Delete director
-            cursor.execute("DELETE FROM directors WHERE id = ?", (director_id,))
-            conn.commit()
-            conn.close()
+                # Delete director
+                cursor.execute("DELETE FROM directors WHERE id = ?", (director_id,))
         
         loop = asyncio.get_event_loop()
         await loop.run_in_executor(thread_pool, delete_director_data)
@@ -1148,57 +1856,25 @@ async def delete_director(director_id: int):
 
 @app.get("/api/directors-disclosures", response_model=DisclosuresResponse)
 async def get_directors_disclosures():
-    """Get all directors' disclosures from Word files"""
+    """Get all directors' disclosures from the disclosure catalog"""
     try:
-        # Path to disclosure output folder
-        disclosures_dir = os.path.join(os.path.dirname(__file__), "public", "Directors Discloser Output")
+        pool = get_pool("disclosures")
         
         def fetch_disclosures():
-            disclosures = []
-            
-            # Check if directory exists
-            if not os.path.exists(disclosures_dir):
-                logger.warning(f"Disclosures directory not found: {disclosures_dir}")
-                return []
+            # Without the watcher, re-parse files whose size, mtime and content changed first
+            if not fs_watcher.watching(DISCLOSURES_DIR):
+                sync_catalog(pool)
+            with pool.read() as conn:
+                rows = list_disclosures(conn)
             
-            # Scan directory for .docx files
-            for idx, filename in enumerate(sorted(os.listdir(disclosures_dir))):
-                if filename.endswith('.docx') and not filename.startswith('~$'):
-                    file_path = os.path.join(disclosures_dir, filename)
-                    
-                    # Extract metadata from filename or file stats
-                    file_stat = os.stat(file_path)
-                    created_date = datetime.fromtimestamp(file_stat.st_mtime).strftime('%Y-%m-%d')
-                    
-                    # Extract director name from filename (remove _MBP.docx)
-                    director_name = filename.replace('_MBP.docx', '').replace('.docx', '').strip()
-                    din = 'N/A'  # Default value
-                    
-                    # Try to extract DIN from document
-                    try:
-                        doc = DocxDocument(file_path)
-                        # Look for DIN in document paragraphs
-                        for para in doc.paragraphs:
-                            text = para.text.strip()
-                            # Match pattern like "DIN : 12345678" or "DIN: 12345678"
-                            import re
-                            din_match = re.search(r'DIN\s*:\s*([0-9]{8})', text, re.IGNORECASE)
-                            if din_match:
-                                din = din_match.group(1)
-                                break
-                    except Exception as e:
-                        logger.warning(f"Error reading DIN from {filename}: {e}")
-                    
-                    disclosures.append({
-                        'id': idx + 1,
-                        'director_name': director_name,
-                        'din': din,
-                        'disclosure_date': created_date,
-                        'disclosure_type': 'MBP-1',
-                        'file_path': filename
-                    })
-            
-            return disclosures
+            return [{
+                'id': disclosure_id,
+                'director_name': director_name,
+                'din': din,
+                'disclosure_date': datetime.fromtimestamp(mtime_ns / 1e9).strftime('%Y-%m-%d'),
+                'disclosure_type': 'MBP-1',
+                'file_path': filename
+            } for disclosure_id, filename, director_name, din, mtime_ns, classification in rows]
         
         loop = asyncio.get_event_loop()
         disclosures = await loop.run_in_executor(thread_pool, fetch_disclosures)
@@ -1211,72 +1887,150 @@ async def get_directors_disclosures():
         logger.error(f"Error fetching disclosures: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch disclosures: {str(e)}")
 
+@app.post("/api/directors-disclosures/reindex")
+async def reindex_directors_disclosures():
+    """Re-parse every disclosure document into the catalog across a process pool"""
+    try:
+        pool = get_pool("disclosures")
+        loop = asyncio.get_event_loop()
+        counts = await loop.run_in_executor(thread_pool, partial(sync_catalog, pool, force=True))
+        return {"message": "Disclosure catalog reindexed", **counts}
+    except Exception as e:
+        logger.error(f"Error reindexing disclosures: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to reindex disclosures: {str(e)}")
+
+def validate_bundle_selection(ids: Optional[List[int]], director: Optional[str], month: Optional[str]) -> Optional[str]:
+    """Check a disclosure bundle selection and return the month normalized to YYYY-MM"""
+    if month:
+        try:
+            month = datetime.strptime(month, "%Y-%m").strftime("%Y-%m")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="month must be in YYYY-MM format")
+    if not (ids or director or month):
+        raise HTTPException(status_code=400, detail="Provide ids, director or month")
+    return month
+
+def close_entries(entries):
+    """Close the file handles of (name, open file) archive entries"""
+    for _, f in entries:
+        f.close()
+
+@app.get("/api/directors-disclosures/bundle")
+async def download_disclosures_bundle(ids: Optional[str] = None, director: Optional[str] = None,
+                                      month: Optional[str] = None):
+    """Download several disclosure documents as one ZIP archive
+
+    Select documents with ids (comma-separated), director and/or month
+    (YYYY-MM). The archive is streamed as it is built, with stored entries.
+    Every document is opened and checked against the catalog before the
+    response starts, and the archive is built from those handles.
+    """
+    try:
+        try:
+            id_list = [int(i) for i in ids.split(",") if i.strip()] if ids else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+        month = validate_bundle_selection(id_list, director, month)
+        
+        pool = get_pool("disclosures")
+        
+        def collect_entries():
+            watched = fs_watcher.watching(DISCLOSURES_DIR)
+            if not watched:
+                sync_catalog(pool, DISCLOSURES_DIR)
+            with pool.read() as conn:
+                rows = select_disclosures(conn, id_list, director, month)
+            entries = []
+            try:
+                for disclosure_id, filename in rows:
+                    opened = open_disclosure(pool, disclosure_id, DISCLOSURES_DIR, verify=not watched)
+                    if opened is None:
+                        # Changed or removed since it was selected; it is no longer the version the id names
+                        logger.warning(f"Leaving {filename} out of the bundle: it changed on disk")
+                        continue
+                    entries.append((filename, opened[1]))
+                return entries, archive_size(entries)
+            except BaseException:
+                close_entries(entries)
+                raise
+        
+        loop = asyncio.get_event_loop()
+        entries, size = await loop.run_in_executor(thread_pool, collect_entries)
+        if not entries:
+            raise HTTPException(status_code=404, detail="No disclosures match the selection")
+        
+        def stream_bundle():
+            try:
+                yield from stream_zip(entries)
+            finally:
+                close_entries(entries)
+        
+        archive_name = f"disclosures_{month}.zip" if month else "disclosures.zip"
+        return StreamingResponse(
+            stream_bundle(),
+            media_type="application/zip",
+            headers={
+                "Content-Disposition": f'attachment; filename="{archive_name}"',
+                "Content-Length": str(size)
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building disclosures bundle: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to build bundle: {str(e)}")
+
+# Disclosure ids name one version of a document, so per-document responses never change
+DISCLOSURE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
 @app.get("/api/directors-disclosures/{disclosure_id}/content", response_model=DisclosureContentResponse)
-async def get_disclosure_content(disclosure_id: int):
-    """Get content of a specific disclosure document"""
+async def get_disclosure_content(disclosure_id: int, request: Request, include_tables: bool = False):
+    """Get content of a specific disclosure document
+
+    The rendered text is cached by content hash; responses carry the hash
+    as ETag and are gzip-compressed for clients that accept it.
+    """
     try:
-        disclosures_dir = os.path.join(os.path.dirname(__file__), "public", "Directors Discloser Output")
+        pool = get_pool("disclosures")
+        use_gzip = "gzip" in request.headers.get("accept-encoding", "")
         
         def read_disclosure_content():
-            if not os.path.exists(disclosures_dir):
-                raise HTTPException(status_code=404, detail="Disclosures directory not found")
-            
-            # Get list of docx files
-            docx_files = [f for f in os.listdir(disclosures_dir) 
-                         if f.endswith('.docx') and not f.startswith('~$')]
-            
-            # Check if disclosure_id is valid
-            if disclosure_id < 1 or disclosure_id > len(docx_files):
+            opened = open_disclosure(pool, disclosure_id, verify=not fs_watcher.watching(DISCLOSURES_DIR))
+            if opened is None:
                 raise HTTPException(status_code=404, detail="Disclosure not found")
+            record, f = opened
             
-            # Get the file at the specified index
-            filename = sorted(docx_files)[disclosure_id - 1]
-            file_path = os.path.join(disclosures_dir, filename)
-            
-            # Read Word document content
-            try:
-                doc = DocxDocument(file_path)
-                
-                # Extract all text from document
-                content_parts = []
-                
-                # Add document title if available
-                content_parts.append(f"Document: {filename}\n")
-                content_parts.append("=" * 80 + "\n\n")
-                
-                # Extract all paragraphs
-                for para in doc.paragraphs:
-                    if para.text.strip():
-                        content_parts.append(para.text + "\n")
+            with f:
+                # Each encoding and variant is its own representation with its own strong ETag
+                etag = '"' + record['content_hash'] + ("-tables" if include_tables else "") + ("-gzip" if use_gzip else "") + '"'
+                if etag_matches(request.headers.get("if-none-match"), etag):
+                    return etag, None
                 
-                # Extract tables if any
-                if doc.tables:
-                    content_parts.append("\n" + "=" * 80 + "\n")
-                    content_parts.append("TABLES\n")
-                    content_parts.append("=" * 80 + "\n\n")
-                    
-                    for idx, table in enumerate(doc.tables):
-                        content_parts.append(f"Table {idx + 1}:\n")
-                        for row in table.rows:
-                            row_text = " | ".join([cell.text.strip() for cell in row.cells])
-                            content_parts.append(row_text + "\n")
-                        content_parts.append("\n")
-                
-                full_content = "".join(content_parts)
-                
-                if not full_content.strip():
-                    return "No content found in document"
-                
-                return full_content
-                
-            except Exception as e:
-                logger.error(f"Error reading Word document: {e}")
-                raise HTTPException(status_code=500, detail=f"Error reading document: {str(e)}")
+                try:
+                    if record['error']:
+                        raise ValueError(record['error'])
+                    rendered = load_rendered(pool, record, f)
+                except Exception as e:
+                    logger.error(f"Error reading Word document: {e}")
+                    raise HTTPException(status_code=500, detail=f"Error reading document: {str(e)}")
+            
+            payload = {'content': rendered['content'] if rendered['content'].strip() else "No content found in document"}
+            if include_tables:
+                payload['tables'] = rendered['tables']
+            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            if use_gzip:
+                body = gzip.compress(body, compresslevel=6)
+            return etag, body
         
         loop = asyncio.get_event_loop()
-        content = await loop.run_in_executor(thread_pool, read_disclosure_content)
-        
-        return DisclosureContentResponse(content=content)
+        etag, body = await loop.run_in_executor(thread_pool, read_disclosure_content)
+        
+        headers = {"Cache-Control": DISCLOSURE_CACHE_CONTROL, "ETag": etag, "Vary": "Accept-Encoding"}
+        if body is None:
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+        return Response(content=body, media_type="application/json", headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -1287,34 +2041,32 @@ async def get_disclosure_content(disclosure_id: int):
 async def download_disclosure(disclosure_id: int):
     """Download a specific disclosure document"""
     try:
-        disclosures_dir = os.path.join(os.path.dirname(__file__), "public", "Directors Discloser Output")
+        pool = get_pool("disclosures")
         
-        def get_file_path():
-            if not os.path.exists(disclosures_dir):
-                raise HTTPException(status_code=404, detail="Disclosures directory not found")
-            
-            # Get list of docx files
-            docx_files = [f for f in os.listdir(disclosures_dir) 
-                         if f.endswith('.docx') and not f.startswith('~$')]
-            
-            # Check if disclosure_id is valid
-            if disclosure_id < 1 or disclosure_id > len(docx_files):
+        def open_file():
+            opened = open_disclosure(pool, disclosure_id, verify=not fs_watcher.watching(DISCLOSURES_DIR))
+            if opened is None:
                 raise HTTPException(status_code=404, detail="Disclosure not found")
-            
-            # Get the file at the specified index
-            filename = sorted(docx_files)[disclosure_id - 1]
-            file_path = os.path.join(disclosures_dir, filename)
-            
-            return file_path, filename
+            return opened
         
         loop = asyncio.get_event_loop()
-        file_path, filename = await loop.run_in_executor(thread_pool, get_file_path)
+        record, f = await loop.run_in_executor(thread_pool, open_file)
         
-        # Return file for download
-        return FileResponse(
-            path=file_path,
-            filename=filename,
-            media_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+        # Stream the handle that was checked against the catalog, not whatever the path holds by now
+        filename = urllib.parse.quote(record['filename'])
+        disposition = (
+            f'attachment; filename="{record["filename"]}"' if filename == record['filename']
+            else f"attachment; filename*=utf-8''{filename}"
+        )
+        return StreamingResponse(
+            iter_file(f),
+            media_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+            headers={
+                "Content-Disposition": disposition,
+                "Content-Length": str(record['size']),
+                "Cache-Control": DISCLOSURE_CACHE_CONTROL,
+                "ETag": f'"{record["content_hash"]}"'
+            }
         )
     except HTTPException:
         raise
@@ -1323,89 +2075,33 @@ async def download_disclosure(disclosure_id: int):
         raise HTTPException(status_code=500, detail=f"Failed to download file: {str(e)}")
 
 @app.get("/api/directors-disclosures/analytics", response_model=DisclosureAnalyticsResponse)
-async def get_disclosures_analytics():
-    """Get analytics data for directors' disclosures"""
+async def get_disclosures_analytics(as_of: Optional[str] = None):
+    """Get analytics data for directors' disclosures
+
+    Served from rollups kept current by the disclosure catalog. With as_of
+    (YYYY-MM-DD) the analytics are read from the snapshot taken on or
+    before that day.
+    """
     try:
-        disclosures_dir = os.path.join(os.path.dirname(__file__), "public", "Directors Discloser Output")
+        as_of = validate_iso_date(as_of, "as_of")
+        pool = get_pool("disclosures")
         
         def calculate_analytics():
-            from collections import defaultdict
-            import re
-            
-            if not os.path.exists(disclosures_dir):
-                # Return empty analytics if directory doesn't exist
-                return {
-                    'total_disclosures': 0,
-                    'by_type': [],
-                    'by_month': [],
-                    'by_director': []
-                }
-            
-            docx_files = [f for f in os.listdir(disclosures_dir) 
-                         if f.endswith('.docx') and not f.startswith('~$')]
-            
-            total_count = len(docx_files)
-            
-            # Track statistics
-            by_type = defaultdict(int)
-            by_month = defaultdict(int)
-            by_director = defaultdict(int)
-            
-            for filename in docx_files:
-                file_path = os.path.join(disclosures_dir, filename)
-                
-                # Get file modification date for monthly stats
-                file_stat = os.stat(file_path)
-                file_date = datetime.fromtimestamp(file_stat.st_mtime)
-                month_key = file_date.strftime('%b %Y')
-                by_month[month_key] += 1
-                
-                # Extract director name from filename (remove _MBP.docx)
-                director_name = filename.replace('_MBP.docx', '').replace('.docx', '').strip()
-                
-                # Try to read document for better classification
-                try:
-                    doc = DocxDocument(file_path)
-                    
-                    # Look for disclosure type in content
-                    for para in doc.paragraphs[:15]:
-                        text = para.text.lower()
-                        
-                        # Classify disclosure type
-                        if 'shareholding' in text or 'shares' in text:
-                            by_type['Shareholding'] += 1
-                            break
-                        elif 'transaction' in text or 'acquisition' in text:
-                            by_type['Transaction'] += 1
-                            break
-                        elif 'interest' in text or 'concern' in text:
-                            by_type['Interest'] += 1
-                            break
-                    else:
-                        # Default type - MBP-1 form
-                        by_type['MBP-1'] += 1
-                    
-                except Exception as e:
-                    logger.warning(f"Error analyzing {filename}: {e}")
-                    by_type['MBP-1'] += 1
-                
-                # Track by director
-                by_director[director_name] += 1
-            
-            # Convert to list format for response
-            analytics = {
-                'total_disclosures': total_count,
-                'by_type': [{'type': k, 'count': v} for k, v in sorted(by_type.items(), key=lambda x: -x[1])],
-                'by_month': [{'month': k, 'count': v} for k, v in sorted(by_month.items())],
-                'by_director': [{'director': k, 'count': v} for k, v in sorted(by_director.items(), key=lambda x: -x[1])[:10]]  # Top 10
-            }
-            
-            return analytics
+            if not fs_watcher.watching(DISCLOSURES_DIR):
+                sync_catalog(pool)
+            with pool.read() as conn:
+                if as_of:
+                    return read_snapshot(conn, as_of)
+                return read_analytics(conn)
         
         loop = asyncio.get_event_loop()
         analytics = await loop.run_in_executor(thread_pool, calculate_analytics)
+        if analytics is None:
+            raise HTTPException(status_code=404, detail=f"No analytics snapshot on or before {as_of}")
         
         return DisclosureAnalyticsResponse(**analytics)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching analytics: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch analytics: {str(e)}")
@@ -1415,25 +2111,24 @@ async def get_disclosures_analytics():
 async def get_directors_for_minutes():
     """Get all directors from directors database for Minutes Preparation"""
     try:
-        db_path = os.path.join(os.path.dirname(__file__), "public", "directors.db")
+        pool = get_pool("directors")
         
-        if not os.path.exists(db_path):
-            logger.warning(f"Directors database not found: {db_path}")
+        if not pool.exists():
+            logger.warning(f"Directors database not found: {pool.path}")
             return DirectorsMasterResponse(data=[], count=0)
         
         def fetch_directors():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, name, din, created_at FROM directors ORDER BY name")
-            rows = cursor.fetchall()
-            conn.close()
+            with pool.read() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id, name, din, created_at FROM directors ORDER BY name")
+                rows = cursor.fetchall()
             
-            return [{
-                'id': row[0],
-                'name': row[1],
-                'din': row[2],
-                'created_at': row[3]
-            } for row in rows]
+                return [{
+                    'id': row[0],
+                    'name': row[1],
+                    'din': row[2],
+                    'created_at': row[3]
+                } for row in rows]
         
         loop = asyncio.get_event_loop()
         directors = await loop.run_in_executor(thread_pool, fetch_directors)
@@ -1465,40 +2160,37 @@ class PlaceCreateRequest(BaseModel):
 
 def init_places_db():
     """Initialize places database with default Adani Corporate House"""
-    db_path = os.path.join(os.path.dirname(__file__), "public", "places.db")
+    pool = get_pool("places")
     
     # Create public directory if it doesn't exist
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    os.makedirs(os.path.dirname(pool.path), exist_ok=True)
     
-    # Create places table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS places (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            address TEXT NOT NULL,
-            is_default BOOLEAN DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    with pool.write() as conn:
+        cursor = conn.cursor()
     
-    # Check if default place exists
-    cursor.execute("SELECT COUNT(*) FROM places WHERE is_default = 1")
-    if cursor.fetchone()[0] == 0:
-        # Insert default Adani Corporate House
+        # Create places table
         cursor.execute('''
-            INSERT INTO places (name, address, is_default)
-            VALUES (?, ?, ?)
-        ''', (
-            'Adani Corporate House',
-            'Adani Corporate House, Shantigram, Near Vaishno Devi Circle, S. G. Highway, Khodiyar, Ahmedabad - 382421, Gujarat, India',
-            1
-        ))
+            CREATE TABLE IF NOT EXISTS places (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                address TEXT NOT NULL,
+                is_default BOOLEAN DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
     
-    conn.commit()
-    conn.close()
+        # Check if default place exists
+        cursor.execute("SELECT COUNT(*) FROM places WHERE is_default = 1")
+        if cursor.fetchone()[0] == 0:
+            # Insert default Adani Corporate House
+            cursor.execute('''
+                INSERT INTO places (name, address, is_default)
+                VALUES (?, ?, ?)
+            ''', (
+                'Adani Corporate House',
+                'Adani Corporate House, Shantigram, Near Vaishno Devi Circle, S. G. Highway, Khodiyar, Ahmedabad - 382421, Gujarat, India',
+                1
+            ))
 
 # Initialize places database on startup
 init_places_db()
@@ -1507,26 +2199,25 @@ init_places_db()
 async def get_places():
     """Get all places from database"""
     try:
-        db_path = os.path.join(os.path.dirname(__file__), "public", "places.db")
+        pool = get_pool("places")
         
         def fetch_places():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, name, address, is_default, created_at FROM places ORDER BY is_default DESC, name")
-            rows = cursor.fetchall()
-            conn.close()
-            
-            places = [
-                PlaceResponse(
-                    id=row[0],
-                    name=row[1],
-                    address=row[2],
-                    is_default=bool(row[3]),
-                    created_at=row[4]
-                )
-                for row in rows
-            ]
-            return places
+            with pool.read() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id, name, address, is_default, created_at FROM places ORDER BY is_default DESC, name")
+                rows = cursor.fetchall()
+            
+                places = [
+                    PlaceResponse(
+                        id=row[0],
+                        name=row[1],
+                        address=row[2],
+                        is_default=bool(row[3]),
+                        created_at=row[4]
+                    )
+                    for row in rows
+                ]
+                return places
         
         loop = asyncio.get_event_loop()
         places = await loop.run_in_executor(thread_pool, fetch_places)
@@ -1543,36 +2234,34 @@ async def get_places():
 async def create_place(request: PlaceCreateRequest):
     """Create a new place"""
     try:
-        db_path = os.path.join(os.path.dirname(__file__), "public", "places.db")
+        pool = get_pool("places")
         
         def insert_place():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            with pool.write() as conn:
+                cursor = conn.cursor()
             
-            # If this is set as default, unset other defaults
-            if request.is_default:
-                cursor.execute("UPDATE places SET is_default = 0")
+                # If this is set as default, unset other defaults
+                if request.is_default:
+                    cursor.execute("UPDATE places SET is_default = 0")
             
-            cursor.execute('''
-                INSERT INTO places (name, address, is_default)
-                VALUES (?, ?, ?)
-            ''', (request.name, request.address, request.is_default))
+                cursor.execute('''
+                    INSERT INTO places (name, address, is_default)
+                    VALUES (?, ?, ?)
+                ''', (request.name, request.address, request.is_default))
             
-            place_id = cursor.lastrowid
-            conn.commit()
+                place_id = cursor.lastrowid
             
-            # Fetch the created place
-            cursor.execute("SELECT id, name, address, is_default, created_at FROM places WHERE id = ?", (place_id,))
-            row = cursor.fetchone()
-            conn.close()
+                # Fetch the created place
+                cursor.execute("SELECT id, name, address, is_default, created_at FROM places WHERE id = ?", (place_id,))
+                row = cursor.fetchone()
             
-            return PlaceResponse(
-                id=row[0],
-                name=row[1],
-                address=row[2],
-                is_default=bool(row[3]),
-                created_at=row[4]
-            )
+                return PlaceResponse(
+                    id=row[0],
+                    name=row[1],
+                    address=row[2],
+                    is_default=bool(row[3]),
+                    created_at=row[4]
+                )
         
         loop = asyncio.get_event_loop()
         new_place = await loop.run_in_executor(thread_pool, insert_place)
@@ -1616,143 +2305,50 @@ class MinutesGenerationRequest(BaseModel):
     signingPlace: str
 
 @app.post("/generate-minutes")
-async def generate_minutes(request: MinutesGenerationRequest):
-    """Generate meeting minutes document from template"""
+async def generate_minutes(request: MinutesGenerationRequest, http_request: Request):
+    """Generate meeting minutes document from template
+
+    The ETag is the document's content address (template contents and filled
+    values), so a repeated request is served from cache. A matching
+    If-None-Match is answered with 304 Not Modified without rendering.
+    """
     try:
         logger.info(f"Generating minutes for template: {request.template}")
         
-        # Define template path
-        template_path = os.path.join(os.path.dirname(__file__), "public", "templates", f"{request.template.lower()}_meeting_template.docx")
+        template_file = template_path(request.template)
         
-        if not os.path.exists(template_path):
+        if not os.path.exists(template_file):
             raise HTTPException(status_code=404, detail=f"Template {request.template} not found")
         
+        if_none_match = http_request.headers.get("if-none-match")
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"meeting_minutes_{request.template}_{timestamp}.docx"
+        
         def generate_document():
-            # Load the template
-            doc = DocxDocument(template_path)
-            
-            # Get non-chairman directors for signature tables
-            non_chairman_directors = [d for d in request.presentDirectors if d.get('name') != request.chairmanName]
-            director_for_signature = non_chairman_directors[0] if non_chairman_directors else (request.presentDirectors[0] if request.presentDirectors else {'name': '', 'din': ''})
-            
-            # Create basic placeholder mapping
-            placeholders = {
-                '[No. of Meeting]': request.meetingNumber,
-                '[Type of Meeting]': request.meetingType,
-                '[Name of Company]': request.companyName,
-                '[Day of Meeting]': request.meetingDay,
-                '[Date of Meeting]': request.meetingDate,
-                '[Time: COMMENCED AT]': request.meetingStartTime,
-                '[Time: CONCLUDED AT]': request.meetingEndTime,
-                '[Place of Meeting]': request.meetingPlace,
-                '[Chairman]': request.chairmanName,
-                '[Director]': director_for_signature.get('name', ''),  # Different from chairman
-                '[Date-previous-meeting]': request.previousMeetingDate,
-                '[amount]': request.auditorPaymentAmount,
-                '[Amount-in-words]': request.auditorPaymentWords,
-                '[amount-in-words]': request.auditorPaymentWords,
-                '[Year]': request.financialYear,
-                '[year]': request.financialYear,
-                '[YEAR]': request.financialYear,
-                '[start-year]': request.financialYear.split('-')[0] if '-' in request.financialYear else request.financialYear,
-                '[end-year]': request.financialYear.split('-')[1] if '-' in request.financialYear else str(int(request.financialYear) + 1),
-                '[Day-of-meeting]': request.meetingDay,
-                '[Month-of-meeting]': request.agmMonthName,
-                '[TIME]': request.agmTime,
-                '[Office-address]': request.agmPlace,
-                '[Date-of-Recording]': request.recordingDate,
-                '[Date-of-signing]': request.signingDate,
-                '[Place of signing]': request.signingPlace,
-                '[Officer]': request.companySecretary or request.authorisedOfficer,
-            }
-            
-            # Replace basic placeholders in paragraphs first
-            for para in doc.paragraphs:
-                for placeholder, value in placeholders.items():
-                    if placeholder in para.text:
-                        para.text = para.text.replace(placeholder, str(value))
-            
-            # Replace basic placeholders in tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for placeholder, value in placeholders.items():
-                            if placeholder in cell.text:
-                                cell.text = cell.text.replace(placeholder, str(value))
-            
-            # Replace placeholders in headers and footers
-            for section in doc.sections:
-                # Replace in header
-                for para in section.header.paragraphs:
-                    for placeholder, value in placeholders.items():
-                        if placeholder in para.text:
-                            para.text = para.text.replace(placeholder, str(value))
-                
-                # Replace in header tables
-                for table in section.header.tables:
-                    for row in table.rows:
-                        for cell in row.cells:
-                            for placeholder, value in placeholders.items():
-                                if placeholder in cell.text:
-                                    cell.text = cell.text.replace(placeholder, str(value))
-                
-                # Replace in footer
-                for para in section.footer.paragraphs:
-                    for placeholder, value in placeholders.items():
-                        if placeholder in para.text:
-                            para.text = para.text.replace(placeholder, str(value))
-                
-                # Replace in footer tables
-                for table in section.footer.tables:
-                    for row in table.rows:
-                        for cell in row.cells:
-                            for placeholder, value in placeholders.items():
-                                if placeholder in cell.text:
-                                    cell.text = cell.text.replace(placeholder, str(value))
-            
-            # Smart replacement for [Dir-name] and [Din-num] - replace each occurrence with different directors
-            if request.presentDirectors and len(request.presentDirectors) > 0:
-                director_index = 0
-                total_directors = len(request.presentDirectors)
-                
-                # Replace in paragraphs - each occurrence gets a different director
-                for para in doc.paragraphs:
-                    while '[Dir-name]' in para.text or '[Din-num]' in para.text:
-                        if director_index < total_directors:
-                            current_director = request.presentDirectors[director_index]
-                            # Replace only the first occurrence in this paragraph
-                            if '[Dir-name]' in para.text:
-                                para.text = para.text.replace('[Dir-name]', current_director.get('name', ''), 1)
-                            if '[Din-num]' in para.text:
-                                para.text = para.text.replace('[Din-num]', current_director.get('din', ''), 1)
-                            director_index += 1
-                        else:
-                            # No more directors, use empty or repeat
-                            para.text = para.text.replace('[Dir-name]', '')
-                            para.text = para.text.replace('[Din-num]', '')
-                            break
-
-            
-            # Generate filename
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"meeting_minutes_{request.template}_{timestamp}.docx"
-            output_path = os.path.join(os.path.dirname(__file__), "public", "templates", filename)
-            
-            # Save the document
-            doc.save(output_path)
-            
-            return filename, output_path
+            compiled = minutes_templates.load(template_file)
+            values = placeholder_values(request)
+            key = compiled.render_key(values, request.presentDirectors)
+            if etag_matches(if_none_match, f'"{key}"'):
+                return key, None
+            data = rendered_minutes.get(key)
+            if data is None:
+                # Fill the compiled template's placeholder slots in one pass
+                data = compiled.render_docx(values, request.presentDirectors)
+                rendered_minutes.put(key, data)
+                minutes_archive.save(filename, data)
+            return key, data
         
         # Run document generation in thread pool
         loop = asyncio.get_event_loop()
-        filename, output_path = await loop.run_in_executor(thread_pool, generate_document)
+        key, data = await loop.run_in_executor(thread_pool, generate_document)
         
-        # Return file for download
-        return FileResponse(
-            path=output_path,
-            filename=filename,
-            media_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-        )
+        headers = {"ETag": f'"{key}"'}
+        if data is None:
+            return Response(status_code=304, headers=headers)
+        
+        # Send the document straight from memory
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return Response(content=data, media_type=DOCX_MEDIA_TYPE, headers=headers)
         
     except HTTPException:
         raise
@@ -1760,6 +2356,123 @@ async def generate_minutes(request: MinutesGenerationRequest):
         logger.error(f"Error generating minutes: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate minutes: {str(e)}")
 
+# Add endpoint to generate minutes for many companies in one request
+@app.post("/generate-minutes/batch")
+async def generate_minutes_batch(requests: List[MinutesGenerationRequest]):
+    """Generate meeting minutes for many requests and stream them back as one ZIP archive
+
+    Documents are added to the archive as they are rendered. Items that fail
+    are reported in the archive's manifest.json instead of failing the batch.
+    """
+    if not requests:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(requests) > BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {BATCH_LIMIT} requests")
+    
+    logger.info(f"Generating minutes batch of {len(requests)} documents")
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    
+    def record_item(index, data, error):
+        if error is not None:
+            logger.warning(f"Minutes batch item {index} failed: {error}")
+    
+    def archive_item(index, data):
+        # As for single documents, only newly rendered ones are archived
+        minutes_archive.save(f"meeting_minutes_{requests[index].template}_{timestamp}_{index + 1:03d}.docx", data)
+    
+    return StreamingResponse(
+        stream_zip(batch_entries(minutes_templates, requests, render_pool, on_item=record_item,
+                                 rendered=rendered_minutes, on_render=archive_item)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="meeting_minutes_batch_{timestamp}.zip"'}
+    )
+
+def job_status(job: dict) -> JobStatusResponse:
+    if job["status"] == SUCCEEDED:
+        job["result_url"] = f"/api/jobs/{job['id']}/result"
+    return JobStatusResponse(**job)
+
+async def queue_job(kind: str, payload: dict) -> JobStatusResponse:
+    if not job_workers.running:
+        raise HTTPException(status_code=503, detail="Background jobs are disabled")
+    pool = get_pool("jobs")
+    loop = asyncio.get_event_loop()
+    job = await loop.run_in_executor(thread_pool, lambda: submit_job(pool, kind, payload))
+    logger.info(f"Queued {kind} job {job['id']}")
+    return job_status(job)
+
+# Background versions of the document endpoints: submit, then poll /api/jobs/{job_id}
+@app.post("/api/jobs/minutes", response_model=JobStatusResponse, status_code=202)
+async def submit_minutes_job(request: MinutesGenerationRequest):
+    """Queue generation of one minutes document"""
+    return await queue_job("minutes", jsonable_encoder(request))
+
+@app.post("/api/jobs/minutes-batch", response_model=JobStatusResponse, status_code=202)
+async def submit_minutes_batch_job(requests: List[MinutesGenerationRequest]):
+    """Queue a minutes batch; the result is the same ZIP as /generate-minutes/batch"""
+    if not requests:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(requests) > BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {BATCH_LIMIT} requests")
+    return await queue_job("minutes_batch", {"requests": jsonable_encoder(requests)})
+
+@app.post("/api/jobs/disclosures-bundle", response_model=JobStatusResponse, status_code=202)
+async def submit_disclosure_bundle_job(selection: DisclosureBundleRequest):
+    """Queue a ZIP of disclosure documents selected by ids, director and/or month"""
+    month = validate_bundle_selection(selection.ids, selection.director, selection.month)
+    return await queue_job("disclosure_bundle", {"ids": selection.ids, "director": selection.director, "month": month})
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """Get a job's status and progress"""
+    try:
+        pool = get_pool("jobs")
+        
+        def fetch_job():
+            with pool.read() as conn:
+                return get_job(conn, job_id)
+        
+        loop = asyncio.get_event_loop()
+        job = await loop.run_in_executor(thread_pool, fetch_job)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found or expired")
+        return job_status(job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch job: {str(e)}")
+
+@app.get("/api/jobs/{job_id}/result")
+async def download_job_result(job_id: str):
+    """Download the result of a finished job"""
+    pool = get_pool("jobs")
+    
+    def fetch_job():
+        with pool.read() as conn:
+            return get_job(conn, job_id)
+    
+    loop = asyncio.get_event_loop()
+    job = await loop.run_in_executor(thread_pool, fetch_job)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job["status"] != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    result_path = os.path.join(JOB_RESULTS_DIR, job_id)
+    if not os.path.exists(result_path):
+        raise HTTPException(status_code=404, detail="Job result has expired")
+    return FileResponse(path=result_path, filename=job["result_name"], media_type=job["result_type"])
+
+@app.delete("/api/jobs/{job_id}", response_model=JobStatusResponse)
+async def cancel_job_endpoint(job_id: str):
+    """Cancel a queued or running job"""
+    pool = get_pool("jobs")
+    loop = asyncio.get_event_loop()
+    job = await loop.run_in_executor(thread_pool, lambda: cancel_job(pool, job_id, job_workers.result_ttl))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job_status(job)
+
 
 
 
@@ -0,0 +1,136 @@
+"""
+Materialized SEBI and RBI monthly notification counts for the federated feed.
+
+Each regulator's database keeps a small per-month count table next to its
+summaries table, with triggers that keep it current as the ingest jobs
+insert, update or delete rows. The feed then reads a handful of rollup rows
+from the attached databases instead of grouping both tables on every call.
+As with the BSE rollups, missing triggers mean the summaries table was
+replaced wholesale, so the counts are rebuilt from scratch.
+"""
+
+import logging
+from typing import List
+
+from db_migrations import DMY_DATE_TO_ISO
+
+logger = logging.getLogger(__name__)
+
+# Source name -> where its rows live and which of them the feed lists
+FEED_ROLLUPS = {
+    "sebi": {
+        "database": "sebi",
+        "table": "excel_summaries",
+        "rollup": "sebi_monthly_counts",
+        # Evaluated against NEW/OLD/the table; '' for rows without a usable date
+        "month": "substr(" + DMY_DATE_TO_ISO.format(col="{row}.date_key") + ", 1, 7)",
+        "listed": "1",
+        "columns": ["date_key"],
+    },
+    "rbi": {
+        "database": "rbi",
+        "table": "master_summaries",
+        "rollup": "rbi_monthly_counts",
+        # The raw run_date, since run_date_iso is only filled in by a later trigger
+        "month": "substr(" + DMY_DATE_TO_ISO.format(col="{row}.run_date") + ", 1, 7)",
+        "listed": "NOT ({row}.pdf_link = 'NIL' AND {row}.summary = 'NIL')",
+        "columns": ["run_date", "pdf_link", "summary"],
+    },
+}
+
+
+def _trigger_names(source: dict) -> List[str]:
+    return [f"trg_{source['rollup']}_{event}" for event in ("insert", "delete", "update_old", "update_new")]
+
+
+def _increment(source: dict, row: str) -> str:
+    return (
+        f"INSERT INTO {source['rollup']} (month, count) VALUES ({source['month'].format(row=row)}, 1) "
+        f"ON CONFLICT(month) DO UPDATE SET count = count + 1;"
+    )
+
+
+def _decrement(source: dict, row: str) -> str:
+    month = source["month"].format(row=row)
+    return (
+        f"UPDATE {source['rollup']} SET count = count - 1 WHERE month = {month};\n"
+        f"DELETE FROM {source['rollup']} WHERE month = {month} AND count <= 0;"
+    )
+
+
+def _create_triggers(conn, source: dict):
+    table, columns = source["table"], ", ".join(source["columns"])
+    insert_trigger, delete_trigger, update_old_trigger, update_new_trigger = _trigger_names(source)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {insert_trigger}
+        AFTER INSERT ON {table} WHEN {source['listed'].format(row='NEW')}
+        BEGIN
+        {_increment(source, 'NEW')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {delete_trigger}
+        AFTER DELETE ON {table} WHEN {source['listed'].format(row='OLD')}
+        BEGIN
+        {_decrement(source, 'OLD')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {update_old_trigger}
+        AFTER UPDATE OF {columns} ON {table} WHEN {source['listed'].format(row='OLD')}
+        BEGIN
+        {_decrement(source, 'OLD')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {update_new_trigger}
+        AFTER UPDATE OF {columns} ON {table} WHEN {source['listed'].format(row='NEW')}
+        BEGIN
+        {_increment(source, 'NEW')}
+        END
+    """)
+
+
+def rebuild_feed_rollup(conn, source: dict):
+    """Recreate a source's monthly count table from its summaries and install the triggers"""
+    table, rollup = source["table"], source["rollup"]
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {rollup} (
+            month TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute(f"DELETE FROM {rollup}")
+    conn.execute(f"""
+        INSERT INTO {rollup} (month, count)
+        SELECT {source['month'].format(row=table)}, COUNT(*)
+        FROM {table}
+        WHERE {source['listed'].format(row=table)}
+        GROUP BY 1
+    """)
+    _create_triggers(conn, source)
+
+
+def feed_rollup_installed(conn, source: dict) -> bool:
+    """Whether a source's rollup triggers are in place on its summaries table"""
+    names = _trigger_names(source)
+    placeholders = ",".join("?" for _ in names)
+    row = conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+        names
+    ).fetchone()
+    return row[0] == len(names)
+
+
+def ensure_feed_rollup(pool, source: dict) -> bool:
+    """Rebuild a source's monthly counts on its own pool if their triggers are missing"""
+    with pool.read() as conn:
+        if feed_rollup_installed(conn, source):
+            return False
+    with pool.write() as conn:
+        # Another thread may have rebuilt them while we waited for the writer
+        if feed_rollup_installed(conn, source):
+            return False
+        logger.info(f"Rebuilding {source['rollup']}")
+        rebuild_feed_rollup(conn, source)
+    return True
@@ -0,0 +1,341 @@
+"""
+In-process watcher for the document directories under backend/public.
+
+Each watched directory has a callback that receives the set of file names
+that changed in it. On Linux the watcher reads inotify events directly
+(through ctypes, no extra dependency); elsewhere, or if inotify cannot be
+initialised, it falls back to polling directory listings. Bursts of events
+are debounced so a file copied in several writes is reported once, after
+the directory has been quiet for the debounce interval.
+
+If the kernel's inotify queue overflows, events have been lost, so every
+directory gets its rescan callback instead of a list of names. A directory
+that is missing, or is deleted or moved away, is not watched: watching()
+reports False for it, so callers rescan it themselves, and it is checked
+every poll interval until it appears again. Losing or regaining a watch
+also rescans the directory, since its changes in between were not seen.
+"""
+
+import os
+import sys
+import time
+import errno
+import ctypes
+import ctypes.util
+import select
+import struct
+import logging
+import threading
+from typing import Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+# The watched directory itself went away; IN_IGNORED follows once the kernel drops the watch
+WATCH_LOST = IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED
+EVENT_HEADER = struct.Struct("iIII")
+
+ChangeCallback = Callable[[Set[str]], None]
+RescanCallback = Callable[[], None]
+
+
+class _Inotify:
+    """Minimal ctypes binding for inotify_init1/inotify_add_watch/inotify_rm_watch"""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, directory: str) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        return wd
+
+    def rm_watch(self, wd: int):
+        # Fails harmlessly if the kernel already dropped the watch
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self, timeout: float):
+        """Yield (wd, mask, name) for events that arrive within timeout seconds"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return
+            raise
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            yield wd, mask, name
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DirectoryWatcher:
+    """Debounced change notifications for a fixed set of directories"""
+
+    def __init__(self, mode: str = "auto", debounce: float = 0.5, poll_interval: float = 2.0):
+        self.mode = mode
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.backend = None
+        self._callbacks: Dict[str, ChangeCallback] = {}
+        self._rescans: Dict[str, Optional[RescanCallback]] = {}
+        self._filters: Dict[str, Callable[[str], bool]] = {}
+        self._pending: Dict[str, Set[str]] = {}
+        self._stale: Set[str] = set()
+        self._watched: Set[str] = set()
+        self._overflowed = False
+        self._last_event = 0.0
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+        self._stats = {"events": 0, "dispatches": 0, "overflows": 0, "callback_errors": 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether changes are being watched: the thread is alive and its watches are in place"""
+        return self._thread is not None and self._thread.is_alive() and self._ready.is_set()
+
+    def watching(self, directory: str) -> bool:
+        """Whether changes in one directory are being seen, i.e. it exists and has its watch"""
+        return self.running and os.path.abspath(directory) in self._watched
+
+    def watch(self, directory: str, callback: ChangeCallback, include: Optional[Callable[[str], bool]] = None,
+              rescan: Optional[RescanCallback] = None):
+        """Register a directory; callback gets the changed file names accepted by include
+
+        rescan is called instead when events may have been lost; without one,
+        callback gets every current file name accepted by include.
+        """
+        directory = os.path.abspath(directory)
+        self._callbacks[directory] = callback
+        self._rescans[directory] = rescan
+        self._filters[directory] = include or (lambda name: True)
+
+    def start(self):
+        if self.mode == "off" or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name="fs-watcher", daemon=True)
+        self._thread.start()
+
+    def wait_ready(self, timeout: float = 5.0) -> bool:
+        """Wait until every directory is watched (or the watcher gave up) and return running"""
+        if self._thread is not None:
+            self._ready.wait(timeout)
+        return self.running
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._ready.clear()
+        self._watched = set()
+
+    def _note(self, directory: str, name: str):
+        if name and self._filters[directory](name):
+            self._pending.setdefault(directory, set()).add(name)
+            self._last_event = time.monotonic()
+            with self._stats_lock:
+                self._stats["events"] += 1
+
+    def _overflow(self):
+        if not self._overflowed:
+            logger.warning("inotify queue overflowed; rescanning every watched directory")
+        self._overflowed = True
+        self._last_event = time.monotonic()
+        with self._stats_lock:
+            self._stats["overflows"] += 1
+
+    def _rescan(self, directory: str):
+        rescan = self._rescans[directory]
+        if rescan is not None:
+            rescan()
+            return
+        try:
+            names = {name for name in os.listdir(directory) if self._filters[directory](name)}
+        except FileNotFoundError:
+            names = set()
+        self._callbacks[directory](names)
+
+    def _mark_stale(self, directory: str):
+        self._stale.add(directory)
+        self._last_event = time.monotonic()
+
+    def _dispatch(self):
+        pending, self._pending = self._pending, {}
+        stale, self._stale = self._stale, set()
+        overflowed, self._overflowed = self._overflowed, False
+        if overflowed:
+            stale = set(self._callbacks)
+        for directory in [d for d in self._callbacks if d in stale or d in pending]:
+            try:
+                if directory in stale:
+                    self._rescan(directory)
+                else:
+                    self._callbacks[directory](pending[directory])
+            except Exception as e:
+                logger.error(f"Watcher callback for {directory} failed: {e}")
+                with self._stats_lock:
+                    self._stats["callback_errors"] += 1
+        with self._stats_lock:
+            self._stats["dispatches"] += 1
+
+    def _run(self):
+        inotify = None
+        if self.mode in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try:
+                inotify = _Inotify()
+            except (OSError, AttributeError) as e:
+                logger.warning(f"inotify unavailable, falling back to polling: {e}")
+        try:
+            if inotify is not None:
+                self._run_inotify(inotify)
+            else:
+                self._run_polling()
+        finally:
+            # Release anyone waiting in wait_ready; running is false once the thread exits
+            self._ready.set()
+            if inotify is not None:
+                inotify.close()
+
+    def _add_watches(self, inotify: _Inotify, directories: Dict[int, str]) -> Set[str]:
+        """Watch every registered directory that exists and is not watched yet; returns the new ones"""
+        added = set()
+        for directory in self._callbacks:
+            if directory in self._watched or not os.path.isdir(directory):
+                continue
+            try:
+                wd = inotify.add_watch(directory)
+            except OSError as e:
+                # Removed again between the check and the watch
+                logger.warning(f"Could not watch {directory}: {e}")
+                continue
+            directories[wd] = directory
+            self._watched.add(directory)
+            added.add(directory)
+        return added
+
+    def _run_inotify(self, inotify: _Inotify):
+        self.backend = "inotify"
+        directories: Dict[int, str] = {}
+        self._add_watches(inotify, directories)
+        for directory in self._callbacks:
+            if directory not in self._watched:
+                logger.warning(f"Not watching missing directory {directory} until it appears")
+        logger.info(f"Watching {len(directories)} directories with inotify")
+        self._ready.set()
+
+        last_check = time.monotonic()
+        while not self._stop.is_set():
+            missing = len(self._watched) < len(self._callbacks)
+            if self._pending or self._stale or self._overflowed:
+                timeout = self.debounce
+            else:
+                timeout = min(1.0, self.poll_interval) if missing else 1.0
+            for wd, mask, name in inotify.read_events(timeout):
+                if mask & IN_Q_OVERFLOW:
+                    self._overflow()
+                elif wd not in directories:
+                    continue
+                elif mask & WATCH_LOST:
+                    directory = directories.pop(wd)
+                    inotify.rm_watch(wd)
+                    self._watched.discard(directory)
+                    logger.warning(f"Watched directory {directory} was removed; waiting for it to reappear")
+                    self._mark_stale(directory)
+                elif not mask & IN_ISDIR:
+                    self._note(directories[wd], name)
+            if missing and time.monotonic() - last_check >= self.poll_interval:
+                last_check = time.monotonic()
+                for directory in self._add_watches(inotify, directories):
+                    logger.info(f"Watching {directory} again")
+                    self._mark_stale(directory)
+            if (self._pending or self._stale or self._overflowed) and time.monotonic() - self._last_event >= self.debounce:
+                self._dispatch()
+
+    def _snapshot(self, directory: str) -> Dict[str, tuple]:
+        snapshot = {}
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return snapshot
+        for name in names:
+            try:
+                st = os.stat(os.path.join(directory, name))
+            except FileNotFoundError:
+                continue
+            if not os.path.isdir(os.path.join(directory, name)):
+                snapshot[name] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def _run_polling(self):
+        self.backend = "polling"
+        logger.info(f"Polling {len(self._callbacks)} directories every {self.poll_interval}s")
+        snapshots = {directory: self._snapshot(directory) for directory in self._callbacks}
+        # A missing directory polls as empty, and its files show up as changes once it appears
+        self._watched = set(self._callbacks)
+        self._ready.set()
+        while not self._stop.wait(self.poll_interval):
+            for directory, previous in snapshots.items():
+                current = self._snapshot(directory)
+                for name in set(previous) | set(current):
+                    if previous.get(name) != current.get(name):
+                        self._note(directory, name)
+                snapshots[directory] = current
+            # A poll interval is already longer than any sensible debounce
+            if self._pending and time.monotonic() - self._last_event >= min(self.debounce, self.poll_interval):
+                self._dispatch()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        snapshot["backend"] = self.backend
+        snapshot["running"] = self.running
+        snapshot["directories"] = [os.path.basename(d) for d in self._callbacks]
+        snapshot["unwatched"] = [os.path.basename(d) for d in self._callbacks if d not in self._watched]
+        return snapshot
+
+
+def create_directory_watcher() -> DirectoryWatcher:
+    """Build the application watcher from FS_WATCHER, FS_WATCH_DEBOUNCE and FS_WATCH_POLL_INTERVAL"""
+    return DirectoryWatcher(
+        mode=os.getenv("FS_WATCHER", "auto"),
+        debounce=float(os.getenv("FS_WATCH_DEBOUNCE", "0.5")),
+        poll_interval=float(os.getenv("FS_WATCH_POLL_INTERVAL", "2")),
+    )
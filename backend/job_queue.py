@@ -0,0 +1,337 @@
+"""
+Persistent background job queue for long-running document work.
+
+Jobs are rows in public/jobs.db. Submitting a job only inserts a row, so
+the request returns at once; a small set of worker processes claim queued
+jobs one at a time, run the handler registered for the job's kind, and
+record progress, the outcome and the path of the result file under
+public/job_results. A running job is cancelled cooperatively the next time
+its handler reports progress. Finished jobs and their results are kept for
+JOB_RESULT_TTL seconds and then purged.
+
+A supervisor thread in the server restarts workers that die and requeues
+the jobs they held; jobs left running by a previous server process are
+requeued at startup, up to MAX_ATTEMPTS tries.
+"""
+
+import os
+import json
+import time
+import uuid
+import signal
+import logging
+import threading
+import multiprocessing
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from db_pool import get_pool, PUBLIC_DIR
+from worker_processes import worker_context
+
+logger = logging.getLogger(__name__)
+
+JOB_RESULTS_DIR = os.path.join(PUBLIC_DIR, "job_results")
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+MAX_ATTEMPTS = 3
+
+# Seconds between purges of expired jobs and between worker liveness checks
+PURGE_INTERVAL = 60
+SUPERVISE_INTERVAL = 5
+
+JOB_COLUMNS = (
+    "id, kind, status, done, total, message, error, result_name, result_type, attempts, "
+    "cancel_requested, created_at, started_at, finished_at, expires_at"
+)
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled"""
+
+
+class JobContext:
+    """What a handler gets besides its payload: where to write the result and how to report progress"""
+
+    def __init__(self, pool, job_id: str):
+        self.pool = pool
+        self.job_id = job_id
+        self.result_path = os.path.join(JOB_RESULTS_DIR, job_id)
+
+    def progress(self, done: int, total: int, message: Optional[str] = None):
+        """Record progress and raise JobCancelled if the job has been cancelled"""
+        with self.pool.write() as conn:
+            conn.execute(
+                "UPDATE jobs SET done = ?, total = ?, message = COALESCE(?, message) WHERE id = ?",
+                (done, total, message, self.job_id)
+            )
+            cancelled = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (self.job_id,)).fetchone()
+        if cancelled is None or cancelled[0]:
+            raise JobCancelled()
+
+
+# A handler writes its result to ctx.result_path and returns (download file name, media type)
+JobHandler = Callable[[JobContext, dict], Tuple[str, str]]
+
+
+def _job_dict(row) -> dict:
+    keys = [column.strip() for column in JOB_COLUMNS.split(",")]
+    job = dict(zip(keys, row))
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    for key in ("created_at", "started_at", "finished_at", "expires_at"):
+        if job[key] is not None:
+            job[key] = datetime.fromtimestamp(job[key]).isoformat(timespec="seconds")
+    return job
+
+
+def submit_job(pool, kind: str, payload: dict) -> dict:
+    """Queue a job and return its status"""
+    job_id = uuid.uuid4().hex
+    with pool.write() as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, kind, payload, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload), time.time())
+        )
+        row = conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return _job_dict(row)
+
+
+def get_job(conn, job_id: str) -> Optional[dict]:
+    row = conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return _job_dict(row) if row is not None else None
+
+
+def cancel_job(pool, job_id: str, result_ttl: float) -> Optional[dict]:
+    """Cancel a queued job at once, or ask a running one to stop; finished jobs are left as they are"""
+    now = time.time()
+    with pool.write() as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, expires_at = ? WHERE id = ? AND status = ?",
+            (CANCELLED, now, now + result_ttl, job_id, QUEUED)
+        )
+        conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING))
+        return get_job(conn, job_id)
+
+
+def claim_next_job(pool) -> Optional[tuple]:
+    """Mark the oldest queued job running for this process and return (id, kind, payload)"""
+    with pool.write() as conn:
+        while True:
+            row = conn.execute(
+                "SELECT id, kind, payload FROM jobs WHERE status = ? ORDER BY created_at, rowid LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            # Another worker process may claim the same job between the SELECT and the UPDATE
+            claimed = conn.execute("""
+                UPDATE jobs SET status = ?, worker_pid = ?, started_at = ?, attempts = attempts + 1,
+                    done = 0, total = 0, message = NULL
+                WHERE id = ? AND status = ?
+            """, (RUNNING, os.getpid(), time.time(), row[0], QUEUED)).rowcount
+            if claimed:
+                return row
+
+
+def _remove_result(job_id: str):
+    try:
+        os.remove(os.path.join(JOB_RESULTS_DIR, job_id))
+    except FileNotFoundError:
+        pass
+
+
+def _finish_job(pool, job_id: str, status: str, result_ttl: float, error: Optional[str] = None,
+                result: Optional[Tuple[str, str]] = None):
+    now = time.time()
+    result_name, result_type = result or (None, None)
+    with pool.write() as conn:
+        conn.execute("""
+            UPDATE jobs SET status = ?, error = ?, result_name = ?, result_type = ?,
+                finished_at = ?, expires_at = ?, worker_pid = NULL
+            WHERE id = ?
+        """, (status, error, result_name, result_type, now, now + result_ttl, job_id))
+
+
+def run_job(pool, handlers: Dict[str, JobHandler], job: tuple, result_ttl: float):
+    """Run one claimed job to completion, recording its outcome"""
+    job_id, kind, payload = job
+    ctx = JobContext(pool, job_id)
+    handler = handlers.get(kind)
+    if handler is None:
+        _finish_job(pool, job_id, FAILED, result_ttl, error=f"Unknown job kind: {kind}")
+        return
+    try:
+        os.makedirs(JOB_RESULTS_DIR, exist_ok=True)
+        result = handler(ctx, json.loads(payload))
+    except JobCancelled:
+        _remove_result(job_id)
+        _finish_job(pool, job_id, CANCELLED, result_ttl)
+        logger.info(f"Job {job_id} ({kind}) cancelled")
+    except Exception as e:
+        _remove_result(job_id)
+        _finish_job(pool, job_id, FAILED, result_ttl, error=str(e))
+        logger.error(f"Job {job_id} ({kind}) failed: {e}")
+    else:
+        _finish_job(pool, job_id, SUCCEEDED, result_ttl, result=result)
+
+
+def requeue_jobs(pool, result_ttl: float, worker_pids: Optional[List[int]] = None) -> int:
+    """Requeue running jobs whose worker is gone (all running jobs when no pids are given)
+
+    Jobs that have already used MAX_ATTEMPTS tries are failed instead.
+    """
+    where, params = "status = ?", [RUNNING]
+    if worker_pids is not None:
+        if not worker_pids:
+            return 0
+        where += f" AND worker_pid IN ({','.join('?' for _ in worker_pids)})"
+        params.extend(worker_pids)
+    now = time.time()
+    with pool.write() as conn:
+        failed = conn.execute(
+            f"UPDATE jobs SET status = ?, error = ?, finished_at = ?, expires_at = ?, worker_pid = NULL "
+            f"WHERE {where} AND attempts >= ?",
+            [FAILED, "Worker exited while running the job", now, now + result_ttl] + params + [MAX_ATTEMPTS]
+        ).rowcount
+        requeued = conn.execute(
+            f"UPDATE jobs SET status = ?, worker_pid = NULL WHERE {where}", [QUEUED] + params
+        ).rowcount
+    if failed or requeued:
+        logger.warning(f"Requeued {requeued} and failed {failed} interrupted jobs")
+    return requeued
+
+
+def purge_expired_jobs(pool) -> int:
+    """Delete finished jobs past their expiry along with their result files"""
+    with pool.write() as conn:
+        expired = [row[0] for row in conn.execute(
+            "SELECT id FROM jobs WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+        )]
+        conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in expired])
+    for job_id in expired:
+        _remove_result(job_id)
+    if expired:
+        logger.info(f"Purged {len(expired)} expired jobs")
+    return len(expired)
+
+
+def _worker_main(handlers: Dict[str, JobHandler], poll_interval: float, result_ttl: float):
+    # SIGTERM from the server means exit once the current job is done; Ctrl+C is the server's to handle
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    pool = get_pool("jobs")
+    while not stop.is_set():
+        try:
+            job = claim_next_job(pool)
+        except Exception as e:
+            logger.error(f"Could not claim a job: {e}")
+            job = None
+        if job is None:
+            stop.wait(poll_interval)
+            continue
+        run_job(pool, handlers, job, result_ttl)
+
+
+class JobWorkers:
+    """Worker processes for the job queue plus the thread that supervises them"""
+
+    def __init__(self, handlers: Dict[str, JobHandler], workers: int = 2, poll_interval: float = 0.5,
+                 result_ttl: float = 3600):
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.result_ttl = result_ttl
+        # Workers are restarted from the supervisor thread while the server runs, so never fork them
+        self._context = worker_context()
+        self._processes: List[multiprocessing.Process] = []
+        self._stop = threading.Event()
+        self._supervisor = None
+        self._stats = {"restarts": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._supervisor is not None and self._supervisor.is_alive()
+
+    def _spawn(self) -> multiprocessing.Process:
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self.handlers, self.poll_interval, self.result_ttl),
+            name="job-worker",
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def start(self):
+        if self.workers <= 0 or self.running:
+            return
+        pool = get_pool("jobs")
+        requeue_jobs(pool, self.result_ttl)
+        self._stop.clear()
+        self._processes = [self._spawn() for _ in range(self.workers)]
+        self._supervisor = threading.Thread(target=self._supervise, name="job-supervisor", daemon=True)
+        self._supervisor.start()
+        logger.info(f"Started {self.workers} job workers")
+
+    def _supervise(self):
+        pool = get_pool("jobs")
+        last_purge = 0.0
+        while not self._stop.wait(SUPERVISE_INTERVAL):
+            try:
+                for i, process in enumerate(self._processes):
+                    if not process.is_alive():
+                        logger.warning(f"Job worker {process.pid} exited with {process.exitcode}; restarting")
+                        requeue_jobs(pool, self.result_ttl, [process.pid])
+                        self._processes[i] = self._spawn()
+                        self._stats["restarts"] += 1
+                if time.monotonic() - last_purge >= PURGE_INTERVAL:
+                    purge_expired_jobs(pool)
+                    last_purge = time.monotonic()
+            except Exception as e:
+                logger.error(f"Job supervisor check failed: {e}")
+
+    def stop(self, timeout: float = 10):
+        """Let workers finish their current job, then stop them"""
+        self._stop.set()
+        if self._supervisor is not None:
+            self._supervisor.join(timeout=SUPERVISE_INTERVAL + 1)
+            self._supervisor = None
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(timeout=max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                # Its job stays running and is requeued on the next start
+                process.kill()
+                process.join(timeout=1)
+        self._processes = []
+
+    def stats(self) -> dict:
+        counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED}
+        with get_pool("jobs").read() as conn:
+            for status, count in conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+                counts[status] = count
+        return {
+            "jobs": counts,
+            "workers": self.workers,
+            "alive": sum(1 for process in self._processes if process.is_alive()),
+            "restarts": self._stats["restarts"],
+            "result_ttl": self.result_ttl,
+        }
+
+
+def create_job_workers(handlers: Dict[str, JobHandler]) -> JobWorkers:
+    """Build the application workers from JOB_WORKERS, JOB_POLL_INTERVAL and JOB_RESULT_TTL"""
+    return JobWorkers(
+        handlers,
+        workers=int(os.getenv("JOB_WORKERS", "2")),
+        poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "0.5")),
+        result_ttl=float(os.getenv("JOB_RESULT_TTL", "3600")),
+    )
@@ -0,0 +1,113 @@
+"""
+Optional on-disk archive of generated meeting minutes.
+
+Minutes are generated in memory and sent straight to the client; nothing
+is written to disk unless MINUTES_ARCHIVE_DIR is set. When it is, each
+generated document is also saved there, and after every save the archive
+is trimmed to MINUTES_ARCHIVE_MAX_AGE_DAYS and MINUTES_ARCHIVE_MAX_FILES
+(oldest files go first; 0 disables a limit).
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PREFIX = "meeting_minutes_"
+ARCHIVE_SUFFIX = ".docx"
+
+
+def is_archived_minutes(name: str) -> bool:
+    return name.startswith(ARCHIVE_PREFIX) and name.endswith(ARCHIVE_SUFFIX)
+
+
+class MinutesArchive:
+    """Saves generated minutes to a directory and garbage-collects old ones"""
+
+    def __init__(self, directory: Optional[str], max_age_days: float = 30, max_files: int = 1000):
+        self.directory = os.path.abspath(directory) if directory else None
+        self.max_age_days = max_age_days
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._stats = {"saved": 0, "removed": 0, "errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def save(self, filename: str, data: bytes):
+        """Archive one generated document, if archiving is enabled, then apply retention"""
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, os.path.basename(filename))
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._stats["saved"] += 1
+            self.collect()
+        except OSError as e:
+            # Archiving is best effort; the client already has the document
+            logger.warning(f"Could not archive {filename}: {e}")
+            with self._lock:
+                self._stats["errors"] += 1
+
+    def collect(self) -> int:
+        """Delete archived minutes beyond the age and count limits; returns how many were removed"""
+        if not self.enabled or not os.path.isdir(self.directory):
+            return 0
+        with self._lock:
+            files = []
+            for name in os.listdir(self.directory):
+                if not is_archived_minutes(name):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    files.append((os.stat(path).st_mtime, path))
+                except FileNotFoundError:
+                    continue
+            files.sort(reverse=True)
+
+            expired = []
+            if self.max_files > 0:
+                expired.extend(files[self.max_files:])
+                files = files[:self.max_files]
+            if self.max_age_days > 0:
+                cutoff = time.time() - self.max_age_days * 86400
+                expired.extend(entry for entry in files if entry[0] < cutoff)
+
+            removed = 0
+            for _, path in expired:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    continue
+            self._stats["removed"] += removed
+        if removed:
+            logger.info(f"Removed {removed} archived minutes from {self.directory}")
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot["enabled"] = self.enabled
+        snapshot["directory"] = self.directory
+        snapshot["max_age_days"] = self.max_age_days
+        snapshot["max_files"] = self.max_files
+        return snapshot
+
+
+def create_minutes_archive() -> MinutesArchive:
+    """Build the application archive from MINUTES_ARCHIVE_DIR, MINUTES_ARCHIVE_MAX_AGE_DAYS and MINUTES_ARCHIVE_MAX_FILES"""
+    return MinutesArchive(
+        directory=os.getenv("MINUTES_ARCHIVE_DIR") or None,
+        max_age_days=float(os.getenv("MINUTES_ARCHIVE_MAX_AGE_DAYS", "30")),
+        max_files=int(os.getenv("MINUTES_ARCHIVE_MAX_FILES", "1000")),
+    )
@@ -0,0 +1,521 @@
+"""
+Compiled meeting-minutes templates.
+
+A template (public/templates/q1..q4_meeting_template.docx) is parsed once
+and every paragraph or table cell that contains a [placeholder] is recorded
+as a slot: its position in the document and its text split into literal
+and placeholder segments. Generating minutes then copies the parsed
+document and rewrites each slot once with the request's values, instead of
+re-reading the file and scanning every paragraph for every placeholder.
+Compiled templates are cached in memory and recompiled when the file's
+mtime or size changes.
+
+Generated documents are also cached by content address: a hash of the
+template file's contents and the values filled into it, so a repeated
+request is answered from memory (and can be revalidated by ETag).
+"""
+
+import io
+import os
+import re
+import json
+import copy
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from docx import Document as DocxDocument
+from docx.table import _Cell
+from docx.text.paragraph import Paragraph
+
+from worker_processes import worker_context
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "public", "templates")
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+PLACEHOLDER_PATTERN = re.compile(r"\[[^\[\]]*\]")
+
+# Batches smaller than this are rendered inline rather than across a process pool
+PARALLEL_THRESHOLD = 4
+
+# Compiled templates each render worker process keeps, keyed by content version
+WORKER_TEMPLATE_LIMIT = 8
+
+# Most requests accepted by one batch
+BATCH_LIMIT = 200
+
+# Filled from presentDirectors in turn, one director per occurrence, in body paragraphs only
+DIRECTOR_NAME = "[Dir-name]"
+DIRECTOR_DIN = "[Din-num]"
+
+
+def template_path(template: str) -> str:
+    return os.path.join(TEMPLATES_DIR, f"{template.lower()}_meeting_template.docx")
+
+
+def is_template_file(name: str) -> bool:
+    return name.endswith("_meeting_template.docx") and not name.startswith("~$")
+
+
+def placeholder_values(request) -> Dict[str, str]:
+    """Placeholder -> text for a MinutesGenerationRequest"""
+    # Get non-chairman directors for signature tables
+    non_chairman_directors = [d for d in request.presentDirectors if d.get('name') != request.chairmanName]
+    director_for_signature = non_chairman_directors[0] if non_chairman_directors else (request.presentDirectors[0] if request.presentDirectors else {'name': '', 'din': ''})
+
+    values = {
+        '[No. of Meeting]': request.meetingNumber,
+        '[Type of Meeting]': request.meetingType,
+        '[Name of Company]': request.companyName,
+        '[Day of Meeting]': request.meetingDay,
+        '[Date of Meeting]': request.meetingDate,
+        '[Time: COMMENCED AT]': request.meetingStartTime,
+        '[Time: CONCLUDED AT]': request.meetingEndTime,
+        '[Place of Meeting]': request.meetingPlace,
+        '[Chairman]': request.chairmanName,
+        '[Director]': director_for_signature.get('name', ''),  # Different from chairman
+        '[Date-previous-meeting]': request.previousMeetingDate,
+        '[amount]': request.auditorPaymentAmount,
+        '[Amount-in-words]': request.auditorPaymentWords,
+        '[amount-in-words]': request.auditorPaymentWords,
+        '[Year]': request.financialYear,
+        '[year]': request.financialYear,
+        '[YEAR]': request.financialYear,
+        '[start-year]': request.financialYear.split('-')[0] if '-' in request.financialYear else request.financialYear,
+        '[end-year]': request.financialYear.split('-')[1] if '-' in request.financialYear else str(int(request.financialYear) + 1),
+        '[Day-of-meeting]': request.meetingDay,
+        '[Month-of-meeting]': request.agmMonthName,
+        '[TIME]': request.agmTime,
+        '[Office-address]': request.agmPlace,
+        '[Date-of-Recording]': request.recordingDate,
+        '[Date-of-signing]': request.signingDate,
+        '[Place of signing]': request.signingPlace,
+        '[Officer]': request.companySecretary or request.authorisedOfficer,
+    }
+    return {placeholder: str(value) for placeholder, value in values.items()}
+
+
+def batch_member_name(index: int, request) -> str:
+    """File name of one batch item inside the returned ZIP archive"""
+    company = re.sub(r"[^\w.-]+", "_", request.companyName).strip("._") or "company"
+    return f"{index + 1:03d}_{company}_{request.template}.docx"
+
+
+def _segments(text: str) -> List[str]:
+    """Split text into alternating literal and placeholder parts (placeholders at odd indexes)"""
+    parts = []
+    last = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        parts.append(text[last:match.start()])
+        parts.append(match.group())
+        last = match.end()
+    parts.append(text[last:])
+    return parts
+
+
+def _stories(doc):
+    """(root element, proxy parent, is body) for the body and each distinct header and footer"""
+    yield doc.element.body, doc, True
+    seen = []
+    for section in doc.sections:
+        for story in (section.header, section.footer):
+            # Linked headers and footers resolve to an earlier section's part
+            element = story._element
+            if not any(element is other for other in seen):
+                seen.append(element)
+                yield element, story, False
+
+
+def _child_path(root, element) -> Tuple[int, ...]:
+    """Child indexes leading from root down to element"""
+    path = []
+    while element is not root:
+        parent = element.getparent()
+        path.append(parent.index(element))
+        element = parent
+    return tuple(reversed(path))
+
+
+class _Slot:
+    """A paragraph or table cell whose text contains placeholders"""
+
+    __slots__ = ("story", "path", "is_cell", "parts", "directors")
+
+    def __init__(self, story: int, path: Tuple[int, ...], is_cell: bool, parts: List[str], directors: bool):
+        self.story = story
+        self.path = path
+        self.is_cell = is_cell
+        self.parts = parts
+        self.directors = directors
+
+
+class CompiledTemplate:
+    """A parsed template and its placeholder slots; the parsed document is never modified"""
+
+    def __init__(self, file_path: str, data: Optional[bytes] = None):
+        self.file_path = file_path
+        if data is None:
+            with open(file_path, "rb") as f:
+                data = f.read()
+        # The file contents, so render workers compile exactly this version
+        self.data = data
+        self.version = hashlib.sha256(data).hexdigest()
+        self.document = DocxDocument(io.BytesIO(data))
+        self.slots: List[_Slot] = []
+        for story_index, (root, story, is_body) in enumerate(_stories(self.document)):
+            containers = [(p, False) for p in story.paragraphs]
+            cells = {}
+            for table in story.tables:
+                for row in table.rows:
+                    for cell in row.cells:
+                        # Merged cells repeat across the grid; fill each once
+                        cells.setdefault(id(cell._tc), cell)
+            containers.extend((cell, True) for cell in cells.values())
+            for container, is_cell in containers:
+                text = container.text
+                if "[" not in text:
+                    continue
+                parts = _segments(text)
+                if len(parts) > 1:
+                    element = container._tc if is_cell else container._p
+                    directors = is_body and not is_cell and any(
+                        part in (DIRECTOR_NAME, DIRECTOR_DIN) for part in parts[1::2]
+                    )
+                    self.slots.append(_Slot(story_index, _child_path(root, element), is_cell, parts, directors))
+
+    def render(self, values: Dict[str, str], directors: List[Dict[str, str]]):
+        """A filled copy of the template as a python-docx Document
+
+        Each slot is rewritten once with its final text, so a filled paragraph
+        or cell keeps its paragraph properties but becomes a single run.
+        """
+        doc = copy.deepcopy(self.document)
+        stories = list(_stories(doc))
+        targets = []
+        for slot in self.slots:
+            element = stories[slot.story][0]
+            for i in slot.path:
+                element = element[i]
+            targets.append(element)
+        director_index = 0
+        total_directors = len(directors)
+        for slot, element in zip(self.slots, targets):
+            parts = list(slot.parts)
+            changed = False
+            for i in range(1, len(parts), 2):
+                if parts[i] in values:
+                    parts[i] = values[parts[i]]
+                    changed = True
+            if slot.directors and total_directors:
+                # The n-th [Dir-name] and the n-th [Din-num] of a paragraph name the same director
+                occurrences = {DIRECTOR_NAME: 0, DIRECTOR_DIN: 0}
+                used = 0
+                for i in range(1, len(parts), 2):
+                    if parts[i] in occurrences:
+                        n = occurrences[parts[i]]
+                        occurrences[parts[i]] += 1
+                        used = max(used, n + 1)
+                        if director_index + n < total_directors:
+                            director = directors[director_index + n]
+                            parts[i] = director.get('name' if parts[i] == DIRECTOR_NAME else 'din', '')
+                        else:
+                            parts[i] = ''
+                director_index = min(director_index + used, total_directors)
+                changed = True
+            if not changed:
+                continue
+
+            story = stories[slot.story][1]
+            text = "".join(parts)
+            if slot.is_cell:
+                _Cell(element, story).text = text
+            else:
+                Paragraph(element, story).text = text
+        return doc
+
+    def render_key(self, values: Dict[str, str], directors: List[Dict[str, str]]) -> str:
+        """Content address of the document render_docx would produce for these values"""
+        canonical = json.dumps([self.version, values, directors], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def render_docx(self, values: Dict[str, str], directors: List[Dict[str, str]]) -> bytes:
+        """A filled copy of the template serialized as .docx bytes"""
+        buffer = io.BytesIO()
+        self.render(values, directors).save(buffer)
+        return buffer.getvalue()
+
+
+class TemplateCache:
+    """Compiled templates keyed by path, recompiled when the file's mtime or size changes"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Tuple[int, int], CompiledTemplate]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "compiles": 0}
+
+    def load(self, file_path: str) -> CompiledTemplate:
+        path = os.path.abspath(file_path)
+        st = os.stat(path)
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self._stats["hits"] += 1
+                return entry[1]
+            # Templates are few and small; compiling under the lock keeps it to one compile per change
+            compiled = CompiledTemplate(path)
+            self._entries[path] = (signature, compiled)
+            self._stats["compiles"] += 1
+            logger.info(f"Compiled {os.path.basename(path)}: {len(compiled.slots)} placeholder slots")
+            return compiled
+
+    def invalidate(self, file_path: Optional[str] = None):
+        """Drop one compiled template, or all of them when no path is given"""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(file_path), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["templates"] = [
+                {"file": os.path.basename(path), "slots": len(entry[1].slots)}
+                for path, entry in self._entries.items()
+            ]
+        return snapshot
+
+
+class RenderedCache:
+    """LRU of generated .docx bytes keyed by render_key, bounded by total size"""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return data
+
+    def put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self._stats["evictions"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["entries"] = len(self._entries)
+            snapshot["bytes"] = self._size
+        snapshot["max_bytes"] = self.max_bytes
+        return snapshot
+
+
+def create_rendered_cache() -> RenderedCache:
+    """Build the application cache of generated minutes, sized from MINUTES_CACHE_MAX_BYTES"""
+    return RenderedCache(max_bytes=int(os.getenv("MINUTES_CACHE_MAX_BYTES", str(32 * 1024 * 1024))))
+
+
+class RenderPool:
+    """Worker processes that render batch items, started on first use and shared by every batch
+
+    Workers get each item's template as (path, version, file contents) and
+    its filled values, never state inherited from the server, and keep their
+    own compiled copy per template version. A pool whose worker died is
+    replaced on the next submit.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "failed": 0, "restarts": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            self._stats["submitted"] += 1
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=worker_context())
+            try:
+                return self._executor.submit(fn, *args)
+            except BrokenProcessPool:
+                logger.warning("Minutes render pool is broken; starting a new one")
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=worker_context())
+                self._stats["restarts"] += 1
+                return self._executor.submit(fn, *args)
+
+    def record_failure(self):
+        with self._lock:
+            self._stats["failed"] += 1
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["started"] = self._executor is not None
+        snapshot["workers"] = self.workers
+        return snapshot
+
+
+def create_render_pool() -> RenderPool:
+    """Build the application render pool, sized from MINUTES_RENDER_WORKERS"""
+    return RenderPool(workers=int(os.getenv("MINUTES_RENDER_WORKERS", str(os.cpu_count() or 1))))
+
+
+# Templates compiled inside this process when it is a render worker; keyed by
+# content version, so an entry can never stand for a different template
+_worker_templates: "OrderedDict[str, CompiledTemplate]" = OrderedDict()
+
+
+def _render_worker(index: int, file_path: str, version: str, data: bytes, values: Dict[str, str],
+                   directors: List[Dict[str, str]]):
+    # Runs in a worker process: report failures instead of raising across the pool
+    try:
+        compiled = _worker_templates.get(version)
+        if compiled is None:
+            compiled = _worker_templates[version] = CompiledTemplate(file_path, data)
+            while len(_worker_templates) > WORKER_TEMPLATE_LIMIT:
+                _worker_templates.popitem(last=False)
+        return index, compiled.render_docx(values, directors), None
+    except Exception as e:
+        return index, None, str(e)
+
+
+def render_many(cache: TemplateCache, requests: List, pool: Optional[RenderPool] = None,
+                rendered: Optional[RenderedCache] = None,
+                on_render: Optional[Callable[[int, bytes], None]] = None) -> Iterator[tuple]:
+    """Render many MinutesGenerationRequests and yield (index, docx bytes, error) as each completes
+
+    Each distinct template is compiled (or taken from cache) once for the
+    whole batch. Requests already in the rendered cache are answered from it
+    first. Without a pool, or for batches under PARALLEL_THRESHOLD, the rest
+    are rendered inline; otherwise they are fanned out across the pool,
+    since python-docx holds the GIL. A render that fails in the pool,
+    including through a dead worker, is reported as that item's error.
+    on_render(index, data) is called only for documents that were rendered,
+    not taken from the cache.
+    """
+    compiled = {}
+    errors = {}
+    keys = {}
+    jobs = []
+    for index, request in enumerate(requests):
+        file_path = os.path.abspath(template_path(request.template))
+        if file_path not in compiled and file_path not in errors:
+            try:
+                compiled[file_path] = cache.load(file_path)
+            except FileNotFoundError:
+                errors[file_path] = f"Template {request.template} not found"
+            except Exception as e:
+                errors[file_path] = f"Template {request.template} could not be compiled: {e}"
+        if file_path in errors:
+            yield index, None, errors[file_path]
+            continue
+        try:
+            values = placeholder_values(request)
+        except Exception as e:
+            yield index, None, str(e)
+            continue
+        if rendered is not None:
+            keys[index] = compiled[file_path].render_key(values, request.presentDirectors)
+            data = rendered.get(keys[index])
+            if data is not None:
+                yield index, data, None
+                continue
+        jobs.append((index, compiled[file_path], values, request.presentDirectors))
+
+    def results():
+        if pool is None or not pool.enabled or len(jobs) < PARALLEL_THRESHOLD:
+            for index, template, values, directors in jobs:
+                try:
+                    yield index, template.render_docx(values, directors), None
+                except Exception as e:
+                    yield index, None, str(e)
+            return
+
+        futures = {
+            pool.submit(_render_worker, index, template.file_path, template.version, template.data, values, directors): index
+            for index, template, values, directors in jobs
+        }
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    pool.record_failure()
+                    yield futures[future], None, f"Rendering failed: {e or type(e).__name__}"
+        finally:
+            # A client that disconnects mid-batch should not leave queued renders running
+            for future in futures:
+                future.cancel()
+
+    for index, data, error in results():
+        if error is None:
+            if rendered is not None and index in keys:
+                rendered.put(keys[index], data)
+            if on_render is not None:
+                on_render(index, data)
+        yield index, data, error
+
+
+def batch_entries(cache: TemplateCache, requests: List, pool: Optional[RenderPool] = None,
+                  on_item: Optional[Callable[[int, Optional[bytes], Optional[str]], None]] = None,
+                  rendered: Optional[RenderedCache] = None,
+                  on_render: Optional[Callable[[int, bytes], None]] = None) -> Iterator[tuple]:
+    """ZIP entries for a batch: each rendered document as it completes, then manifest.json
+
+    on_item(index, data, error) is called as each request finishes, and
+    on_render as in render_many. Items that fail are listed with their error
+    in the manifest instead of an entry.
+    """
+    items = [None] * len(requests)
+    for index, data, error in render_many(cache, requests, pool, rendered, on_render):
+        request = requests[index]
+        item = {"index": index, "companyName": request.companyName, "template": request.template}
+        if on_item is not None:
+            on_item(index, data, error)
+        if error is None:
+            item["file"] = batch_member_name(index, request)
+            yield item["file"], data
+        else:
+            item["error"] = error
+        items[index] = item
+    failed = sum(1 for item in items if "error" in item)
+    manifest = {"total": len(items), "succeeded": len(items) - failed, "failed": failed, "items": items}
+    yield "manifest.json", json.dumps(manifest, indent=2).encode("utf-8")
@@ -0,0 +1,158 @@
+"""
+Server-side response cache for read-only GET endpoints.
+
+Every cached route declares which databases it reads. The ETag for a
+request is derived from the URL plus the current version token of each of
+those databases, so it can be computed without running the endpoint. A
+matching If-None-Match gets a 304 straight away; otherwise a cached body
+with the same ETag is replayed, and only a miss reaches the endpoint.
+"""
+
+import os
+import json
+import asyncio
+import uuid
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from db_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+# Route path -> databases whose contents determine the response
+CACHED_ROUTES: Dict[str, List[str]] = {
+    "/bse-alerts": ["notifications"],
+    "/sebi-analysis-data": ["sebi"],
+    "/rbi-analysis-data": ["rbi"],
+    "/bse-monthly-count": ["notifications"],
+    "/api/bse-alerts-monthly-count": ["notifications"],
+    "/api/bse-alerts-monthly-total": ["notifications"],
+    "/api/bse-alerts-entity-count": ["notifications"],
+    "/api/rbi-total-count": ["rbi"],
+    "/api/sebi-total-count": ["sebi"],
+    "/api/search": ["notifications", "sebi", "rbi"],
+    "/api/notifications-feed": ["notifications", "sebi", "rbi"],
+    "/emails": ["email"],
+    "/api/directors-master": ["directors"],
+    "/directors": ["directors"],
+    "/places": ["places"],
+}
+
+# Changes on every restart so ETags never outlive the process that issued them
+PROCESS_TAG = uuid.uuid4().hex
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value lists etag (or is *)"""
+    tags = [tag.strip() for tag in (if_none_match or "").split(",")]
+    return etag in tags or "*" in tags
+
+
+class ResponseCache:
+    """LRU of rendered GET responses bounded by total body size"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, routes: Optional[Dict[str, List[str]]] = None):
+        self.max_bytes = max_bytes
+        self.routes = dict(routes if routes is not None else CACHED_ROUTES)
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0, "evictions": 0}
+
+    def etag_for(self, path: str, query: str) -> str:
+        """Strong ETag for a request, derived from the versions of the databases it reads"""
+        versions = [get_pool(name).version() for name in self.routes[path]]
+        # Date-relative endpoints ("this month") must also roll over at midnight
+        seed = json.dumps([PROCESS_TAG, path, query, versions, date.today().isoformat()])
+        return '"' + hashlib.sha1(seed.encode("utf-8")).hexdigest() + '"'
+
+    def get(self, key: str, etag: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, etag: str, body: bytes, media_type: Optional[str]):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[1])
+            self._entries[key] = (etag, body, media_type)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted[1])
+                self._stats["evictions"] += 1
+
+    def invalidate(self, path_prefix: str = ""):
+        """Drop cached responses whose path starts with path_prefix (everything by default)"""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(path_prefix)]:
+                self._size -= len(self._entries.pop(key)[1])
+
+    def _bump(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["entries"] = len(self._entries)
+            snapshot["bytes"] = self._size
+        snapshot["max_bytes"] = self.max_bytes
+        return snapshot
+
+    async def handle(self, request: Request, call_next, executor=None):
+        """HTTP middleware body: answer from the cache or fill it from the endpoint
+
+        The ETag is computed on executor, which should be the pool the
+        endpoints run their queries on (None means asyncio's default one).
+        """
+        path = request.url.path
+        if request.method != "GET" or path not in self.routes:
+            return await call_next(request)
+
+        query = request.url.query
+        key = path + "?" + query
+        # Reading the database versions stats files and queries SQLite, which can
+        # wait on locks; keep it off the event loop
+        etag = await asyncio.get_running_loop().run_in_executor(executor, self.etag_for, path, query)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            self._bump("not_modified")
+            return Response(status_code=304, headers=headers)
+
+        cached = self.get(key, etag)
+        if cached is not None:
+            self._bump("hits")
+            return Response(content=cached[1], media_type=cached[2], headers=headers)
+
+        self._bump("misses")
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        media_type = response.headers.get("content-type")
+        self.put(key, etag, body, media_type)
+
+        passthrough = {k: v for k, v in response.headers.items() if k.lower() not in ("content-length", "content-type")}
+        passthrough.update(headers)
+        return Response(content=body, status_code=200, media_type=media_type, headers=passthrough)
+
+
+def create_response_cache() -> ResponseCache:
+    """Build the application cache, sized from RESPONSE_CACHE_MAX_BYTES"""
+    return ResponseCache(max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))))
@@ -0,0 +1,194 @@
+"""
+FTS5 full-text search over BSE, SEBI and RBI notification summaries.
+
+Each source table gets an external-content FTS5 table in its own database
+plus insert/update/delete triggers that keep the index in step with the
+ingest jobs. Like the BSE rollups, a missing trigger means the source
+table was replaced wholesale, so the index is rebuilt from scratch.
+
+The index refers to rows by rowid. DailyLogs has no INTEGER PRIMARY KEY,
+so a VACUUM may renumber its rows under an index whose triggers are all
+still in place; for such tables the row count and largest rowid are
+compared with the index's, and a mismatch also triggers a rebuild.
+"""
+
+import re
+import html
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# snippet() marks matches with these control characters so the document text
+# can be HTML-escaped before they are swapped for <mark> tags
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+
+# Source name -> how its FTS index is built and queried
+SEARCH_SOURCES = {
+    "bse": {
+        "database": "notifications",
+        "table": "DailyLogs",
+        "fts": "dailylogs_fts",
+        "columns": ["EntityName", "Nature", "Summary"],
+        "weights": [2.0, 1.0, 1.0],
+        "filter": "t.Link IS NOT NULL AND t.Link != 'NIL'",
+        "select": "t.SrNo, t.Date, t.EntityName, t.Nature, t.Link",
+        # Implicit rowids, which VACUUM may renumber
+        "stable_rowid": False,
+    },
+    "sebi": {
+        "database": "sebi",
+        "table": "excel_summaries",
+        "fts": "excel_summaries_fts",
+        "columns": ["summary"],
+        "weights": [1.0],
+        "filter": "t.summary IS NOT NULL AND t.summary != 'NIL'",
+        "select": "t.id, t.date_key, NULL, NULL, t.pdf_link",
+        "stable_rowid": True,
+    },
+    "rbi": {
+        "database": "rbi",
+        "table": "master_summaries",
+        "fts": "master_summaries_fts",
+        "columns": ["summary"],
+        "weights": [1.0],
+        "filter": "NOT (t.pdf_link = 'NIL' AND t.summary = 'NIL')",
+        "select": "t.id, t.run_date, NULL, NULL, t.pdf_link",
+        "stable_rowid": True,
+    },
+}
+
+
+def _trigger_names(source: dict) -> List[str]:
+    return [f"trg_{source['fts']}_{event}" for event in ("insert", "delete", "update")]
+
+
+def rebuild_search_index(conn, source: dict):
+    """Create the FTS table and sync triggers for a source and reindex every row"""
+    fts, table, columns = source["fts"], source["table"], source["columns"]
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"NEW.{c}" for c in columns)
+    old_values = ", ".join(f"OLD.{c}" for c in columns)
+    insert_trigger, delete_trigger, update_trigger = _trigger_names(source)
+
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {column_list},
+            content='{table}',
+            content_rowid='rowid',
+            tokenize='porter unicode61 remove_diacritics 2'
+        )
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {insert_trigger} AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO {fts} (rowid, {column_list}) VALUES (NEW.rowid, {new_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {delete_trigger} AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', OLD.rowid, {old_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {update_trigger} AFTER UPDATE ON {table}
+        BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', OLD.rowid, {old_values});
+            INSERT INTO {fts} (rowid, {column_list}) VALUES (NEW.rowid, {new_values});
+        END
+    """)
+    conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def search_index_installed(conn, source: dict) -> bool:
+    """Whether all sync triggers for a source are present"""
+    names = _trigger_names(source)
+    placeholders = ",".join("?" for _ in names)
+    row = conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+        names
+    ).fetchone()
+    return row[0] == len(names)
+
+
+def search_index_current(conn, source: dict) -> bool:
+    """Whether a source's index is installed and still refers to the table's rows"""
+    if not search_index_installed(conn, source):
+        return False
+    if source["stable_rowid"]:
+        return True
+    # The index's docsize shadow table holds one row per indexed rowid
+    table_rows = conn.execute(f"SELECT COUNT(*), MAX(rowid) FROM {source['table']}").fetchone()
+    index_rows = conn.execute(f"SELECT COUNT(*), MAX(id) FROM {source['fts']}_docsize").fetchone()
+    return tuple(table_rows) == tuple(index_rows)
+
+
+def ensure_search_index(pool, source: dict) -> bool:
+    """Rebuild a source's FTS index if its triggers are missing or its rowids have gone stale"""
+    with pool.read() as conn:
+        if search_index_current(conn, source):
+            return False
+    with pool.write() as conn:
+        if search_index_current(conn, source):
+            return False
+        logger.info(f"Rebuilding full-text index {source['fts']}")
+        rebuild_search_index(conn, source)
+    return True
+
+
+def build_match_query(text: str) -> Optional[str]:
+    """Turn free text into a safe FTS5 query: every word must match, the last as a prefix"""
+    terms = re.findall(r"\w+", text, re.UNICODE)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def highlight_snippet(snippet: Optional[str]) -> str:
+    """HTML-escape a snippet and wrap its marked matches in <mark> tags"""
+    escaped = html.escape(snippet or "")
+    return escaped.replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>")
+
+
+def search_source(conn, source_name: str, match: str, limit: int) -> Dict[str, object]:
+    """Run a ranked search against one source and return its hits and total match count"""
+    source = SEARCH_SOURCES[source_name]
+    fts, table = source["fts"], source["table"]
+    weights = ", ".join(str(w) for w in source["weights"])
+
+    total = conn.execute(f"""
+        SELECT COUNT(*)
+        FROM {fts} JOIN {table} t ON t.rowid = {fts}.rowid
+        WHERE {fts} MATCH ? AND {source['filter']}
+    """, (match,)).fetchone()[0]
+
+    rows = conn.execute(f"""
+        SELECT {source['select']},
+               snippet({fts}, -1, char(2), char(3), '…', 24),
+               bm25({fts}, {weights}) AS score
+        FROM {fts} JOIN {table} t ON t.rowid = {fts}.rowid
+        WHERE {fts} MATCH ? AND {source['filter']}
+        ORDER BY score
+        LIMIT ?
+    """, (match, limit)).fetchall()
+
+    # bm25 depends on each index's own corpus statistics, so raw scores are not
+    # comparable across sources; relevance rescales them against this source's
+    # best match (1.0) for merging
+    best = rows[0][6] if rows else 0
+    hits = [{
+        'source': source_name,
+        'id': int(row[0]) if row[0] is not None else None,
+        'date': row[1],
+        'entity_name': row[2],
+        'nature': row[3],
+        'pdf_link': row[4],
+        'snippet': highlight_snippet(row[5]),
+        'score': row[6],
+        'relevance': row[6] / best if best else 1.0,
+    } for row in rows]
+    return {'total': total, 'hits': hits}
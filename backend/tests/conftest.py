@@ -0,0 +1,159 @@
+"""Backend modules import each other as top-level modules; make them importable from the tests"""
+
+import os
+import sqlite3
+import sys
+from contextlib import closing
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_pool
+from db_migrations import MIGRATIONS, run_migrations
+from db_pool import SQLitePool
+
+# Tables as the ingest jobs create them in backend/public, before any migration
+SCHEMAS = {
+    "notifications.db": """
+        CREATE TABLE IF NOT EXISTS "DailyLogs" (
+            "SrNo" REAL, "EntityName" TEXT, "Link" TEXT, "Nature" TEXT, "Summary" TEXT, "Date" DATE
+        )
+    """,
+    "sebi_excel_master.db": """
+        CREATE TABLE IF NOT EXISTS excel_summaries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date_key TEXT NOT NULL,
+            row_index INTEGER NOT NULL,
+            pdf_link TEXT,
+            summary TEXT,
+            inserted_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(date_key, row_index)
+        )
+    """,
+    "rbi.db": """
+        CREATE TABLE IF NOT EXISTS master_summaries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_date TEXT NOT NULL,
+            pdf_link TEXT,
+            summary TEXT,
+            created_at TEXT NOT NULL
+        )
+    """,
+}
+
+
+@pytest.fixture
+def migrated_pool(tmp_path):
+    """Factory for a pool on a fresh database in tmp_path with a logical database's migrations applied"""
+    pools = []
+
+    def make(name: str) -> SQLitePool:
+        pool = SQLitePool(name, str(tmp_path / f"{name}.db"))
+        run_migrations(pool, MIGRATIONS[name])
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+@pytest.fixture(scope="session")
+def server(tmp_path_factory):
+    """fastapi_server, imported with its databases in a temporary directory (it creates places.db on import)"""
+    pytest.importorskip("fastapi")
+    mp = pytest.MonkeyPatch()
+    mp.setattr(db_pool, "PUBLIC_DIR", str(tmp_path_factory.mktemp("public")))
+    mp.setenv("JOB_WORKERS", "0")
+    try:
+        import fastapi_server
+        yield fastapi_server
+    finally:
+        db_pool.close_all_pools()
+        mp.undo()
+
+
+@pytest.fixture
+def public_dir(tmp_path, monkeypatch):
+    """An empty directory that get_pool opens databases in for the duration of a test"""
+    directory = tmp_path / "public"
+    directory.mkdir()
+    db_pool.close_all_pools()
+    monkeypatch.setattr(db_pool, "PUBLIC_DIR", str(directory))
+    yield directory
+    db_pool.close_all_pools()
+
+
+@pytest.fixture
+def client(server, public_dir):
+    """A TestClient for the app without its startup hooks, over the databases in public_dir"""
+    from fastapi.testclient import TestClient
+
+    server.response_cache.invalidate()
+    return TestClient(server.app)
+
+
+@pytest.fixture
+def seed(public_dir):
+    """Insert rows (dicts of column -> value) into a table of one of the SCHEMAS databases"""
+    def insert(filename: str, table: str, rows: list):
+        with closing(sqlite3.connect(public_dir / filename)) as conn, conn:
+            conn.execute(SCHEMAS[filename])
+            for row in rows:
+                columns = ", ".join(f'"{column}"' for column in row)
+                placeholders = ", ".join("?" for _ in row)
+                conn.execute(f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders})', list(row.values()))
+
+    return insert
+
+
+@pytest.fixture
+def disclosures_dir(tmp_path):
+    """A directory of director disclosures and a writer for .docx files in it"""
+    docx = pytest.importorskip("docx")
+    directory = tmp_path / "disclosures"
+    directory.mkdir()
+
+    def write(filename: str, paragraphs: list, tables: tuple = ()) -> str:
+        document = docx.Document()
+        for text in paragraphs:
+            document.add_paragraph(text)
+        for rows in tables:
+            table = document.add_table(rows=len(rows), cols=len(rows[0]))
+            for row, cells in zip(table.rows, rows):
+                for cell, text in zip(row.cells, cells):
+                    cell.text = text
+        path = str(directory / filename)
+        document.save(path)
+        return path
+
+    write.path = str(directory)
+    return write
+
+
+@pytest.fixture
+def minutes_payload():
+    """A complete /generate-minutes body for a template, with any fields overridden"""
+    def make(template: str, **overrides) -> dict:
+        payload = {
+            "template": template, "companyName": "Acme Industries Limited", "meetingNumber": "42",
+            "meetingType": "Board", "meetingDay": "Monday", "meetingDate": "15-01-2024",
+            "meetingStartTime": "11:00 AM", "meetingEndTime": "1:00 PM", "meetingPlace": "Registered Office, Mumbai",
+            "chairmanName": "Meera Iyer",
+            "presentDirectors": [
+                {"name": "Asha Rao", "din": "00000001", "designation": "Director"},
+                {"name": "Ravi Kumar", "din": "00000002", "designation": "Director"},
+                {"name": "Meera Iyer", "din": "00000003", "designation": "Chairman"},
+            ],
+            "inAttendance": [], "companySecretary": "Kiran Shah", "previousMeetingDate": "15-10-2023",
+            "authorisedOfficer": "", "quorum": "3", "concerns": "", "declarations": "",
+            "auditorPaymentAmount": "150000", "auditorPaymentWords": "One Lakh Fifty Thousand",
+            "financialYear": "2023-24", "agmNumber": "12", "agmDay": "Friday", "agmMonthName": "September",
+            "agmDate": "27-09-2024", "agmTime": "10:00 AM", "agmPlace": "Mumbai", "recordingDate": "16-01-2024",
+            "signingDate": "17-01-2024", "signingPlace": "Mumbai",
+        }
+        payload.update(overrides)
+        return payload
+
+    return make
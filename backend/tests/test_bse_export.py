@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+
+# /bse-alerts keeps the baseline's row_index and inserted_at placeholders; the export fills them in
+SHARED_FIELDS = ("id", "date_key", "pdf_link", "summary", "entity_name", "nature")
+
+
+def shared(items: list) -> list:
+    return [{field: item[field] for field in SHARED_FIELDS} for item in items]
+
+
+@pytest.fixture
+def alerts(server, seed):
+    rows = [
+        {"SrNo": i, "EntityName": f"Entity {i}", "Link": "NIL" if i % 4 == 0 else f"https://example.com/{i}",
+         "Nature": "Board Meeting", "Summary": f"Summary {i}", "Date": f"2024-01-{1 + i % 3:02d}"}
+        for i in range(1, 12)
+    ]
+    seed("notifications.db", "DailyLogs", rows)
+    return rows
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 4, 500])
+def test_ndjson_export_matches_listing(client, server, alerts, monkeypatch, batch_size):
+    monkeypatch.setattr(server, "BSE_EXPORT_BATCH_SIZE", batch_size)
+    response = client.get("/bse-alerts/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    exported = [json.loads(line) for line in response.text.splitlines()]
+
+    listing = client.get("/bse-alerts", params={"limit": 100}).json()["data"]
+    assert len(exported) == len(listing) == 9
+    assert shared(exported) == shared(listing)
+    assert all(item["row_index"] == item["id"] and item["inserted_at"] == item["date_key"] for item in exported)
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 500])
+def test_json_export_is_one_array(client, server, alerts, monkeypatch, batch_size):
+    monkeypatch.setattr(server, "BSE_EXPORT_BATCH_SIZE", batch_size)
+    response = client.get("/bse-alerts/export", params={"format": "json"})
+    assert response.headers["content-type"].startswith("application/json")
+    exported = response.json()
+    assert [item["pdf_link"] for item in exported] == [
+        item["pdf_link"] for item in client.get("/bse-alerts", params={"limit": 100}).json()["data"]
+    ]
+
+
+def test_empty_export(client, seed):
+    seed("notifications.db", "DailyLogs", [])
+    assert client.get("/bse-alerts/export", params={"format": "json"}).json() == []
+    assert client.get("/bse-alerts/export").text == ""
+
+
+def test_export_errors(client, public_dir, seed):
+    assert client.get("/bse-alerts/export").status_code == 404
+    seed("notifications.db", "DailyLogs", [])
+    assert client.get("/bse-alerts/export", params={"format": "csv"}).status_code == 400
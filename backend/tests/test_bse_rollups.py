@@ -0,0 +1,107 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from bse_rollups import LINKED, ROLLUPS, ensure_bse_rollups, rebuild_bse_rollups, rollups_installed
+from db_pool import SQLitePool
+
+
+def rollup_counts(conn) -> dict:
+    return {
+        table: dict(conn.execute(f"SELECT {column}, count FROM {table}").fetchall())
+        for table, (column, _) in ROLLUPS.items()
+    }
+
+
+def grouped_counts(conn) -> dict:
+    return {
+        table: dict(conn.execute(
+            f"SELECT {key.format(row='DailyLogs')}, COUNT(*) FROM DailyLogs "
+            f"WHERE {LINKED.format(row='DailyLogs')} GROUP BY 1"
+        ).fetchall())
+        for table, (_, key) in ROLLUPS.items()
+    }
+
+
+@pytest.fixture
+def notifications():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE DailyLogs (id INTEGER PRIMARY KEY, Date TEXT, EntityName TEXT, Link TEXT)")
+    conn.executemany("INSERT INTO DailyLogs (Date, EntityName, Link) VALUES (?, ?, ?)", [
+        ("2024-01-05", "Acme", "https://example.com/1"),
+        ("2024-01-05", "Acme", "NIL"),
+        ("2024-01-20", "Beta", "https://example.com/2"),
+        ("2024-02-01", None, "https://example.com/3"),
+        (None, "Beta", "https://example.com/4"),
+        ("2024-02-03", "Gamma", None),
+    ])
+    rebuild_bse_rollups(conn)
+    yield conn
+    conn.close()
+
+
+def test_rebuild_matches_count(notifications):
+    assert rollups_installed(notifications)
+    assert rollup_counts(notifications) == grouped_counts(notifications)
+
+
+def test_triggers_track_changes(notifications):
+    conn = notifications
+    conn.execute("INSERT INTO DailyLogs (Date, EntityName, Link) VALUES ('2024-03-01', 'Acme', 'https://example.com/5')")
+    conn.execute("INSERT INTO DailyLogs (Date, EntityName, Link) VALUES ('2024-03-01', 'Acme', 'NIL')")
+    assert rollup_counts(conn) == grouped_counts(conn)
+    # Unlinked -> linked, linked -> unlinked, and a change of key
+    conn.execute("UPDATE DailyLogs SET Link = 'https://example.com/6' WHERE Link = 'NIL'")
+    conn.execute("UPDATE DailyLogs SET Link = NULL WHERE EntityName = 'Beta' AND Date IS NULL")
+    conn.execute("UPDATE DailyLogs SET Date = '2023-12-31', EntityName = 'Delta' WHERE EntityName = 'Acme' AND Date = '2024-01-05'")
+    assert rollup_counts(conn) == grouped_counts(conn)
+    conn.execute("DELETE FROM DailyLogs WHERE EntityName = 'Delta'")
+    conn.execute("DELETE FROM DailyLogs WHERE Link IS NULL")
+    assert rollup_counts(conn) == grouped_counts(conn)
+    conn.execute("DELETE FROM DailyLogs")
+    assert rollup_counts(conn) == {table: {} for table in ROLLUPS}
+
+
+def test_rollups_rebuilt_after_table_replaced(tmp_path):
+    pool = SQLitePool("notifications", str(tmp_path / "notifications.db"))
+    try:
+        with pool.write() as conn:
+            conn.execute("CREATE TABLE DailyLogs (Date TEXT, EntityName TEXT, Link TEXT)")
+            conn.execute("INSERT INTO DailyLogs VALUES ('2024-01-05', 'Acme', 'https://example.com/1')")
+        assert ensure_bse_rollups(pool)
+        assert not ensure_bse_rollups(pool)
+        # An ingest job replacing DailyLogs wholesale drops the triggers with it
+        with pool.write() as conn:
+            conn.execute("DROP TABLE DailyLogs")
+            conn.execute("CREATE TABLE DailyLogs (Date TEXT, EntityName TEXT, Link TEXT)")
+            conn.execute("INSERT INTO DailyLogs VALUES ('2024-02-01', 'Beta', 'https://example.com/2')")
+        assert ensure_bse_rollups(pool)
+        with pool.read() as conn:
+            assert rollup_counts(conn) == grouped_counts(conn)
+    finally:
+        pool.close()
+
+
+def test_count_endpoints_match_table(client, seed):
+    today = date.today().isoformat()
+    seed("notifications.db", "DailyLogs", [
+        {"SrNo": i, "EntityName": entity, "Link": link, "Date": day}
+        for i, (entity, link, day) in enumerate([
+            ("Acme", "https://example.com/1", today),
+            ("Acme", "https://example.com/2", today),
+            ("Beta", "NIL", today),
+            ("Beta", "https://example.com/3", "2023-06-01"),
+            ("Gamma", "https://example.com/4", "2023-06-15"),
+            ("Gamma", None, "2023-05-01"),
+        ])
+    ])
+
+    assert client.get("/bse-monthly-count").json() == {"count": 2}
+    assert client.get("/api/bse-alerts-monthly-total").json() == {"count": 2}
+    monthly = client.get("/api/bse-alerts-monthly-count").json()
+    assert {item["month"]: item["count"] for item in monthly["monthly_data"]} == {today[:7]: 2, "2023-06": 2}
+    assert monthly["total_count"] == 4
+    entities = client.get("/api/bse-alerts-entity-count").json()
+    assert {item["entity_name"]: item["count"] for item in entities["entity_data"]} == {"Acme": 2, "Beta": 1, "Gamma": 1}
+    assert entities["total_count"] == 4
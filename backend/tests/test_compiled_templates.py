@@ -0,0 +1,108 @@
+import io
+import os
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("docx")
+
+from docx import Document as DocxDocument
+
+from minutes_templates import DIRECTOR_DIN, DIRECTOR_NAME, TemplateCache, placeholder_values, template_path
+
+TEMPLATES = [name for name in ("q1", "q2", "q3", "q4") if os.path.exists(template_path(name))]
+
+needs_templates = pytest.mark.skipif(not TEMPLATES, reason="meeting templates not present")
+
+
+def baseline_fill(path: str, values: dict, directors: list):
+    """The generator the compiled templates replaced: repeated str.replace over every paragraph and cell"""
+    doc = DocxDocument(path)
+
+    def replace_all(paragraphs):
+        for para in paragraphs:
+            for placeholder, value in values.items():
+                if placeholder in para.text:
+                    para.text = para.text.replace(placeholder, value)
+
+    def replace_cells(tables):
+        for table in tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    for placeholder, value in values.items():
+                        if placeholder in cell.text:
+                            cell.text = cell.text.replace(placeholder, value)
+
+    replace_all(doc.paragraphs)
+    replace_cells(doc.tables)
+    for section in doc.sections:
+        for story in (section.header, section.footer):
+            replace_all(story.paragraphs)
+            replace_cells(story.tables)
+
+    if directors:
+        director_index = 0
+        for para in doc.paragraphs:
+            while DIRECTOR_NAME in para.text or DIRECTOR_DIN in para.text:
+                if director_index < len(directors):
+                    director = directors[director_index]
+                    if DIRECTOR_NAME in para.text:
+                        para.text = para.text.replace(DIRECTOR_NAME, director.get("name", ""), 1)
+                    if DIRECTOR_DIN in para.text:
+                        para.text = para.text.replace(DIRECTOR_DIN, director.get("din", ""), 1)
+                    director_index += 1
+                else:
+                    para.text = para.text.replace(DIRECTOR_NAME, "").replace(DIRECTOR_DIN, "")
+                    break
+    return doc
+
+
+def document_text(doc) -> list:
+    """Every paragraph and cell of the body, headers and footers, in document order"""
+    def tables_text(tables):
+        return [cell.text for table in tables for row in table.rows for cell in row.cells]
+
+    text = [para.text for para in doc.paragraphs] + tables_text(doc.tables)
+    for section in doc.sections:
+        for story in (section.header, section.footer):
+            text += [para.text for para in story.paragraphs] + tables_text(story.tables)
+    return text
+
+
+@needs_templates
+@pytest.mark.parametrize("template", TEMPLATES)
+@pytest.mark.parametrize("directors", [3, 1, 0])
+def test_compiled_render_matches_baseline(template, directors, minutes_payload):
+    payload = minutes_payload(template)
+    payload["presentDirectors"] = payload["presentDirectors"][:directors]
+    values = placeholder_values(SimpleNamespace(**payload))
+    compiled = TemplateCache().load(template_path(template))
+
+    rendered = DocxDocument(io.BytesIO(compiled.render_docx(values, payload["presentDirectors"])))
+    expected = baseline_fill(template_path(template), values, payload["presentDirectors"])
+    assert document_text(rendered) == document_text(expected)
+
+
+@needs_templates
+def test_cache_recompiles_changed_template(tmp_path, minutes_payload):
+    path = str(tmp_path / "q1_meeting_template.docx")
+    shutil.copy(template_path(TEMPLATES[0]), path)
+    cache = TemplateCache()
+    compiled = cache.load(path)
+    assert cache.load(path) is compiled
+    assert (cache.stats()["compiles"], cache.stats()["hits"]) == (1, 1)
+
+    # A template edited in place is recompiled on its next use
+    doc = DocxDocument(path)
+    doc.add_paragraph("Edited for [Name of Company]")
+    doc.save(path)
+    recompiled = cache.load(path)
+    assert recompiled is not compiled
+    values = placeholder_values(SimpleNamespace(**minutes_payload(TEMPLATES[0])))
+    text = document_text(DocxDocument(io.BytesIO(recompiled.render_docx(values, []))))
+    assert "Edited for Acme Industries Limited" in text
+
+    cache.invalidate(path)
+    assert cache.load(path) is not recompiled
+    assert cache.stats()["compiles"] == 3
@@ -0,0 +1,124 @@
+import base64
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize("values, types", [
+    (["2024-01-05 10:00:00", 12.5, 42], (str, (int, float), int)),
+    (["2024-01-05", 7, 1], (str, (int, float), int)),
+    (["Ünïcode & quotes \"x\"", 3], (str, int)),
+    (["rbi", "2023-12-31", 0], (str, str, int)),
+])
+def test_round_trip(server, values, types):
+    cursor = server.encode_cursor(values)
+    assert "=" not in cursor
+    assert server.decode_cursor(cursor, types) == values
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not base64 at all!",
+    raw_cursor({"date": "2024-01-05", "id": 1}),
+    raw_cursor(["2024-01-05"]),
+    raw_cursor(["2024-01-05", 1, 2]),
+    raw_cursor([1, 1]),
+    raw_cursor(["2024-01-05", "1"]),
+    raw_cursor(["2024-01-05", 1.5]),
+    raw_cursor(["2024-01-05", True]),
+    raw_cursor(["2024-01-05", None]),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode("ascii"),
+])
+def test_rejects_malformed(server, cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        server.decode_cursor(cursor, (str, int))
+    assert excinfo.value.status_code == 400
+
+
+@pytest.fixture
+def listings(server, seed):
+    """Rows for all three list endpoints, with ties on the leading sort key and rows the listings leave out"""
+    seed("notifications.db", "DailyLogs", [
+        {"SrNo": srno, "EntityName": f"Entity {i}", "Link": link, "Nature": "Board Meeting",
+         "Summary": f"Summary {i}", "Date": date}
+        for i, (srno, date, link) in enumerate([
+            (1, "2024-01-05", "https://example.com/1"),
+            (2, "2024-01-05", "https://example.com/2"),
+            (2, "2024-01-05", "https://example.com/2b"),
+            (1.0, "2024-01-04", "https://example.com/3"),
+            (3, "2024-01-06", "NIL"),
+            (4, "2024-01-03", None),
+            (5, "2024-01-02", "https://example.com/5"),
+        ])
+    ])
+    seed("sebi_excel_master.db", "excel_summaries", [
+        {"date_key": date, "row_index": index, "pdf_link": f"https://example.com/s{index}", "summary": "s"}
+        for date, index in [("2024-01-05", 1), ("2024-01-05", 2), ("2024-01-04", 1), ("2024-01-06", 7)]
+    ])
+    seed("rbi.db", "master_summaries", [
+        {"run_date": date, "pdf_link": link, "summary": summary, "created_at": "2024-01-01 00:00:00"}
+        for date, link, summary in [
+            ("05-01-2024", "https://example.com/r1", "a"),
+            ("28-12-2023", "https://example.com/r2", "b"),
+            ("05-01-2024", "NIL", "NIL"),
+            ("05-01-2024", "https://example.com/r3", "c"),
+            ("01-02-2024", "NIL", "d"),
+        ]
+    ])
+    server.migrate_all()
+
+
+def page_through(client, path: str, limit: int) -> list:
+    items, cursor = [], None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get(path, params=params).json()
+        assert len(body["data"]) <= limit
+        items.extend(body["data"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return items
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("/bse-alerts", 5),
+    ("/sebi-analysis-data", 4),
+    ("/rbi-analysis-data", 4),
+])
+@pytest.mark.parametrize("limit", [1, 2, 3, 100])
+def test_cursor_pages_match_full_listing(client, listings, path, expected, limit):
+    full = client.get(path, params={"limit": 100}).json()
+    assert full["count"] == expected
+    assert full["next_cursor"] is None
+    assert page_through(client, path, limit) == full["data"]
+
+
+def test_listing_order(client, listings):
+    bse = client.get("/bse-alerts").json()["data"]
+    assert [item["pdf_link"] for item in bse] == [
+        "https://example.com/1", "https://example.com/2", "https://example.com/2b",
+        "https://example.com/3", "https://example.com/5",
+    ]
+    rbi = client.get("/rbi-analysis-data").json()["data"]
+    assert [item["date_key"] for item in rbi] == ["01-02-2024", "05-01-2024", "05-01-2024", "28-12-2023"]
+
+
+@pytest.mark.parametrize("path", ["/bse-alerts", "/sebi-analysis-data", "/rbi-analysis-data"])
+@pytest.mark.parametrize("params", [{"limit": 0}, {"limit": -1}, {"limit": 10001}, {"offset": -1}])
+def test_rejects_out_of_range_paging(client, listings, path, params):
+    assert client.get(path, params=params).status_code == 422
+
+
+@pytest.mark.parametrize("path", ["/bse-alerts", "/sebi-analysis-data", "/rbi-analysis-data"])
+def test_rejects_bad_cursor(client, listings, path):
+    assert client.get(path, params={"cursor": raw_cursor(["2024-01-05", "x", "y"])}).status_code == 400
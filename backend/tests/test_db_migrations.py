@@ -0,0 +1,109 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+import db_migrations
+from db_migrations import (
+    CREATE_IF_MISSING, MIGRATIONS, REQUIRED_INDEXES, applied_versions, ensure_indexes, migrate_all, run_migrations,
+)
+from db_pool import SQLitePool, get_pool
+
+LIST_QUERY = """
+    SELECT SrNo FROM DailyLogs
+    WHERE Link IS NOT NULL AND Link != 'NIL'
+    ORDER BY Date DESC, SrNo ASC
+    LIMIT 10
+"""
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SQLitePool("test", str(tmp_path / "test.db"))
+    yield pool
+    pool.close()
+
+
+def create_daily_logs(conn):
+    conn.execute('CREATE TABLE DailyLogs ("SrNo" REAL, "EntityName" TEXT, "Link" TEXT, "Nature" TEXT, "Summary" TEXT, "Date" DATE)')
+
+
+def test_each_migration_runs_once(pool):
+    migrations = [
+        (2, "Add column", ["ALTER TABLE items ADD COLUMN name TEXT"]),
+        (1, "Create table", ["CREATE TABLE items (id INTEGER PRIMARY KEY)"]),
+        (3, "Callable step", [lambda conn: conn.execute("INSERT INTO items (name) VALUES ('x')")]),
+    ]
+    assert run_migrations(pool, migrations) == [1, 2, 3]
+    assert run_migrations(pool, migrations) == []
+    with pool.read() as conn:
+        assert [m["version"] for m in applied_versions(conn)] == [1, 2, 3]
+        assert conn.execute("SELECT name FROM items").fetchall() == [("x",)]
+
+
+def test_failed_migration_rolls_back_and_stops(pool):
+    migrations = [
+        (1, "Create table", ["CREATE TABLE items (id INTEGER PRIMARY KEY)"]),
+        (2, "Broken", ["CREATE TABLE half (id INTEGER)", "ALTER TABLE missing ADD COLUMN x TEXT"]),
+        (3, "Depends on 2", ["CREATE TABLE later (id INTEGER)"]),
+    ]
+    assert run_migrations(pool, migrations) == [1]
+    with pool.read() as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert [m["version"] for m in applied_versions(conn)] == [1]
+    assert "half" not in tables and "later" not in tables
+
+    # Once fixed, the failed migration and the ones after it are applied
+    migrations[1] = (2, "Fixed", ["CREATE TABLE half (id INTEGER)"])
+    assert run_migrations(pool, migrations) == [2, 3]
+
+
+def test_migrate_all_skips_missing_databases(public_dir, seed):
+    seed("notifications.db", "DailyLogs", [])
+    results = migrate_all()
+    assert set(results) == {"notifications"} | CREATE_IF_MISSING
+    assert results["notifications"] == [version for version, _, _ in MIGRATIONS["notifications"]]
+    assert not (public_dir / "rbi.db").exists()
+    assert migrate_all()["notifications"] == []
+
+
+def test_list_query_uses_partial_index(pool):
+    with pool.write() as conn:
+        create_daily_logs(conn)
+    run_migrations(pool, MIGRATIONS["notifications"])
+    with pool.read() as conn:
+        plan = " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + LIST_QUERY))
+    assert "idx_dailylogs_linked_date_srno" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_ensure_indexes_after_table_replaced(pool):
+    indexes = REQUIRED_INDEXES["notifications"]
+    # Without the table there is nothing to index yet
+    assert ensure_indexes(pool, indexes) == []
+    with pool.write() as conn:
+        create_daily_logs(conn)
+    run_migrations(pool, MIGRATIONS["notifications"])
+    assert ensure_indexes(pool, indexes) == []
+
+    # An ingest job replacing DailyLogs wholesale drops its indexes with it
+    with pool.write() as conn:
+        conn.execute("DROP TABLE DailyLogs")
+        create_daily_logs(conn)
+    assert ensure_indexes(pool, indexes) == ["idx_dailylogs_linked_date_srno"]
+    assert ensure_indexes(pool, indexes) == []
+    with pool.read() as conn:
+        assert not db_migrations.missing_indexes(conn, indexes)
+
+
+def test_bse_alerts_recreates_dropped_index(client, public_dir, seed):
+    seed("notifications.db", "DailyLogs", [{"SrNo": 1, "Link": "https://example.com/1", "Date": "2024-01-05"}])
+    migrate_all()
+    with closing(sqlite3.connect(public_dir / "notifications.db")) as conn, conn:
+        conn.execute("DROP TABLE DailyLogs")
+        create_daily_logs(conn)
+        conn.execute("INSERT INTO DailyLogs (SrNo, Link, Date) VALUES (2, 'https://example.com/2', '2024-01-06')")
+
+    assert client.get("/bse-alerts").json()["count"] == 1
+    with get_pool("notifications").read() as conn:
+        assert not db_migrations.missing_indexes(conn, REQUIRED_INDEXES["notifications"])
@@ -0,0 +1,72 @@
+import pytest
+
+from disclosure_analytics import ROLLUPS, read_analytics, read_snapshot, record_snapshot
+
+JANUARY, FEBRUARY = 1704456000 * 10**9, 1706788800 * 10**9
+
+
+@pytest.fixture
+def catalog(migrated_pool):
+    return migrated_pool("disclosures")
+
+
+def rollup_counts(conn) -> dict:
+    return {
+        table: dict(conn.execute(f"SELECT {column}, count FROM {table}").fetchall())
+        for table, (column, _) in ROLLUPS.items()
+    }
+
+
+def grouped_counts(conn) -> dict:
+    return {
+        table: dict(conn.execute(f"SELECT {key.format(row='disclosures')}, COUNT(*) FROM disclosures GROUP BY 1").fetchall())
+        for table, (_, key) in ROLLUPS.items()
+    }
+
+
+def add_disclosure(conn, filename, director, classification, mtime_ns):
+    conn.execute("""
+        INSERT INTO disclosures (filename, size, mtime_ns, content_hash, director_name, classification)
+        VALUES (?, 0, ?, '', ?, ?)
+    """, (filename, mtime_ns, director, classification))
+
+
+def test_rollups_match_count(catalog):
+    with catalog.write() as conn:
+        add_disclosure(conn, "a.docx", "Asha", "Form MBP-1", JANUARY)
+        add_disclosure(conn, "b.docx", "Asha", "Form DIR-8", JANUARY)
+        add_disclosure(conn, "c.docx", "Ravi", "Form MBP-1", FEBRUARY)
+        add_disclosure(conn, "d.docx", "Meera", "Other", FEBRUARY)
+        assert rollup_counts(conn) == grouped_counts(conn)
+
+        conn.execute("UPDATE disclosures SET classification = 'Form DIR-8', mtime_ns = ? WHERE filename = 'a.docx'", (FEBRUARY,))
+        conn.execute("UPDATE disclosures SET director_name = 'Ravi' WHERE filename = 'd.docx'")
+        conn.execute("UPDATE disclosures SET size = 10 WHERE filename = 'b.docx'")
+        assert rollup_counts(conn) == grouped_counts(conn)
+
+        conn.execute("DELETE FROM disclosures WHERE director_name = 'Ravi'")
+        assert rollup_counts(conn) == grouped_counts(conn)
+        analytics = read_analytics(conn)
+    assert analytics["total_disclosures"] == 2
+    assert analytics["by_director"] == [{"director": "Asha", "count": 2}]
+    assert {item["type"]: item["count"] for item in analytics["by_type"]} == {"Form DIR-8": 2}
+
+
+def test_snapshots_answer_as_of_queries(catalog):
+    with catalog.write() as conn:
+        add_disclosure(conn, "a.docx", "Asha", "Form MBP-1", JANUARY)
+        record_snapshot(conn, "2024-01-31")
+        add_disclosure(conn, "b.docx", "Ravi", "Form MBP-1", FEBRUARY)
+        record_snapshot(conn, "2024-02-29")
+        # A later sync on the same day replaces that day's snapshot
+        add_disclosure(conn, "c.docx", "Ravi", "Other", FEBRUARY)
+        record_snapshot(conn, "2024-02-29")
+
+    with catalog.read() as conn:
+        assert read_snapshot(conn, "2023-12-31") is None
+        january = read_snapshot(conn, "2024-02-15")
+        february = read_snapshot(conn, "2024-03-01")
+        current = read_analytics(conn)
+    assert (january["snapshot_date"], january["total_disclosures"]) == ("2024-01-31", 1)
+    assert (february["snapshot_date"], february["total_disclosures"]) == ("2024-02-29", 3)
+    assert {k: v for k, v in february.items() if k != "snapshot_date"} == current
@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+import disclosure_catalog
+from disclosure_catalog import list_disclosures, select_disclosures, sync_catalog
+
+
+@pytest.fixture
+def catalog(migrated_pool):
+    return migrated_pool("disclosures")
+
+
+def rows(pool) -> dict:
+    with pool.read() as conn:
+        return {row[1]: row for row in list_disclosures(conn)}
+
+
+def bump_mtime(path: str, seconds: int = 10):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 10**9))
+
+
+def test_sync_extracts_metadata(catalog, disclosures_dir):
+    disclosures_dir("Asha Rao_MBP.docx", ["Form MBP-1", "Notice of interest in other entities", "DIN: 01234567"])
+    disclosures_dir("Vikram Shah.docx", ["Disclosure of shareholding", "Name: Vikram Shah"])
+    disclosures_dir("~$Vikram Shah.docx", ["lock file"])
+    disclosures_dir("notes.txt", ["not a disclosure"])
+
+    assert sync_catalog(catalog, disclosures_dir.path) == {'added': 2, 'updated': 0, 'unchanged': 0, 'removed': 0}
+    listed = rows(catalog)
+    assert list(listed) == ["Asha Rao_MBP.docx", "Vikram Shah.docx"]
+    _, _, director, din, _, classification = listed["Asha Rao_MBP.docx"]
+    assert (director, din, classification) == ("Asha Rao", "01234567", "Interest")
+    _, _, director, din, _, classification = listed["Vikram Shah.docx"]
+    assert (director, din, classification) == ("Vikram Shah", "N/A", "Shareholding")
+
+
+def test_sync_reparses_only_changed_content(catalog, disclosures_dir, monkeypatch):
+    first = disclosures_dir("A_MBP.docx", ["DIN: 11111111"])
+    disclosures_dir("B_MBP.docx", ["DIN: 22222222"])
+    sync_catalog(catalog, disclosures_dir.path)
+    before = rows(catalog)
+
+    parsed = []
+    extract = disclosure_catalog.extract_disclosure
+    monkeypatch.setattr(disclosure_catalog, "extract_disclosure", lambda path: parsed.append(path) or extract(path))
+
+    assert sync_catalog(catalog, disclosures_dir.path)['unchanged'] == 2
+    # Touched but identical: stats are refreshed without parsing or a new id
+    bump_mtime(first)
+    assert sync_catalog(catalog, disclosures_dir.path) == {'added': 0, 'updated': 0, 'unchanged': 2, 'removed': 0}
+    assert parsed == []
+    assert rows(catalog)["A_MBP.docx"][0] == before["A_MBP.docx"][0]
+    assert rows(catalog)["A_MBP.docx"][4] == os.stat(first).st_mtime_ns
+
+    disclosures_dir("A_MBP.docx", ["DIN: 33333333"])
+    bump_mtime(first, 20)
+    assert sync_catalog(catalog, disclosures_dir.path)['updated'] == 1
+    assert parsed == [first]
+    after = rows(catalog)
+    assert after["A_MBP.docx"][3] == "33333333"
+    assert after["A_MBP.docx"][0] != before["A_MBP.docx"][0]
+    assert after["B_MBP.docx"] == before["B_MBP.docx"]
+
+
+def test_sync_removes_deleted_files(catalog, disclosures_dir):
+    gone = disclosures_dir("A_MBP.docx", ["DIN: 11111111"])
+    disclosures_dir("B_MBP.docx", ["DIN: 22222222"])
+    sync_catalog(catalog, disclosures_dir.path)
+    os.remove(gone)
+    assert sync_catalog(catalog, disclosures_dir.path)['removed'] == 1
+    assert list(rows(catalog)) == ["B_MBP.docx"]
+
+
+def test_sync_limited_to_reported_files(catalog, disclosures_dir):
+    disclosures_dir("A_MBP.docx", ["DIN: 11111111"])
+    sync_catalog(catalog, disclosures_dir.path)
+    disclosures_dir("B_MBP.docx", ["DIN: 22222222"])
+    disclosures_dir("C_MBP.docx", ["DIN: 33333333"])
+    # A watcher reporting only B must not pick up C, nor treat A as removed
+    assert sync_catalog(catalog, disclosures_dir.path, only={"B_MBP.docx"}) == {
+        'added': 1, 'updated': 0, 'unchanged': 0, 'removed': 0,
+    }
+    assert list(rows(catalog)) == ["A_MBP.docx", "B_MBP.docx"]
+
+
+def test_unreadable_document_is_catalogued_with_error(catalog, disclosures_dir):
+    with open(os.path.join(disclosures_dir.path, "Broken_MBP.docx"), "wb") as f:
+        f.write(b"not a zip file")
+    assert sync_catalog(catalog, disclosures_dir.path)['added'] == 1
+    with catalog.read() as conn:
+        din, classification, error = conn.execute("SELECT din, classification, error FROM disclosures").fetchone()
+    assert (din, classification) == ("N/A", "MBP-1")
+    assert error
+
+
+def test_select_by_director_and_ids(catalog, disclosures_dir):
+    disclosures_dir("Asha Rao_MBP.docx", ["DIN: 11111111"])
+    disclosures_dir("Vikram Shah_MBP.docx", ["DIN: 22222222"])
+    sync_catalog(catalog, disclosures_dir.path)
+    listed = rows(catalog)
+    with catalog.read() as conn:
+        assert select_disclosures(conn, director="asha rao") == [(listed["Asha Rao_MBP.docx"][0], "Asha Rao_MBP.docx")]
+        ids = [listed["Vikram Shah_MBP.docx"][0]]
+        assert select_disclosures(conn, ids=ids, director="Asha Rao") == []
+        assert [name for _, name in select_disclosures(conn, ids=ids)] == ["Vikram Shah_MBP.docx"]
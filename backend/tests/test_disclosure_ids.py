@@ -0,0 +1,97 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from disclosure_catalog import file_sha256, list_disclosures, open_disclosure, sync_catalog
+
+
+@pytest.fixture
+def catalog(migrated_pool):
+    return migrated_pool("disclosures")
+
+
+def ids(pool) -> dict:
+    with pool.read() as conn:
+        return {row[1]: row[0] for row in list_disclosures(conn)}
+
+
+def test_ids_survive_directory_changes(catalog, disclosures_dir):
+    disclosures_dir("M_MBP.docx", ["DIN: 11111111"])
+    disclosures_dir("T_MBP.docx", ["DIN: 22222222"])
+    sync_catalog(catalog, disclosures_dir.path)
+    before = ids(catalog)
+
+    # Files sorting before and between the existing ones used to shift every index
+    disclosures_dir("A_MBP.docx", ["DIN: 33333333"])
+    disclosures_dir("N_MBP.docx", ["DIN: 44444444"])
+    os.remove(os.path.join(disclosures_dir.path, "T_MBP.docx"))
+    sync_catalog(catalog, disclosures_dir.path)
+    after = ids(catalog)
+
+    assert after["M_MBP.docx"] == before["M_MBP.docx"]
+    assert "T_MBP.docx" not in after
+    # A removed id is never reused
+    assert before["T_MBP.docx"] not in after.values()
+
+
+def test_open_returns_cataloged_version(catalog, disclosures_dir):
+    path = disclosures_dir("A_MBP.docx", ["DIN: 11111111"])
+    sync_catalog(catalog, disclosures_dir.path)
+    disclosure_id = ids(catalog)["A_MBP.docx"]
+
+    record, f = open_disclosure(catalog, disclosure_id, disclosures_dir.path)
+    with f:
+        assert record['file_path'] == path
+        assert record['content_hash'] == file_sha256(path)
+        assert f.read() == Path(path).read_bytes()
+    assert open_disclosure(catalog, disclosure_id + 100, disclosures_dir.path) is None
+
+
+def test_touched_file_still_opens(catalog, disclosures_dir):
+    path = disclosures_dir("A_MBP.docx", ["DIN: 11111111"])
+    sync_catalog(catalog, disclosures_dir.path)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    opened = open_disclosure(catalog, ids(catalog)["A_MBP.docx"], disclosures_dir.path)
+    assert opened is not None
+    opened[1].close()
+
+
+def test_changed_content_gets_new_id(catalog, disclosures_dir):
+    path = disclosures_dir("A_MBP.docx", ["DIN: 11111111"])
+    sync_catalog(catalog, disclosures_dir.path)
+    old_id = ids(catalog)["A_MBP.docx"]
+
+    disclosures_dir("A_MBP.docx", ["DIN: 22222222", "Revised"])
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    # The old id names content that is gone; opening it resyncs the catalog
+    assert open_disclosure(catalog, old_id, disclosures_dir.path) is None
+    new_id = ids(catalog)["A_MBP.docx"]
+    assert new_id != old_id
+    record, f = open_disclosure(catalog, new_id, disclosures_dir.path)
+    f.close()
+    assert record['content_hash'] == file_sha256(path)
+
+
+def test_open_handle_outlives_replaced_path(catalog, disclosures_dir):
+    path = disclosures_dir("A_MBP.docx", ["DIN: 11111111"])
+    original = Path(path).read_bytes()
+    sync_catalog(catalog, disclosures_dir.path)
+    record, f = open_disclosure(catalog, ids(catalog)["A_MBP.docx"], disclosures_dir.path)
+
+    replacement = disclosures_dir("B_MBP.docx", ["DIN: 22222222"])
+    os.replace(replacement, path)
+    with f:
+        assert f.read() == original
+
+
+def test_unverified_open_leaves_catalog_alone(catalog, disclosures_dir):
+    path = disclosures_dir("A_MBP.docx", ["DIN: 11111111"])
+    sync_catalog(catalog, disclosures_dir.path)
+    old_id = ids(catalog)["A_MBP.docx"]
+    os.remove(path)
+    # With a watcher keeping the catalog current, a miss does not trigger a sync
+    assert open_disclosure(catalog, old_id, disclosures_dir.path, verify=False) is None
+    assert ids(catalog) == {"A_MBP.docx": old_id}
@@ -0,0 +1,79 @@
+import zipfile
+
+import pytest
+
+docx = pytest.importorskip("docx")
+from docx.enum.text import WD_BREAK
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from disclosure_catalog import extract_disclosure, scan_metadata
+from docx_scan import SCAN_ERRORS, iter_paragraph_texts
+
+
+def add_hyperlink(paragraph, text: str):
+    link = OxmlElement("w:hyperlink")
+    link.set(qn("w:anchor"), "target")
+    run = OxmlElement("w:r")
+    t = OxmlElement("w:t")
+    t.text = text
+    run.append(t)
+    link.append(run)
+    paragraph._p.append(link)
+
+
+@pytest.fixture
+def document(tmp_path):
+    doc = docx.Document()
+    doc.add_paragraph("Plain paragraph")
+    para = doc.add_paragraph("Run one, ")
+    para.add_run("run two\twith a tab")
+    para = doc.add_paragraph("Line")
+    para.add_run().add_break()
+    para.add_run("wrapped")
+    para.add_run().add_break(WD_BREAK.PAGE)
+    para.add_run("after page break")
+    para = doc.add_paragraph("See ")
+    add_hyperlink(para, "the linked text")
+    doc.add_paragraph("")
+    table = doc.add_table(rows=1, cols=2)
+    table.rows[0].cells[0].text = "Cell paragraphs are not body paragraphs"
+    doc.add_paragraph("DIN: 01234567 after the table")
+    path = str(tmp_path / "scan.docx")
+    doc.save(path)
+    return path
+
+
+def test_texts_match_python_docx(document):
+    expected = [para.text for para in docx.Document(document).paragraphs]
+    assert list(iter_paragraph_texts(document)) == expected
+    assert "See the linked text" in expected
+    assert "Line\nwrappedafter page break" in expected
+
+
+def test_scan_stops_once_metadata_is_settled():
+    pulled = []
+
+    def paragraphs():
+        for text in ["Notice of interest", "DIN: 12345678", "more", "and more"]:
+            pulled.append(text)
+            yield text
+
+    assert scan_metadata(paragraphs()) == {'din': '12345678', 'classification': 'Interest'}
+    assert pulled == ["Notice of interest", "DIN: 12345678"]
+
+
+def test_non_docx_package_is_a_scan_error(tmp_path):
+    path = tmp_path / "not.docx"
+    path.write_bytes(b"plain bytes")
+    with pytest.raises(SCAN_ERRORS):
+        list(iter_paragraph_texts(str(path)))
+    with zipfile.ZipFile(tmp_path / "empty.docx", "w") as archive:
+        archive.writestr("other.xml", "<x/>")
+    with pytest.raises(SCAN_ERRORS):
+        list(iter_paragraph_texts(str(tmp_path / "empty.docx")))
+
+
+def test_extract_matches_python_docx_scan(document):
+    paragraphs = [para.text for para in docx.Document(document).paragraphs]
+    assert extract_disclosure(document) == scan_metadata(paragraphs) == {'din': '01234567', 'classification': 'MBP-1'}
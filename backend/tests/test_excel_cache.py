@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("openpyxl")
+
+import excel_cache
+from excel_cache import WorkbookCache
+
+
+def write_workbook(path, rows: int = 3, sheets=("Sheet1",)):
+    with pd.ExcelWriter(path) as writer:
+        for sheet in sheets:
+            pd.DataFrame({"id": range(rows), "name": [f"{sheet} {i}" for i in range(rows)]}).to_excel(
+                writer, sheet_name=sheet, index=False
+            )
+    return str(path)
+
+
+def test_hits_until_workbook_changes(tmp_path):
+    cache = WorkbookCache()
+    path = write_workbook(tmp_path / "book.xlsx")
+    first = cache.load(path, "Sheet1")
+    assert cache.load(path, "Sheet1") is first
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+    write_workbook(tmp_path / "book.xlsx", rows=5)
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1))
+    assert len(cache.load(path, "Sheet1")) == 5
+    stats = cache.stats()
+    assert (stats["misses"], stats["entries"]) == (2, 1)
+
+
+def test_evicts_least_recently_used_sheet(tmp_path):
+    path = write_workbook(tmp_path / "book.xlsx", sheets=("A", "B", "C"))
+    sheet_bytes = excel_cache._frame_bytes(pd.read_excel(path, sheet_name="A"))
+    cache = WorkbookCache(max_bytes=2 * sheet_bytes)
+    cache.load(path, "A")
+    cache.load(path, "B")
+    cache.load(path, "A")
+    cache.load(path, "C")
+    stats = cache.stats()
+    assert [entry["sheet"] for entry in stats["sheets"]] == ["A", "C"]
+    assert stats["evictions"] == 1 and stats["bytes"] <= cache.max_bytes
+
+    cache.invalidate(path)
+    assert cache.stats()["entries"] == 0
+
+
+def test_concurrent_misses_parse_once(tmp_path, monkeypatch):
+    path = write_workbook(tmp_path / "book.xlsx")
+    cache = WorkbookCache()
+    started, release = threading.Event(), threading.Event()
+    parses = []
+    read_excel = pd.read_excel
+
+    def slow_read_excel(*args, **kwargs):
+        parses.append(args)
+        started.set()
+        release.wait(5)
+        return read_excel(*args, **kwargs)
+
+    monkeypatch.setattr(excel_cache.pd, "read_excel", slow_read_excel)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.load(path, "Sheet1"))) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(parses) == 1
+    assert len(results) == 4 and all(result is results[0] for result in results)
+    assert (cache.stats()["misses"], cache.stats()["coalesced"]) == (1, 3)
+
+
+def test_failed_parse_is_not_cached(tmp_path):
+    cache = WorkbookCache()
+    path = write_workbook(tmp_path / "book.xlsx")
+    with pytest.raises(ValueError):
+        cache.load(path, "Missing")
+    assert cache.stats()["entries"] == 0
+    assert len(cache.load(path, "Sheet1")) == 3
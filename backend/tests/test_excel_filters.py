@@ -0,0 +1,76 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+import excel_sidecar
+from excel_cache import query_frame
+from excel_sidecar import convert_workbook, read_sidecar, query_table, remove_sidecars, sidecar_path
+
+
+@pytest.fixture
+def sidecar_dir(tmp_path, monkeypatch):
+    directory = tmp_path / ".columnar"
+    monkeypatch.setattr(excel_sidecar, "SIDECAR_DIR", str(directory))
+    return directory
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    df = pd.DataFrame({
+        "id": [1, 2, 3, 4, 5],
+        "ratio": [1.0, 2.5, None, 10.0, 0.1],
+        "when": [datetime(2024, 1, 5), datetime(2024, 2, 1), datetime(2023, 12, 31), None, datetime(2024, 1, 15)],
+        "mixed": [1, "one", 2.0, "2024-01-05", None],
+        "name": ["Alpha", "beta", "Gamma 1.0", None, "delta"],
+    })
+    path = tmp_path / "book.xlsx"
+    df.to_excel(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize("filters", [
+    [("ratio", "1.0")],
+    [("ratio", "1")],
+    [("ratio", ".5")],
+    [("when", "2024-01-05")],
+    [("when", "00:00")],
+    [("mixed", "2")],
+    [("mixed", "ONE")],
+    [("name", "a"), ("id", "1")],
+    [("name", "1.0")],
+])
+def test_sidecar_and_parsed_sheet_filter_identically(sidecar_dir, workbook, filters):
+    convert_workbook(workbook)
+    table = read_sidecar(workbook, "Sheet1")
+    assert table is not None
+    df = pd.read_excel(workbook, sheet_name="Sheet1")
+
+    from_sidecar, sidecar_total = query_table(table, filters, [("id", False)], ["id"], 0, None)
+    from_frame, frame_total = query_frame(df, filters, [("id", False)], ["id"], 0, None)
+
+    assert sidecar_total == frame_total
+    assert from_sidecar.column("id").to_pylist() == from_frame["id"].tolist()
+
+
+def test_same_workbook_name_in_different_directories(sidecar_dir, tmp_path):
+    first = os.path.join(tmp_path, "a", "book.xlsx")
+    second = os.path.join(tmp_path, "b", "book.xlsx")
+    assert sidecar_path(first, "Sheet1") != sidecar_path(second, "Sheet1")
+
+
+def test_remove_sidecars_leaves_no_open_mapping(sidecar_dir, workbook):
+    convert_workbook(workbook)
+    path = sidecar_path(workbook, "Sheet1")
+    table = read_sidecar(workbook, "Sheet1")
+    assert table.num_rows == 5
+    del table
+
+    remove_sidecars(workbook)
+    assert not os.path.exists(path)
+    if os.path.isdir("/proc/self/fd"):
+        open_files = {os.path.realpath(os.path.join("/proc/self/fd", fd)) for fd in os.listdir("/proc/self/fd")}
+        assert os.path.realpath(path) not in open_files
@@ -0,0 +1,179 @@
+import os
+import shutil
+import sys
+import threading
+import time
+
+import pytest
+
+from fs_watcher import DirectoryWatcher
+
+inotify_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+
+
+def wait_until(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+class Recorder:
+    """Callbacks for one watched directory that record what they were told"""
+
+    def __init__(self):
+        self.changes = []
+        self.rescans = 0
+        self.lock = threading.Lock()
+
+    def changed(self, names):
+        with self.lock:
+            self.changes.append(set(names))
+
+    def rescan(self):
+        with self.lock:
+            self.rescans += 1
+
+    def seen(self) -> set:
+        with self.lock:
+            return set().union(*self.changes)
+
+
+@pytest.fixture
+def watcher():
+    watchers = []
+
+    def make(mode: str, **kwargs) -> DirectoryWatcher:
+        w = DirectoryWatcher(mode=mode, **kwargs)
+        watchers.append(w)
+        return w
+
+    yield make
+    for w in watchers:
+        w.stop()
+
+
+def write(path, text: str = "x"):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+@inotify_only
+def test_burst_is_reported_once(tmp_path, watcher):
+    recorder = Recorder()
+    w = watcher("inotify", debounce=0.3)
+    w.watch(str(tmp_path), recorder.changed, include=lambda name: name.endswith(".docx"))
+    w.start()
+    assert w.wait_ready() and w.backend == "inotify"
+    assert w.watching(str(tmp_path))
+
+    for i in range(5):
+        write(tmp_path / "a.docx", "x" * i)
+    write(tmp_path / "b.docx")
+    write(tmp_path / "ignored.txt")
+    assert wait_until(lambda: recorder.changes)
+    time.sleep(0.5)
+    assert recorder.changes == [{"a.docx", "b.docx"}]
+
+
+def test_polling_reports_changes(tmp_path, watcher):
+    write(tmp_path / "old.xlsx")
+    recorder = Recorder()
+    w = watcher("poll", debounce=0.05, poll_interval=0.1)
+    w.watch(str(tmp_path), recorder.changed)
+    w.start()
+    assert w.wait_ready() and w.backend == "polling"
+
+    write(tmp_path / "new.xlsx")
+    os.remove(tmp_path / "old.xlsx")
+    assert wait_until(lambda: recorder.seen() == {"new.xlsx", "old.xlsx"})
+
+
+def test_overflow_rescans_every_directory(tmp_path):
+    first, second = Recorder(), Recorder()
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    write(tmp_path / "b" / "kept.docx")
+    w = DirectoryWatcher(mode="off")
+    w.watch(str(tmp_path / "a"), first.changed, rescan=first.rescan)
+    # Without a rescan callback the directory's whole listing is reported
+    w.watch(str(tmp_path / "b"), second.changed)
+    w._note(str(tmp_path / "a"), "lost.docx")
+    w._overflow()
+    w._dispatch()
+    assert (first.rescans, first.changes) == (1, [])
+    assert second.changes == [{"kept.docx"}]
+    assert w.stats()["overflows"] == 1
+
+
+def test_failing_callback_is_counted(tmp_path):
+    def fail(names):
+        raise RuntimeError("boom")
+
+    w = DirectoryWatcher(mode="off")
+    w.watch(str(tmp_path), fail)
+    w._note(str(tmp_path), "a.docx")
+    w._dispatch()
+    assert w.stats()["callback_errors"] == 1
+
+
+@inotify_only
+def test_directory_missing_at_startup_is_watched_once_created(tmp_path, watcher):
+    directory = tmp_path / "later"
+    recorder = Recorder()
+    w = watcher("inotify", debounce=0.05, poll_interval=0.1)
+    w.watch(str(directory), recorder.changed, rescan=recorder.rescan)
+    w.start()
+    assert w.wait_ready()
+    # Running, but this directory's changes are not being seen, so callers must rescan it
+    assert w.running and not w.watching(str(directory))
+    assert w.stats()["unwatched"] == ["later"]
+
+    directory.mkdir()
+    write(directory / "early.docx")
+    assert wait_until(lambda: w.watching(str(directory)))
+    # Files created before the watch was added are picked up by a rescan
+    assert wait_until(lambda: recorder.rescans == 1)
+    write(directory / "late.docx")
+    assert wait_until(lambda: "late.docx" in recorder.seen())
+
+
+@inotify_only
+def test_deleted_directory_is_rewatched_when_recreated(tmp_path, watcher):
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    recorder = Recorder()
+    w = watcher("inotify", debounce=0.05, poll_interval=0.1)
+    w.watch(str(directory), recorder.changed, rescan=recorder.rescan)
+    w.start()
+    assert w.wait_ready() and w.watching(str(directory))
+
+    shutil.rmtree(directory)
+    assert wait_until(lambda: not w.watching(str(directory)))
+    assert wait_until(lambda: recorder.rescans == 1)
+
+    directory.mkdir()
+    assert wait_until(lambda: w.watching(str(directory)))
+    assert wait_until(lambda: recorder.rescans == 2)
+    write(directory / "new.docx")
+    assert wait_until(lambda: "new.docx" in recorder.seen())
+
+
+@inotify_only
+def test_moved_away_directory_is_not_watched(tmp_path, watcher):
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    recorder = Recorder()
+    w = watcher("inotify", debounce=0.05, poll_interval=0.1)
+    w.watch(str(directory), recorder.changed, rescan=recorder.rescan)
+    w.start()
+    assert w.wait_ready()
+
+    os.rename(directory, tmp_path / "elsewhere")
+    assert wait_until(lambda: not w.watching(str(directory)))
+    # Changes in the moved directory are no longer reported under the old path
+    write(tmp_path / "elsewhere" / "stray.docx")
+    time.sleep(0.3)
+    assert "stray.docx" not in recorder.seen()
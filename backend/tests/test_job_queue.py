@@ -0,0 +1,129 @@
+import os
+
+import pytest
+
+import job_queue
+from job_queue import (
+    CANCELLED, FAILED, MAX_ATTEMPTS, QUEUED, RUNNING, SUCCEEDED, JobContext,
+    cancel_job, claim_next_job, get_job, purge_expired_jobs, requeue_jobs, run_job, submit_job,
+)
+
+
+@pytest.fixture
+def pool(migrated_pool, tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue, "JOB_RESULTS_DIR", str(tmp_path / "job_results"))
+    return migrated_pool("jobs")
+
+
+def job_status(pool, job_id):
+    with pool.read() as conn:
+        return get_job(conn, job_id)
+
+
+def test_claims_oldest_queued_job_once(pool):
+    first = submit_job(pool, "minutes", {"n": 1})
+    second = submit_job(pool, "minutes", {"n": 2})
+    assert first["status"] == QUEUED
+
+    assert claim_next_job(pool) == (first["id"], "minutes", '{"n": 1}')
+    assert claim_next_job(pool)[0] == second["id"]
+    assert claim_next_job(pool) is None
+
+    job = job_status(pool, first["id"])
+    assert (job["status"], job["attempts"]) == (RUNNING, 1)
+    with pool.read() as conn:
+        assert conn.execute("SELECT worker_pid FROM jobs WHERE id = ?", (first["id"],)).fetchone()[0] == os.getpid()
+
+
+def test_cancel_queued_job(pool):
+    job = submit_job(pool, "minutes", {})
+    assert cancel_job(pool, job["id"], result_ttl=60)["status"] == CANCELLED
+    assert claim_next_job(pool) is None
+    assert cancel_job(pool, "no-such-job", result_ttl=60) is None
+
+
+def test_cancel_running_job_stops_handler(pool):
+    job = submit_job(pool, "export", {})
+    claimed = claim_next_job(pool)
+
+    def handler(ctx, payload):
+        ctx.progress(1, 2)
+        cancel_job(pool, job["id"], result_ttl=60)
+        assert job_status(pool, job["id"])["cancel_requested"]
+        ctx.progress(2, 2)
+        pytest.fail("progress did not raise JobCancelled")
+
+    run_job(pool, {"export": handler}, claimed, result_ttl=60)
+    assert job_status(pool, job["id"])["status"] == CANCELLED
+
+
+def test_run_job_records_outcome(pool):
+    ok = submit_job(pool, "export", {"text": "done"})
+    broken = submit_job(pool, "broken", {})
+    unknown = submit_job(pool, "unknown", {})
+
+    def export(ctx, payload):
+        os.makedirs(os.path.dirname(ctx.result_path), exist_ok=True)
+        with open(ctx.result_path, "w") as f:
+            f.write(payload["text"])
+        return "result.txt", "text/plain"
+
+    def fail(ctx, payload):
+        with open(ctx.result_path, "w") as f:
+            f.write("partial")
+        raise ValueError("bad payload")
+
+    handlers = {"export": export, "broken": fail}
+    for _ in range(3):
+        run_job(pool, handlers, claim_next_job(pool), result_ttl=60)
+
+    job = job_status(pool, ok["id"])
+    assert (job["status"], job["result_name"], job["result_type"]) == (SUCCEEDED, "result.txt", "text/plain")
+    assert open(JobContext(pool, ok["id"]).result_path).read() == "done"
+    job = job_status(pool, broken["id"])
+    assert (job["status"], job["error"]) == (FAILED, "bad payload")
+    assert not os.path.exists(JobContext(pool, broken["id"]).result_path)
+    assert job_status(pool, unknown["id"])["error"] == "Unknown job kind: unknown"
+
+
+def test_requeue_jobs_of_dead_workers(pool):
+    job = submit_job(pool, "minutes", {})
+    other = submit_job(pool, "minutes", {})
+    claim_next_job(pool)
+    claim_next_job(pool)
+    with pool.write() as conn:
+        conn.execute("UPDATE jobs SET worker_pid = -1 WHERE id = ?", (other["id"],))
+
+    assert requeue_jobs(pool, result_ttl=60, worker_pids=[]) == 0
+    assert requeue_jobs(pool, result_ttl=60, worker_pids=[os.getpid()]) == 1
+    assert job_status(pool, job["id"])["status"] == QUEUED
+    assert job_status(pool, other["id"])["status"] == RUNNING
+    assert claim_next_job(pool)[0] == job["id"]
+    assert job_status(pool, job["id"])["attempts"] == 2
+
+
+def test_requeue_gives_up_after_max_attempts(pool):
+    job = submit_job(pool, "minutes", {})
+    for _ in range(MAX_ATTEMPTS - 1):
+        claim_next_job(pool)
+        assert requeue_jobs(pool, result_ttl=60) == 1
+    claim_next_job(pool)
+    assert requeue_jobs(pool, result_ttl=60) == 0
+    job = job_status(pool, job["id"])
+    assert (job["status"], job["attempts"]) == (FAILED, MAX_ATTEMPTS)
+
+
+def test_purge_expired_jobs(pool):
+    expired = submit_job(pool, "minutes", {})
+    kept = submit_job(pool, "minutes", {})
+    cancel_job(pool, expired["id"], result_ttl=-1)
+    cancel_job(pool, kept["id"], result_ttl=3600)
+    result_path = JobContext(pool, expired["id"]).result_path
+    os.makedirs(os.path.dirname(result_path))
+    open(result_path, "w").close()
+
+    assert purge_expired_jobs(pool) == 1
+    assert job_status(pool, expired["id"]) is None
+    assert not os.path.exists(result_path)
+    assert job_status(pool, kept["id"])["status"] == CANCELLED
+    assert purge_expired_jobs(pool) == 0
@@ -0,0 +1,88 @@
+import io
+import json
+import os
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("docx")
+
+from minutes_archive import MinutesArchive
+from minutes_templates import (
+    PARALLEL_THRESHOLD, RenderedCache, RenderPool, TemplateCache, batch_entries, render_many, template_path,
+)
+
+TEMPLATES = [name for name in ("q1", "q2", "q3", "q4") if os.path.exists(template_path(name))]
+
+pytestmark = pytest.mark.skipif(not TEMPLATES, reason="meeting templates not present")
+
+
+@pytest.fixture
+def make_request(minutes_payload):
+    def make(template: str, **overrides):
+        return SimpleNamespace(**minutes_payload(template, **overrides))
+
+    return make
+
+
+def test_batch_reports_failures_in_manifest(make_request):
+    requests = [make_request(TEMPLATES[0]), make_request("missing"), make_request(TEMPLATES[0], companyName="Beta Ltd")]
+    rendered = RenderedCache()
+    seen, fresh = [], []
+    entries = list(batch_entries(
+        TemplateCache(), requests, rendered=rendered,
+        on_item=lambda index, data, error: seen.append((index, error is None)),
+        on_render=lambda index, data: fresh.append(index),
+    ))
+    names = [name for name, _ in entries]
+    assert names[-1] == "manifest.json"
+    manifest = json.loads(entries[-1][1])
+    assert (manifest["total"], manifest["succeeded"], manifest["failed"]) == (3, 2, 1)
+    assert manifest["items"][1]["error"] == "Template missing not found"
+    assert sorted(seen) == [(0, True), (1, False), (2, True)]
+    assert sorted(fresh) == [0, 2]
+
+    # A second run of the same batch is answered from the rendered cache
+    fresh.clear()
+    again = list(batch_entries(TemplateCache(), requests, rendered=rendered, on_render=lambda index, data: fresh.append(index)))
+    assert fresh == []
+    assert dict(again[:-1]) == dict(entries[:-1])
+
+
+def test_pool_renders_like_inline(make_request):
+    requests = [
+        make_request(TEMPLATES[i % len(TEMPLATES)], companyName=f"Company {i}")
+        for i in range(PARALLEL_THRESHOLD + 1)
+    ]
+    inline = {index: data for index, data, error in render_many(TemplateCache(), requests)}
+    pool = RenderPool(workers=2)
+    try:
+        parallel = {index: data for index, data, error in render_many(TemplateCache(), requests, pool)}
+    finally:
+        pool.shutdown()
+    assert pool.stats()["submitted"] == len(requests)
+    assert parallel.keys() == inline.keys() == set(range(len(requests)))
+    assert all(parallel[i] == inline[i] for i in inline)
+
+
+def test_batch_endpoint_streams_zip(client, server, minutes_payload, tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "rendered_minutes", RenderedCache())
+    monkeypatch.setattr(server, "minutes_archive", MinutesArchive(str(tmp_path / "archive")))
+    body = [minutes_payload(TEMPLATES[0]), minutes_payload("missing"), minutes_payload(TEMPLATES[0], companyName="Beta Ltd")]
+    response = client.post("/generate-minutes/batch", json=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        names = archive.namelist()
+        manifest = json.loads(archive.read("manifest.json"))
+    assert names == [
+        f"001_Acme_Industries_Limited_{TEMPLATES[0]}.docx", f"003_Beta_Ltd_{TEMPLATES[0]}.docx", "manifest.json",
+    ]
+    assert manifest["failed"] == 1
+    assert len(os.listdir(tmp_path / "archive")) == 2
+
+
+def test_batch_limits(client):
+    assert client.post("/generate-minutes/batch", json=[]).status_code == 400
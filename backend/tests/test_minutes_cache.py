@@ -0,0 +1,68 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("docx")
+
+from minutes_archive import MinutesArchive
+from minutes_templates import RenderedCache, TemplateCache, placeholder_values, template_path
+
+TEMPLATES = [name for name in ("q1", "q2", "q3", "q4") if os.path.exists(template_path(name))]
+
+pytestmark = pytest.mark.skipif(not TEMPLATES, reason="meeting templates not present")
+
+
+@pytest.fixture
+def archive(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "rendered_minutes", RenderedCache())
+    archive = MinutesArchive(str(tmp_path / "archive"))
+    monkeypatch.setattr(server, "minutes_archive", archive)
+    return archive
+
+
+def test_render_key_follows_values(minutes_payload):
+    payload = minutes_payload(TEMPLATES[0])
+    directors = payload["presentDirectors"]
+    compiled = TemplateCache().load(template_path(TEMPLATES[0]))
+    values = placeholder_values(SimpleNamespace(**payload))
+    key = compiled.render_key(values, directors)
+    assert compiled.render_key(dict(values), list(directors)) == key
+    assert compiled.render_key(dict(values, **{"[Name of Company]": "Other Ltd"}), directors) != key
+    assert compiled.render_key(values, directors[:1]) != key
+
+
+def test_rendered_cache_evicts_least_recently_used():
+    cache = RenderedCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"
+    cache.put("c", b"1234")
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (b"1234", None, b"1234")
+
+
+def test_repeated_request_is_served_from_cache(client, archive, minutes_payload):
+    first = client.post("/generate-minutes", json=minutes_payload(TEMPLATES[0]))
+    second = client.post("/generate-minutes", json=minutes_payload(TEMPLATES[0]))
+    assert first.status_code == second.status_code == 200
+    assert first.headers["etag"] == second.headers["etag"]
+    assert second.content == first.content
+    # Only the rendered document is archived, not the one served from cache
+    assert archive.stats()["saved"] == 1
+
+    other = client.post("/generate-minutes", json=minutes_payload(TEMPLATES[0], companyName="Beta Ltd"))
+    assert other.headers["etag"] != first.headers["etag"]
+    assert archive.stats()["saved"] == 2
+
+
+def test_matching_if_none_match_is_not_modified(client, archive, minutes_payload):
+    etag = client.post("/generate-minutes", json=minutes_payload(TEMPLATES[0])).headers["etag"]
+    response = client.post("/generate-minutes", json=minutes_payload(TEMPLATES[0]), headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    stale = client.post("/generate-minutes", json=minutes_payload(TEMPLATES[0], companyName="Beta Ltd"),
+                        headers={"If-None-Match": etag})
+    assert stale.status_code == 200
+    assert archive.stats()["saved"] == 2
@@ -0,0 +1,87 @@
+import io
+import os
+import time
+
+import pytest
+
+pytest.importorskip("docx")
+
+from docx import Document as DocxDocument
+
+from minutes_archive import MinutesArchive
+from minutes_templates import RenderedCache, template_path
+
+TEMPLATES = [name for name in ("q1", "q2", "q3", "q4") if os.path.exists(template_path(name))]
+
+needs_templates = pytest.mark.skipif(not TEMPLATES, reason="meeting templates not present")
+
+
+@pytest.fixture
+def minutes(client, server, monkeypatch):
+    """The client with an empty generated-minutes cache and archiving disabled"""
+    monkeypatch.setattr(server, "rendered_minutes", RenderedCache())
+    monkeypatch.setattr(server, "minutes_archive", MinutesArchive(None))
+    return client
+
+
+def body_text(data: bytes) -> str:
+    return "\n".join(para.text for para in DocxDocument(io.BytesIO(data)).paragraphs)
+
+
+@needs_templates
+def test_document_is_returned_from_memory(minutes, minutes_payload, tmp_path, monkeypatch):
+    workdir = tmp_path / "cwd"
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+    response = minutes.post("/generate-minutes", json=minutes_payload(TEMPLATES[0]))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    assert response.headers["content-disposition"].startswith(f'attachment; filename="meeting_minutes_{TEMPLATES[0]}_')
+    assert "Acme Industries Limited" in body_text(response.content)
+    # Without an archive directory nothing is written to disk
+    assert os.listdir(workdir) == []
+
+
+@needs_templates
+def test_archive_is_opt_in(minutes, server, minutes_payload, tmp_path, monkeypatch):
+    archive = MinutesArchive(str(tmp_path / "archive"))
+    monkeypatch.setattr(server, "minutes_archive", archive)
+    response = minutes.post("/generate-minutes", json=minutes_payload(TEMPLATES[0]))
+    assert response.status_code == 200
+    saved = os.listdir(tmp_path / "archive")
+    assert len(saved) == 1 and saved[0].startswith(f"meeting_minutes_{TEMPLATES[0]}_")
+    assert (tmp_path / "archive" / saved[0]).read_bytes() == response.content
+    assert archive.stats()["saved"] == 1
+
+
+def test_unknown_template_is_404(minutes, minutes_payload):
+    response = minutes.post("/generate-minutes", json=minutes_payload("q9"))
+    assert response.status_code == 404
+
+
+def test_archive_keeps_newest_files(tmp_path):
+    archive = MinutesArchive(str(tmp_path), max_age_days=0, max_files=2)
+    (tmp_path / "notes.txt").write_text("not minutes")
+    for i in range(3):
+        archive.save(f"meeting_minutes_q1_{i}.docx", b"doc")
+        path = tmp_path / f"meeting_minutes_q1_{i}.docx"
+        os.utime(path, (time.time() + i, time.time() + i))
+    assert sorted(os.listdir(tmp_path)) == ["meeting_minutes_q1_1.docx", "meeting_minutes_q1_2.docx", "notes.txt"]
+    assert archive.stats()["removed"] == 1
+
+
+def test_archive_drops_expired_files(tmp_path):
+    old = tmp_path / "meeting_minutes_q1_old.docx"
+    old.write_bytes(b"doc")
+    os.utime(old, (time.time() - 3 * 86400, time.time() - 3 * 86400))
+    archive = MinutesArchive(str(tmp_path), max_age_days=2, max_files=0)
+    assert archive.collect() == 1
+    archive.save("meeting_minutes_q1_new.docx", b"doc")
+    assert os.listdir(tmp_path) == ["meeting_minutes_q1_new.docx"]
+
+
+def test_disabled_archive_writes_nothing(tmp_path):
+    archive = MinutesArchive(None)
+    archive.save("meeting_minutes_q1.docx", b"doc")
+    assert not archive.enabled and archive.collect() == 0
+    assert archive.stats()["saved"] == 0
@@ -0,0 +1,136 @@
+import sqlite3
+
+import pytest
+
+from db_pool import SQLitePool
+from feed_rollups import FEED_ROLLUPS, ensure_feed_rollup, feed_rollup_installed, rebuild_feed_rollup
+
+RBI = FEED_ROLLUPS["rbi"]
+SEBI = FEED_ROLLUPS["sebi"]
+
+
+def rollup_counts(conn, source: dict) -> dict:
+    return dict(conn.execute(f"SELECT month, count FROM {source['rollup']}").fetchall())
+
+
+def grouped_counts(conn, source: dict) -> dict:
+    table = source["table"]
+    return dict(conn.execute(
+        f"SELECT {source['month'].format(row=table)}, COUNT(*) FROM {table} "
+        f"WHERE {source['listed'].format(row=table)} GROUP BY 1"
+    ).fetchall())
+
+
+@pytest.fixture
+def rbi():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE master_summaries (id INTEGER PRIMARY KEY, run_date TEXT, pdf_link TEXT, summary TEXT)")
+    conn.executemany("INSERT INTO master_summaries (run_date, pdf_link, summary) VALUES (?, ?, ?)", [
+        ("05-01-2024", "https://example.com/1", "Repo rate"),
+        ("20-01-2024", "NIL", "NIL"),
+        ("2024-02-01", "NIL", "Circular"),
+        ("garbled", "https://example.com/2", "s"),
+        (None, "https://example.com/3", "s"),
+    ])
+    rebuild_feed_rollup(conn, RBI)
+    yield conn
+    conn.close()
+
+
+def test_rebuild_matches_grouped_counts(rbi):
+    assert feed_rollup_installed(rbi, RBI)
+    assert rollup_counts(rbi, RBI) == {"2024-01": 1, "2024-02": 1, "": 2}
+    assert rollup_counts(rbi, RBI) == grouped_counts(rbi, RBI)
+
+
+def test_triggers_track_changes(rbi):
+    conn = rbi
+    conn.execute("INSERT INTO master_summaries (run_date, pdf_link, summary) VALUES ('01-03-2024', 'https://example.com/4', 's')")
+    conn.execute("INSERT INTO master_summaries (run_date, pdf_link, summary) VALUES ('02-03-2024', 'NIL', 'NIL')")
+    assert rollup_counts(conn, RBI) == grouped_counts(conn, RBI)
+    # Unlisted -> listed, listed -> unlisted, and a change of month
+    conn.execute("UPDATE master_summaries SET summary = 'Revised' WHERE run_date = '20-01-2024'")
+    conn.execute("UPDATE master_summaries SET pdf_link = 'NIL', summary = 'NIL' WHERE run_date = '2024-02-01'")
+    conn.execute("UPDATE master_summaries SET run_date = '31-12-2023' WHERE run_date = '05-01-2024'")
+    assert rollup_counts(conn, RBI) == grouped_counts(conn, RBI)
+    conn.execute("DELETE FROM master_summaries WHERE run_date = '31-12-2023'")
+    assert rollup_counts(conn, RBI) == grouped_counts(conn, RBI)
+    conn.execute("DELETE FROM master_summaries")
+    assert rollup_counts(conn, RBI) == {}
+
+
+def test_rollup_rebuilt_after_table_replaced(tmp_path):
+    pool = SQLitePool("sebi", str(tmp_path / "sebi_excel_master.db"))
+    try:
+        with pool.write() as conn:
+            conn.execute("CREATE TABLE excel_summaries (id INTEGER PRIMARY KEY, date_key TEXT, summary TEXT)")
+            conn.execute("INSERT INTO excel_summaries (date_key) VALUES ('05-01-2024')")
+        assert ensure_feed_rollup(pool, SEBI)
+        assert not ensure_feed_rollup(pool, SEBI)
+        # An ingest job replacing the table wholesale drops the triggers with it
+        with pool.write() as conn:
+            conn.execute("DROP TABLE excel_summaries")
+            conn.execute("CREATE TABLE excel_summaries (id INTEGER PRIMARY KEY, date_key TEXT, summary TEXT)")
+            conn.execute("INSERT INTO excel_summaries (date_key) VALUES ('2024-02-01'), ('2024-02-09')")
+        assert ensure_feed_rollup(pool, SEBI)
+        with pool.read() as conn:
+            assert rollup_counts(conn, SEBI) == {"2024-02": 2}
+    finally:
+        pool.close()
+
+
+@pytest.fixture
+def feed(server, seed):
+    seed("notifications.db", "DailyLogs", [
+        {"SrNo": 1, "EntityName": "Acme", "Link": "https://example.com/b1", "Date": "2024-01-05"},
+        {"SrNo": 2, "EntityName": "Beta", "Link": "NIL", "Date": "2024-01-06"},
+        {"SrNo": 3, "EntityName": "Gamma", "Link": "https://example.com/b3", "Date": "2024-02-01"},
+    ])
+    seed("sebi_excel_master.db", "excel_summaries", [
+        {"date_key": "05-01-2024", "row_index": 1, "pdf_link": "https://example.com/s1", "summary": "Order"},
+        {"date_key": "10-02-2024", "row_index": 1, "pdf_link": "https://example.com/s2", "summary": "Circular"},
+    ])
+    seed("rbi.db", "master_summaries", [
+        {"run_date": "05-01-2024", "pdf_link": "https://example.com/r1", "summary": "Repo", "created_at": "now"},
+        {"run_date": "06-01-2024", "pdf_link": "NIL", "summary": "NIL", "created_at": "now"},
+    ])
+    server.migrate_all()
+
+
+def test_feed_merges_sources_newest_first(client, feed):
+    body = client.get("/api/notifications-feed").json()
+    assert [(item["source"], item["date"]) for item in body["data"]] == [
+        ("sebi", "2024-02-10"), ("bse", "2024-02-01"), ("bse", "2024-01-05"), ("rbi", "2024-01-05"), ("sebi", "2024-01-05"),
+    ]
+    assert body["next_cursor"] is None
+    assert body["totals"] == {"bse": 2, "sebi": 2, "rbi": 1}
+    assert body["monthly"] == [
+        {"month": "2024-02", "bse": 1, "sebi": 1, "rbi": 0, "total": 2},
+        {"month": "2024-01", "bse": 1, "sebi": 1, "rbi": 1, "total": 3},
+    ]
+
+
+def test_feed_pages_follow_cursor(client, feed):
+    full = client.get("/api/notifications-feed").json()["data"]
+    items, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/api/notifications-feed", params=params).json()
+        items.extend(body["data"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert items == full
+
+
+def test_feed_totals_follow_ingest(client, feed, public_dir):
+    assert client.get("/api/notifications-feed", params={"limit": 0}).json()["data"] == []
+    with sqlite3.connect(public_dir / "rbi.db") as conn:
+        conn.execute(
+            "INSERT INTO master_summaries (run_date, pdf_link, summary, created_at) "
+            "VALUES ('01-03-2024', 'https://example.com/r2', 'Circular', 'now')"
+        )
+    conn.close()
+    body = client.get("/api/notifications-feed", params={"limit": 0}).json()
+    assert body["totals"]["rbi"] == 2
+    assert body["monthly"][0] == {"month": "2024-03", "bse": 0, "sebi": 0, "rbi": 1, "total": 1}
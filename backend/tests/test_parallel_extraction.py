@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from db_migrations import MIGRATIONS, run_migrations
+from db_pool import SQLitePool
+from disclosure_catalog import PARALLEL_THRESHOLD, extract_many, list_disclosures, sync_catalog
+
+CLASSIFIED = [
+    ["Notice of interest or concern", "DIN: 10000001"],
+    ["Disclosure of shareholding", "DIN: 10000002"],
+    ["Details of the transaction", "Director"],
+    ["Form MBP-1", "DIN: 10000004"],
+]
+
+
+@pytest.fixture
+def documents(disclosures_dir):
+    """More documents than PARALLEL_THRESHOLD, one of them unreadable"""
+    paths = [
+        disclosures_dir(f"Director {i:02d}_MBP.docx", CLASSIFIED[i % len(CLASSIFIED)])
+        for i in range(PARALLEL_THRESHOLD + 2)
+    ]
+    broken = os.path.join(disclosures_dir.path, "Broken_MBP.docx")
+    with open(broken, "wb") as f:
+        f.write(b"not a zip file")
+    return paths + [broken]
+
+
+def by_path(results) -> dict:
+    return {path: (record, error is not None) for path, record, error in results}
+
+
+def test_pool_matches_inline_extraction(documents):
+    inline = by_path(extract_many(documents, workers=1))
+    parallel = by_path(extract_many(documents, workers=2))
+    assert parallel == inline
+    assert len(inline) == len(documents)
+    assert inline[documents[-1]] == (None, True)
+    assert inline[documents[0]] == ({'din': '10000001', 'classification': 'Interest'}, False)
+
+
+def test_parallel_sync_catalogs_like_inline(migrated_pool, tmp_path, documents, disclosures_dir):
+    inline = migrated_pool("disclosures")
+    parallel = SQLitePool("disclosures", str(tmp_path / "parallel.db"))
+    try:
+        run_migrations(parallel, MIGRATIONS["disclosures"])
+        counts = sync_catalog(inline, disclosures_dir.path, workers=1)
+        assert sync_catalog(parallel, disclosures_dir.path, workers=2) == counts
+        assert counts['added'] == len(documents)
+        with inline.read() as a, parallel.read() as b:
+            assert [row[1:] for row in list_disclosures(a)] == [row[1:] for row in list_disclosures(b)]
+    finally:
+        parallel.close()
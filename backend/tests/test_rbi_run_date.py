@@ -0,0 +1,77 @@
+import pytest
+
+from db_migrations import MIGRATIONS, run_migrations
+from db_pool import SQLitePool
+
+
+@pytest.fixture
+def rbi(tmp_path):
+    pool = SQLitePool("rbi", str(tmp_path / "rbi.db"))
+    with pool.write() as conn:
+        conn.execute("""
+            CREATE TABLE master_summaries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_date TEXT NOT NULL, pdf_link TEXT, summary TEXT, created_at TEXT NOT NULL
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO master_summaries (run_date, pdf_link, summary, created_at) VALUES (?, 'l', 's', 'now')",
+            [("28-09-2025",), ("2024-01-05",), ("2024-01-05 10:30:00",), ("5-1-2024",), ("",)]
+        )
+    yield pool
+    pool.close()
+
+
+def iso_dates(pool) -> list:
+    with pool.read() as conn:
+        return conn.execute("SELECT run_date, run_date_iso FROM master_summaries ORDER BY id").fetchall()
+
+
+def test_migration_backfills_iso_dates(rbi):
+    run_migrations(rbi, MIGRATIONS["rbi"])
+    assert iso_dates(rbi) == [
+        ("28-09-2025", "2025-09-28"),
+        ("2024-01-05", "2024-01-05"),
+        ("2024-01-05 10:30:00", "2024-01-05"),
+        ("5-1-2024", ""),
+        ("", ""),
+    ]
+
+
+def test_triggers_keep_iso_date_current(rbi):
+    run_migrations(rbi, MIGRATIONS["rbi"])
+    with rbi.write() as conn:
+        # Ingest inserts without knowing about run_date_iso
+        conn.execute("INSERT INTO master_summaries (run_date, pdf_link, summary, created_at) VALUES ('01-02-2024', 'l', 's', 'now')")
+        conn.execute("UPDATE master_summaries SET run_date = '31-12-2023' WHERE run_date = '28-09-2025'")
+    dates = dict(iso_dates(rbi))
+    assert dates["01-02-2024"] == "2024-02-01"
+    assert dates["31-12-2023"] == "2023-12-31"
+    assert "28-09-2025" not in dates
+
+
+@pytest.fixture
+def rbi_listing(server, seed):
+    seed("rbi.db", "master_summaries", [
+        {"run_date": run_date, "pdf_link": f"https://example.com/{i}", "summary": "s", "created_at": "now"}
+        for i, run_date in enumerate(["28-12-2023", "05-01-2024", "31-01-2024", "01-02-2024", "15-03-2023"])
+    ])
+    server.migrate_all()
+
+
+def test_listing_sorts_by_calendar_date(client, rbi_listing):
+    data = client.get("/rbi-analysis-data").json()["data"]
+    # Sorting run_date as text would put 31-01-2024 first
+    assert [item["date_key"] for item in data] == ["01-02-2024", "31-01-2024", "05-01-2024", "28-12-2023", "15-03-2023"]
+
+
+def test_listing_date_range(client, rbi_listing):
+    body = client.get("/rbi-analysis-data", params={"start_date": "2024-01-01", "end_date": "2024-01-31"}).json()
+    assert body["count"] == 2
+    assert [item["date_key"] for item in body["data"]] == ["31-01-2024", "05-01-2024"]
+    assert client.get("/rbi-analysis-data", params={"start_date": "2023-12-28", "end_date": "2023-12-28"}).json()["count"] == 1
+
+
+@pytest.mark.parametrize("params", [{"start_date": "01-01-2024"}, {"end_date": "2024-13-01"}, {"start_date": "yesterday"}])
+def test_listing_rejects_bad_dates(client, rbi_listing, params):
+    assert client.get("/rbi-analysis-data", params=params).status_code == 400
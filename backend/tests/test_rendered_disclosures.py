@@ -0,0 +1,83 @@
+import os
+import shutil
+
+import pytest
+
+import disclosure_catalog
+from db_migrations import MIGRATIONS, run_migrations
+from db_pool import SQLitePool
+from disclosure_catalog import list_disclosures, load_rendered, open_disclosure, sync_catalog
+
+
+@pytest.fixture
+def catalog(migrated_pool):
+    return migrated_pool("disclosures")
+
+
+def open_by_name(pool, directory: str, filename: str):
+    with pool.read() as conn:
+        disclosure_id = {row[1]: row[0] for row in list_disclosures(conn)}[filename]
+    return open_disclosure(pool, disclosure_id, directory)
+
+
+def stored_hashes(pool) -> set:
+    with pool.read() as conn:
+        return {row[0] for row in conn.execute("SELECT content_hash FROM rendered_disclosures")}
+
+
+def test_rendered_once_per_content_hash(catalog, disclosures_dir, monkeypatch):
+    path = disclosures_dir("A_MBP.docx", ["DIN: 11111111", "Body text"], tables=[[["Name", "Shares"], ["Acme", "10"]]])
+    shutil.copy(path, os.path.join(disclosures_dir.path, "Copy_MBP.docx"))
+    sync_catalog(catalog, disclosures_dir.path)
+
+    renders = []
+    render = disclosure_catalog.render_disclosure
+    monkeypatch.setattr(disclosure_catalog, "render_disclosure", lambda f: renders.append(f) or render(f))
+
+    record, f = open_by_name(catalog, disclosures_dir.path, "A_MBP.docx")
+    with f:
+        first = load_rendered(catalog, record, f)
+    assert first['content'].startswith("Document: A_MBP.docx\n")
+    assert "Body text\n" in first['content'] and "Acme | 10\n" in first['content']
+    assert first['tables'] == [[["Name", "Shares"], ["Acme", "10"]]]
+
+    # The same document again, and an identical copy under another name, reuse the rendering
+    for filename in ("A_MBP.docx", "Copy_MBP.docx"):
+        record, f = open_by_name(catalog, disclosures_dir.path, filename)
+        with f:
+            again = load_rendered(catalog, record, f)
+        assert again['tables'] == first['tables']
+        assert again['content'] == first['content'].replace("A_MBP.docx", filename, 1)
+    assert len(renders) == 1
+    assert stored_hashes(catalog) == {record['content_hash']}
+
+
+def test_sync_drops_orphaned_renderings(catalog, disclosures_dir):
+    path = disclosures_dir("A_MBP.docx", ["Original"])
+    sync_catalog(catalog, disclosures_dir.path)
+    record, f = open_by_name(catalog, disclosures_dir.path, "A_MBP.docx")
+    with f:
+        load_rendered(catalog, record, f)
+
+    disclosures_dir("A_MBP.docx", ["Revised"])
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    sync_catalog(catalog, disclosures_dir.path)
+    assert stored_hashes(catalog) == set()
+
+
+def test_migration_clears_inline_text(tmp_path):
+    pool = SQLitePool("disclosures", str(tmp_path / "disclosures.db"))
+    try:
+        before, after = MIGRATIONS["disclosures"][:2], MIGRATIONS["disclosures"]
+        run_migrations(pool, before)
+        with pool.write() as conn:
+            conn.execute("""
+                INSERT INTO disclosures (filename, size, mtime_ns, content_hash, director_name, classification, text)
+                VALUES ('a.docx', 1, 1, 'h', 'A', 'MBP-1', 'full text kept inline')
+            """)
+        assert run_migrations(pool, after) == [3]
+        with pool.read() as conn:
+            assert conn.execute("SELECT text FROM disclosures").fetchone() == (None,)
+    finally:
+        pool.close()
@@ -0,0 +1,102 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from response_cache import ResponseCache, etag_matches
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ('"abc"', True),
+    ('"x", "abc"', True),
+    ("*", True),
+    ('"abcd"', False),
+    (None, False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+def test_lru_bounded_by_body_size():
+    cache = ResponseCache(max_bytes=10, routes={})
+    cache.put("a", "1", b"aaaa", None)
+    cache.put("b", "1", b"bbbb", None)
+    assert cache.get("a", "1") is not None
+    cache.put("c", "1", b"cccc", None)
+    # "b" was least recently used once "a" was read
+    assert cache.get("b", "1") is None
+    assert cache.get("a", "1") is not None and cache.get("c", "1") is not None
+    assert cache.get("a", "2") is None
+    cache.put("huge", "1", b"x" * 11, None)
+    assert cache.get("huge", "1") is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (2, 8, 1)
+
+
+@pytest.fixture
+def rbi(server, seed, public_dir):
+    seed("rbi.db", "master_summaries", [
+        {"run_date": "05-01-2024", "pdf_link": "https://example.com/1", "summary": "Repo", "created_at": "now"},
+    ])
+    server.migrate_all()
+    return public_dir / "rbi.db"
+
+
+def test_revalidation_and_replay(client, server, rbi, monkeypatch):
+    executor = CountingExecutor()
+    monkeypatch.setattr(server, "thread_pool", executor)
+    before = server.response_cache.stats()
+
+    first = client.get("/api/rbi-total-count")
+    etag = first.headers["etag"]
+    assert first.json() == {"count": 1}
+    # The ETag is computed on the app's pool, as is the endpoint's query
+    assert executor.submitted == 2
+
+    not_modified = client.get("/api/rbi-total-count", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    replayed = client.get("/api/rbi-total-count")
+    assert replayed.json() == {"count": 1} and replayed.headers["etag"] == etag
+    # Neither revalidation nor replay ran the endpoint
+    assert executor.submitted == 4
+
+    stats = server.response_cache.stats()
+    assert stats["misses"] - before["misses"] == 1
+    assert stats["hits"] - before["hits"] == 1
+    assert stats["not_modified"] - before["not_modified"] == 1
+    executor.shutdown()
+
+
+def test_new_etag_after_ingest(client, rbi):
+    etag = client.get("/api/rbi-total-count").headers["etag"]
+    with closing(sqlite3.connect(rbi)) as conn, conn:
+        conn.execute(
+            "INSERT INTO master_summaries (run_date, pdf_link, summary, created_at) "
+            "VALUES ('06-01-2024', 'https://example.com/2', 'Circular', 'now')"
+        )
+    response = client.get("/api/rbi-total-count", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == {"count": 2}
+    assert response.headers["etag"] != etag
+
+
+def test_uncached_requests_pass_through(client, rbi):
+    # Query strings are part of the key, and errors are never stored
+    assert client.get("/rbi-analysis-data", params={"limit": 1}).json()["count"] == 1
+    assert "etag" in client.get("/rbi-analysis-data", params={"limit": 2}).headers
+    assert "etag" not in client.get("/api/sebi-total-count").headers
@@ -0,0 +1,122 @@
+import pytest
+
+from db_pool import SQLitePool
+from search_index import (
+    SEARCH_SOURCES, build_match_query, ensure_search_index, highlight_snippet, search_index_current, search_source,
+)
+
+BSE = SEARCH_SOURCES["bse"]
+
+
+@pytest.fixture
+def notifications(tmp_path):
+    pool = SQLitePool("notifications", str(tmp_path / "notifications.db"))
+    with pool.write() as conn:
+        conn.execute('CREATE TABLE DailyLogs ("SrNo" REAL, "EntityName" TEXT, "Link" TEXT, "Nature" TEXT, "Summary" TEXT, "Date" DATE)')
+        conn.executemany("INSERT INTO DailyLogs VALUES (?, ?, ?, ?, ?, ?)", [
+            (1, "Acme Steel", "https://example.com/1", "Board Meeting", "Approval of quarterly results", "2024-01-05"),
+            (2, "Beta Power", "https://example.com/2", "Dividend", "Interim dividend declared", "2024-01-06"),
+            (3, "Gamma Mills", "NIL", "Board Meeting", "Quarterly results postponed", "2024-01-07"),
+            (4, "Delta Cements", "https://example.com/4", "Resignation", "Resignation of director", "2024-01-08"),
+            (5, "Acme Steel", "https://example.com/5", "Dividend", "Final dividend <b>recommended</b>", "2024-01-09"),
+        ])
+    ensure_search_index(pool, BSE)
+    yield pool
+    pool.close()
+
+
+def search(pool, text: str, limit: int = 10) -> dict:
+    with pool.read() as conn:
+        return search_source(conn, "bse", build_match_query(text), limit)
+
+
+def ids(result: dict) -> set:
+    return {hit["id"] for hit in result["hits"]}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("dividend", '"dividend"*'),
+    ("quarterly results", '"quarterly" "results"*'),
+    ('results" OR "x', '"results" "OR" "x"*'),
+    ("NEAR(a b) -c ^d", '"NEAR" "a" "b" "c" "d"*'),
+    ("  ", None),
+    ("***", None),
+])
+def test_match_query_is_quoted(text, expected):
+    assert build_match_query(text) == expected
+
+
+def test_snippet_is_escaped():
+    assert highlight_snippet("<b>\x02div\x03</b> & co") == "&lt;b&gt;<mark>div</mark>&lt;/b&gt; &amp; co"
+    assert highlight_snippet(None) == ""
+
+
+def test_search_ranks_and_filters(notifications):
+    result = search(notifications, "dividend")
+    assert result["total"] == 2
+    assert ids(result) == {2, 5}
+    assert result["hits"][0]["relevance"] == 1.0
+    assert "<mark>" in result["hits"][0]["snippet"] and "<b>" not in result["hits"][1]["snippet"]
+    # Unlinked rows are not listed anywhere, so they are not searchable either
+    assert ids(search(notifications, "quarterly results")) == {1}
+    # The last word matches as a prefix; porter stemming matches other forms
+    assert ids(search(notifications, "resig")) == {4}
+    assert ids(search(notifications, "postpone")) == set()
+    assert ids(search(notifications, "acme dividends")) == {5}
+
+
+def test_triggers_keep_index_in_step(notifications):
+    with notifications.write() as conn:
+        conn.execute("INSERT INTO DailyLogs VALUES (6, 'Zeta', 'https://example.com/6', 'Dividend', 'Special dividend', '2024-01-10')")
+        conn.execute("UPDATE DailyLogs SET Summary = 'Results restated', Nature = 'Board Meeting' WHERE SrNo = 2")
+        conn.execute("DELETE FROM DailyLogs WHERE SrNo = 5")
+    assert ids(search(notifications, "dividend")) == {6}
+    assert ids(search(notifications, "restated")) == {2}
+    assert not ensure_search_index(notifications, BSE)
+
+
+def test_rebuilt_after_table_replaced(notifications):
+    with notifications.write() as conn:
+        conn.execute("DROP TABLE DailyLogs")
+        conn.execute('CREATE TABLE DailyLogs ("SrNo" REAL, "EntityName" TEXT, "Link" TEXT, "Nature" TEXT, "Summary" TEXT, "Date" DATE)')
+        conn.execute("INSERT INTO DailyLogs VALUES (9, 'Eta', 'https://example.com/9', 'Dividend', 'Maiden dividend', '2024-02-01')")
+    assert ensure_search_index(notifications, BSE)
+    assert ids(search(notifications, "dividend")) == {9}
+
+
+def test_rebuilt_after_vacuum_renumbers_rows(notifications):
+    with notifications.write() as conn:
+        conn.execute("DELETE FROM DailyLogs WHERE SrNo IN (1, 2)")
+    with notifications.write() as conn:
+        conn.execute("VACUUM")
+    with notifications.read() as conn:
+        assert not search_index_current(conn, BSE)
+    assert ensure_search_index(notifications, BSE)
+
+    result = search(notifications, "dividend")
+    assert ids(result) == {5}
+    assert result["hits"][0]["entity_name"] == "Acme Steel"
+    assert ids(search(notifications, "resignation")) == {4}
+
+
+def test_search_endpoint_merges_sources(client, server, seed):
+    seed("notifications.db", "DailyLogs", [
+        {"SrNo": 1, "EntityName": "Acme", "Link": "https://example.com/1", "Nature": "Dividend",
+         "Summary": "Interim dividend declared", "Date": "2024-01-05"},
+    ])
+    seed("sebi_excel_master.db", "excel_summaries", [
+        {"date_key": "2024-01-04", "row_index": 1, "pdf_link": "https://example.com/s", "summary": "Order on dividend stripping"},
+        {"date_key": "2024-01-04", "row_index": 2, "pdf_link": "https://example.com/t", "summary": "NIL"},
+    ])
+    seed("rbi.db", "master_summaries", [
+        {"run_date": "05-01-2024", "pdf_link": "https://example.com/r", "summary": "Repo rate unchanged", "created_at": "now"},
+    ])
+    server.migrate_all()
+
+    body = client.get("/api/search", params={"q": "dividend"}).json()
+    assert body["count"] == 2
+    assert body["by_source"] == {"bse": 1, "sebi": 1, "rbi": 0}
+    assert {hit["source"] for hit in body["data"]} == {"bse", "sebi"}
+    assert client.get("/api/search", params={"q": "repo", "source": "rbi"}).json()["count"] == 1
+    assert client.get("/api/search", params={"q": "!!"}).status_code == 400
+    assert client.get("/api/search", params={"q": "dividend", "source": "nse"}).status_code == 400
@@ -0,0 +1,153 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+import zip_stream
+from zip_stream import archive_size, stream_zip
+
+
+@pytest.fixture
+def entries(tmp_path):
+    large = tmp_path / "large.bin"
+    large.write_bytes(os.urandom(3 * 1024 * 1024 + 17))
+    small = tmp_path / "notes.txt"
+    small.write_text("board resolution\n")
+    empty = tmp_path / "empty.docx"
+    empty.write_bytes(b"")
+    return [
+        ("large.bin", str(large)),
+        ("notes.txt", str(small)),
+        ("empty.docx", str(empty)),
+        ("manifest.json", b'{"total": 3}'),
+        ("Ünïcode directors/ç.docx", b"\x00\x01" * 1000),
+    ]
+
+
+def expected_contents(entries) -> dict:
+    contents = {}
+    for name, source in entries:
+        if isinstance(source, bytes):
+            contents[name] = source
+        else:
+            with open(source, "rb") as f:
+                contents[name] = f.read()
+    return contents
+
+
+def test_archive_passes_testzip(entries):
+    data = b"".join(stream_zip(entries))
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [name for name, _ in entries]
+        assert {name: archive.read(name) for name in archive.namelist()} == expected_contents(entries)
+        assert all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist())
+
+
+def test_archive_size_is_exact(entries):
+    assert len(b"".join(stream_zip(entries))) == archive_size(entries)
+    assert len(b"".join(stream_zip([]))) == archive_size([])
+
+
+def test_streams_from_generator_in_chunks(entries, monkeypatch):
+    monkeypatch.setattr(zip_stream, "CHUNK_SIZE", 64 * 1024)
+    chunks = list(stream_zip(entry for entry in entries))
+    # The 3 MiB file alone is read in 64 KiB blocks
+    assert len(chunks) > 48
+    assert max(len(chunk) for chunk in chunks) <= 64 * 1024
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.testzip() is None
+
+
+def test_empty_archive():
+    with zipfile.ZipFile(io.BytesIO(b"".join(stream_zip([])))) as archive:
+        assert archive.namelist() == []
+
+
+def test_file_that_shrinks_while_archived(tmp_path):
+    path = tmp_path / "shrinking.bin"
+    path.write_bytes(b"x" * 1000)
+    stream = stream_zip([("shrinking.bin", str(path))])
+    next(stream)
+    path.write_bytes(b"x" * 10)
+    with pytest.raises(IOError):
+        list(stream)
+
+
+def test_open_handles_are_archived_from_their_position(tmp_path, entries):
+    path = tmp_path / "handle.bin"
+    path.write_bytes(b"header" + b"y" * 5000)
+    with open(path, "rb") as f:
+        f.read(6)
+        handle_entries = entries + [("handle.bin", f)]
+        size = archive_size(handle_entries)
+        # What is archived is the opened file, even once its path holds something else
+        (tmp_path / "other.bin").write_bytes(b"replacement")
+        os.replace(tmp_path / "other.bin", path)
+        data = b"".join(stream_zip(handle_entries))
+        assert not f.closed
+    assert len(data) == size
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        assert archive.read("handle.bin") == b"y" * 5000
+
+
+@pytest.fixture
+def bundle(server, public_dir, disclosures_dir, monkeypatch):
+    monkeypatch.setattr(server, "DISCLOSURES_DIR", disclosures_dir.path)
+    server.migrate_all()
+    disclosures_dir("Asha Rao_MBP.docx", ["DIN: 11111111"])
+    disclosures_dir("Asha Rao.docx", ["DIN: 11111111", "Form DIR-8"])
+    disclosures_dir("Vikram Shah_MBP.docx", ["DIN: 22222222"])
+    return disclosures_dir
+
+
+def test_bundle_endpoint_streams_selected_documents(client, bundle):
+    response = client.get("/api/directors-disclosures/bundle", params={"director": "asha rao"})
+    assert response.status_code == 200
+    assert int(response.headers["content-length"]) == len(response.content)
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ["Asha Rao.docx", "Asha Rao_MBP.docx"]
+        for name in archive.namelist():
+            with open(os.path.join(bundle.path, name), "rb") as f:
+                assert archive.read(name) == f.read()
+
+
+def test_bundle_endpoint_rejects_bad_selections(client, bundle):
+    assert client.get("/api/directors-disclosures/bundle").status_code == 400
+    assert client.get("/api/directors-disclosures/bundle", params={"ids": "1,x"}).status_code == 400
+    assert client.get("/api/directors-disclosures/bundle", params={"month": "2024-13"}).status_code == 400
+    assert client.get("/api/directors-disclosures/bundle", params={"director": "nobody"}).status_code == 404
+
+
+class RecordingContext:
+    """Stands in for job_queue.JobContext: a result path and recorded progress"""
+
+    def __init__(self, result_path):
+        self.result_path = str(result_path)
+        self.updates = []
+
+    def progress(self, done, total, message=None):
+        self.updates.append((done, total))
+
+
+def test_bundle_job_archives_verified_handles(server, bundle, tmp_path, monkeypatch):
+    import document_jobs
+
+    monkeypatch.setattr(document_jobs, "DISCLOSURES_DIR", bundle.path)
+    server.sync_catalog(server.get_pool("disclosures"), bundle.path)
+    # Changed after it was catalogued: the id no longer names what is on disk
+    stale = bundle("Vikram Shah_MBP.docx", ["DIN: 22222222", "Revised"])
+    st = os.stat(stale)
+    os.utime(stale, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    ctx = RecordingContext(tmp_path / "result.zip")
+    with server.get_pool("disclosures").read() as conn:
+        ids = [row[0] for row in conn.execute("SELECT id FROM disclosures ORDER BY filename")]
+    assert document_jobs.disclosure_bundle_job(ctx, {"ids": ids}) == ("disclosures.zip", "application/zip")
+    with zipfile.ZipFile(ctx.result_path) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ["Asha Rao.docx", "Asha Rao_MBP.docx"]
+    assert ctx.updates[-1] == (3, 3)
@@ -0,0 +1,20 @@
+"""
+Start method for the worker processes the server launches.
+
+Workers are never forked from the server process itself: by the time they
+are needed the directory watcher, sidecar converter, request and pool
+monitor threads are running, and a child forked while one of them holds a
+lock (a logging handler, a connection pool) starts with that lock held and
+can hang. Where the platform has one, a fork server is used: it is started
+once, from a fresh single-threaded interpreter, and every worker is forked
+from it. Elsewhere workers are spawned. Either way a worker's task and
+arguments must be picklable and importable by module name.
+"""
+
+import multiprocessing
+
+
+def worker_context():
+    """multiprocessing context for process pools and workers started from the running server"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
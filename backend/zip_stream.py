@@ -0,0 +1,139 @@
+"""
+Streaming writer for ZIP archives of stored (uncompressed) files.
+
+Entries are written with their CRC-32 and sizes in the local header, so the
+archive needs no data descriptors and opens in every unzip tool, while the
+output is produced chunk by chunk in constant memory. Because nothing is
+compressed, the archive's exact length is known before the first byte is
+sent. An entry is a file on disk, a file already opened (archived from its
+current position, and left open for the caller to close) or a document
+held in memory. ZIP64 is not supported: each file and the whole archive must stay
+below 4 GiB.
+"""
+
+import os
+import time
+import struct
+import zlib
+from datetime import datetime
+from typing import BinaryIO, Iterable, Iterator, List, Tuple, Union
+
+CHUNK_SIZE = 1024 * 1024
+ZIP32_LIMIT = 0xFFFFFFFF
+
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+END_RECORD = struct.Struct("<IHHHHIIH")
+
+VERSION = 20
+UTF8_FLAG = 0x800
+
+# (archive name, path on disk, open binary file or the entry's bytes)
+Entry = Tuple[str, Union[str, BinaryIO, bytes]]
+
+
+def _dos_datetime(timestamp: float) -> Tuple[int, int]:
+    moment = datetime.fromtimestamp(timestamp)
+    if moment.year < 1980:
+        moment = datetime(1980, 1, 1)
+    dos_time = (moment.hour << 11) | (moment.minute << 5) | (moment.second // 2)
+    dos_date = ((moment.year - 1980) << 9) | (moment.month << 5) | moment.day
+    return dos_time, dos_date
+
+
+def _handle_crc32(f: BinaryIO, size: int) -> int:
+    # Leaves the handle where it was, ready for _handle_chunks
+    start = f.tell()
+    crc, remaining = 0, size
+    while remaining > 0:
+        block = f.read(min(CHUNK_SIZE, remaining))
+        if not block:
+            break
+        crc = zlib.crc32(block, crc)
+        remaining -= len(block)
+    f.seek(start)
+    return crc
+
+
+def _handle_chunks(f: BinaryIO, size: int, name: str) -> Iterator[bytes]:
+    written = 0
+    while written < size:
+        block = f.read(min(CHUNK_SIZE, size - written))
+        if not block:
+            raise IOError(f"{name} shrank while it was being archived")
+        written += len(block)
+        yield block
+
+
+def _file_chunks(path: str, size: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        yield from _handle_chunks(f, size, path)
+
+
+def _entry_size(source: Union[str, BinaryIO, bytes]) -> int:
+    if isinstance(source, bytes):
+        return len(source)
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    return os.fstat(source.fileno()).st_size - source.tell()
+
+
+def archive_size(entries: List[Entry]) -> int:
+    """Exact byte length of the archive stream_zip will produce for these entries"""
+    total = END_RECORD.size
+    for name, source in entries:
+        encoded = len(name.encode("utf-8"))
+        total += LOCAL_HEADER.size + encoded + _entry_size(source) + CENTRAL_HEADER.size + encoded
+    return total
+
+
+def stream_zip(entries: Iterable[Entry]) -> Iterator[bytes]:
+    """Yield a ZIP archive of the given files or in-memory documents, stored without compression
+
+    entries may be a generator; each entry is written as soon as it is produced.
+    Open files are read from the handle given, so what is archived is the
+    file that was opened even if its path has been replaced since.
+    """
+    central = []
+    offset = 0
+    for name, source in entries:
+        encoded = name.encode("utf-8")
+        if isinstance(source, bytes):
+            size, mtime = len(source), time.time()
+            crc = zlib.crc32(source)
+            chunks = [source]
+        elif isinstance(source, str):
+            st = os.stat(source)
+            size, mtime = st.st_size, st.st_mtime
+            # Reading the file twice keeps memory constant and avoids data descriptors
+            with open(source, "rb") as f:
+                crc = _handle_crc32(f, size)
+            chunks = _file_chunks(source, size)
+        else:
+            st = os.fstat(source.fileno())
+            size, mtime = st.st_size - source.tell(), st.st_mtime
+            crc = _handle_crc32(source, size)
+            chunks = _handle_chunks(source, size, name)
+        if size > ZIP32_LIMIT or offset > ZIP32_LIMIT:
+            raise ValueError("Archive too large for ZIP without ZIP64")
+        dos_time, dos_date = _dos_datetime(mtime)
+
+        header = LOCAL_HEADER.pack(
+            0x04034B50, VERSION, UTF8_FLAG, 0, dos_time, dos_date,
+            crc, size, size, len(encoded), 0
+        )
+        yield header + encoded
+        yield from chunks
+
+        central.append(CENTRAL_HEADER.pack(
+            0x02014B50, VERSION, VERSION, UTF8_FLAG, 0, dos_time, dos_date,
+            crc, size, size, len(encoded), 0, 0, 0, 0, 0, offset
+        ) + encoded)
+        offset += LOCAL_HEADER.size + len(encoded) + size
+
+    directory = b"".join(central)
+    if offset > ZIP32_LIMIT:
+        raise ValueError("Archive too large for ZIP without ZIP64")
+    yield directory + END_RECORD.pack(
+        0x06054B50, 0, 0, len(central), len(central), len(directory), offset, 0
+    )
@@ -44,49 +44,26 @@ const HierarchyStructure = () => {
   };
   
   useEffect(() => {
-    // Fetch the BSE monthly stats (average and total)
-    const fetchBseMonthlyStats = async () => {
+    // Fetch per-source totals and monthly breakdowns for BSE, RBI and SEBI in one request
+    const fetchNotificationStats = async () => {
       try {
-        const response = await fetch("/api/bse-alerts-monthly-count");
+        const response = await fetch("/api/notifications-feed?limit=0");
         if (response.ok) {
           const data = await response.json();
-          setBseMonthlyAvg(typeof data.average_count === "number" ? data.average_count : 0);
-          setBseTotalCount(typeof data.total_count === "number" ? data.total_count : 0);
+          const totals = data.totals || {};
+          const bseMonths = (data.monthly || []).filter((item: any) => item.bse > 0).length;
+          const bseTotal = typeof totals.bse === "number" ? totals.bse : 0;
+          setBseTotalCount(bseTotal);
+          setBseMonthlyAvg(bseMonths > 0 ? Math.round(bseTotal / bseMonths) : 0);
+          setRbiTotalCount(typeof totals.rbi === "number" ? totals.rbi : 0);
+          setSebiTotalCount(typeof totals.sebi === "number" ? totals.sebi : 0);
         }
       } catch (error) {
-        console.error("Error fetching BSE monthly count:", error);
+        console.error("Error fetching notification stats:", error);
       }
     };
 
-    // Fetch RBI total count
-    const fetchRbiTotalCount = async () => {
-      try {
-        const response = await fetch("/api/rbi-total-count");
-        if (response.ok) {
-          const data = await response.json();
-          setRbiTotalCount(typeof data.count === "number" ? data.count : 0);
-        }
-      } catch (error) {
-        console.error("Error fetching RBI total count:", error);
-      }
-    };
-
-    // Fetch SEBI total count
-    const fetchSebiTotalCount = async () => {
-      try {
-        const response = await fetch("/api/sebi-total-count");
-        if (response.ok) {
-          const data = await response.json();
-          setSebiTotalCount(typeof data.count === "number" ? data.count : 0);
-        }
-      } catch (error) {
-        console.error("Error fetching SEBI total count:", error);
-      }
-    };
-
-    fetchBseMonthlyStats();
-    fetchRbiTotalCount();
-    fetchSebiTotalCount();
+    fetchNotificationStats();
   }, []);
 
   const hierarchyData = [
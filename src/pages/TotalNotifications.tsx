@@ -102,34 +102,17 @@ const fetchAllBSEAlertsData = async (): Promise<any> => {
   const API_BASE_URL = '';
 
   try {
-    // First, get the total count of records
-    const countResponse = await fetch(`${API_BASE_URL}/bse-alerts?limit=1&offset=0`, {
+    // Stream every record in one request instead of paging through the table
+    const response = await fetch(`${API_BASE_URL}/bse-alerts/export?format=json`, {
       signal: controller.signal
     });
     
-    if (!countResponse.ok) {
-      throw new Error(`Failed to fetch BSE alerts count: ${countResponse.status} ${countResponse.statusText}`);
+    if (!response.ok) {
+      throw new Error(`Failed to fetch BSE alerts data: ${response.status} ${response.statusText}`);
     }
     
-    const countData = await countResponse.json();
-    const totalCount = countData.count;
-    
-    // Now fetch all records in batches to avoid memory issues
-    const batchSize = 1000;
-    let allData: any[] = [];
-    
-    for (let offset = 0; offset < totalCount; offset += batchSize) {
-      const response = await fetch(`${API_BASE_URL}/bse-alerts?limit=${batchSize}&offset=${offset}`, {
-        signal: controller.signal
-      });
-      
-      if (!response.ok) {
-        throw new Error(`Failed to fetch BSE alerts data: ${response.status} ${response.statusText}`);
-      }
-      
-      const batchData = await response.json();
-      allData = allData.concat(batchData.data);
-    }
+    const allData: any[] = await response.json();
+    const totalCount = allData.length;
     
     clearTimeout(timeoutId);
     